@@ -0,0 +1,414 @@
+# api.py
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from pydantic import BaseModel
+
+from derived_features import derive_records
+from explain import get_explainer, loaded_explainer
+from inference import load_engine
+from microbatch import MicroBatcher
+from model_registry import REGISTRY
+from prediction_cache import PREDICTION_CACHE, CachedEngine
+from preprocessing import BUNDLE, PREPROCESSOR
+from scoring import risk_category, scores_from_probs
+from shadow import ShadowEngine, shadow_engine
+from tracing import Trace, render_prometheus
+from warmup import WarmUp
+
+MICROBATCH_MAX_SIZE = int(os.environ.get("LBW_MICROBATCH_MAX_SIZE", "64"))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get("LBW_MICROBATCH_MAX_WAIT_MS", "5"))
+
+STREAM_CHUNK_SIZE = int(os.environ.get("LBW_STREAM_CHUNK_SIZE", "1000"))
+STREAM_MAX_LINE_BYTES = int(os.environ.get("LBW_STREAM_MAX_LINE_BYTES", str(1 << 20)))
+
+
+# =========================
+# LOAD MODEL ENGINE & FEATURES (once per process)
+# =========================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    t0 = time.perf_counter()
+    # + a candidate model scored on the same matrix when LBW_SHADOW_MODEL_PATH is set
+    app.state.engine = shadow_engine(CachedEngine(load_engine(), PREDICTION_CACHE))
+    app.state.features = PREPROCESSOR.features
+    app.state.startup_seconds = time.perf_counter() - t0
+    # score synthetic + background rows in the background (builds the SHAP
+    # explainer too unless LBW_WARMUP_EXPLAINER=0); /ready is 503 until done
+    app.state.warmup = WarmUp(app.state.engine).start()
+
+    app.state.batcher = MicroBatcher(
+        app.state.engine.predict_records,
+        max_batch_size=MICROBATCH_MAX_SIZE,
+        max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+    )
+    await app.state.batcher.start()
+    yield
+    await app.state.batcher.stop()
+    if isinstance(app.state.engine, ShadowEngine):
+        app.state.engine.close()
+
+
+app = FastAPI(title="LBW Risk Scoring API", lifespan=lifespan)
+
+
+class Prediction(BaseModel):
+    lbw_prob: float
+    lbw_percent: float
+    risk_category: str
+
+
+class Explanation(Prediction):
+    base_value: float
+    attributions: Dict[str, float]
+
+
+# =========================
+# ENDPOINTS
+# =========================
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "startup_seconds": round(app.state.startup_seconds, 4),
+        "bundle": BUNDLE.info() if BUNDLE is not None else None,
+    }
+
+
+@app.get("/ready")
+def ready():
+    """
+    Readiness probe: 200 once the model is loaded AND warmed up, 503 while
+    warming up or if warm-up failed. Reports the warm-up duration per stage.
+    The server accepts requests while warming up (the first ones are slower).
+    """
+    info = {
+        "startup_seconds": round(app.state.startup_seconds, 4),
+        "warmup": app.state.warmup.info(),
+    }
+    if not app.state.warmup.ready:
+        status = "warming up" if info["warmup"]["warming_up"] else "not ready"
+        return JSONResponse(status_code=503, content={"status": status, **info})
+    return {"status": "ready", **info}
+
+
+@app.get("/features")
+def features():
+    return app.state.features
+
+
+@app.get("/models")
+def models():
+    engine = app.state.engine
+    return {
+        **REGISTRY.info(),
+        "engine": engine.name,
+        "shadow": engine.stats() if isinstance(engine, ShadowEngine) else None,
+    }
+
+
+@app.post("/predict", response_model=List[Prediction])
+def predict(records: List[Dict[str, Any]]):
+    """
+    Score a list of records in the FEATURES_ORDER schema.
+
+    The whole list goes through the compiled preprocessor and a single
+    model call, so 500 synced forms = 1 request.
+    """
+    if not records:
+        return []
+
+    trace = Trace("api_predict")
+    try:
+        with trace.stage("preprocess"):
+            X = PREPROCESSOR.transform_records(records)
+        with trace.stage("predict"):
+            probs = app.state.engine.predict_matrix(X)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    with trace.stage("serialize"):
+        return scores_from_probs(probs).to_dict(orient="records")
+
+
+@app.post("/predict/raw", response_model=List[Prediction])
+def predict_raw(records: List[Dict[str, Any]]):
+    """
+    Score records holding RAW form inputs (hb_value, lmp_date, anc1_date,
+    household_assets, ...; see derived_features.RAW_INPUTS) next to the
+    directly entered features. Derived features are computed for the
+    whole list with the same code the Streamlit form uses.
+    """
+    if not records:
+        return []
+
+    trace = Trace("api_predict_raw")
+    try:
+        with trace.stage("derive"):
+            records = derive_records(records)
+        with trace.stage("preprocess"):
+            X = PREPROCESSOR.transform_records(records)
+        with trace.stage("predict"):
+            probs = app.state.engine.predict_matrix(X)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return scores_from_probs(probs).to_dict(orient="records")
+
+
+@app.post("/predict/columnar")
+async def predict_columnar(request: Request):
+    """
+    Score an Arrow IPC (stream or file) or Parquet body (Content-Type, see
+    columnar.py) with one column per feature in the FEATURES_ORDER schema.
+
+    Columns go straight into the compiled float32 matrix
+    (PREPROCESSOR.transform_arrow), with no per-row dicts. The response is
+    a table with lbw_prob, lbw_percent and risk_category in row order. Its
+    format is the request's own, unless Accept names another columnar type.
+    """
+    import columnar   # pyarrow is loaded by the first columnar request only
+
+    kind = columnar.media_type(request.headers.get("content-type"))
+    if kind is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"❌ Expected one of: {', '.join(sorted(columnar.MEDIA_TYPES))}",
+        )
+    out_kind = columnar.response_media_type(request.headers.get("accept"), kind)
+    body = await request.body()
+
+    def score():
+        trace = Trace("api_predict_columnar")
+        with trace.stage("decode"):
+            table = columnar.read_table(body, kind)
+        with trace.stage("preprocess"):
+            X = PREPROCESSOR.transform_arrow(table)
+        with trace.stage("predict"):
+            probs = app.state.engine.predict_matrix(X)
+        with trace.stage("serialize"):
+            return columnar.write_table(columnar.scores_table(probs), out_kind)
+
+    try:
+        content = await run_in_threadpool(score)
+    except ValueError as e:   # includes pyarrow.ArrowInvalid (corrupt body)
+        raise HTTPException(status_code=422, detail=str(e))
+    return Response(content, media_type=out_kind)
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator is still reading the request.
+    Starlette's disconnect listener would race it for receive() messages
+    (swallowing upload chunks), so only stream; a client disconnect
+    surfaces as ClientDisconnect from request.stream() instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+
+def _stream_error(e: Exception) -> dict:
+    return {"error": str(e) if isinstance(e, ValueError) else f"{type(e).__name__}: {e}"}
+
+
+def _score_stream_chunk(lines: list) -> bytes:
+    """
+    [(line_no, record | error)] -> NDJSON bytes, one output line per input line.
+
+    The chunk is scored in one call; if that fails, its records are scored
+    one by one, so a bad record only turns its own line into an error.
+    """
+    trace = Trace("api_predict_stream")
+    records = [(n, r) for n, r in lines if isinstance(r, dict)]
+    scored = {}
+    if records:
+        try:
+            with trace.stage("preprocess"):
+                X = PREPROCESSOR.transform_records([r for _, r in records])
+            with trace.stage("predict"):
+                scores = scores_from_probs(app.state.engine.predict_matrix(X))
+            scored = dict(zip((n for n, _ in records), scores.to_dict(orient="records")))
+        except Exception:
+            with trace.stage("predict_per_record"):
+                for n, record in records:
+                    try:
+                        X = PREPROCESSOR.transform_records([record])
+                        probs = app.state.engine.predict_matrix(X)
+                        scored[n] = scores_from_probs(probs).to_dict(orient="records")[0]
+                    except Exception as e:
+                        scored[n] = _stream_error(e)
+
+    with trace.stage("serialize"):
+        out = []
+        for n, record in lines:
+            result = scored[n] if n in scored else {"error": record}
+            out.append(json.dumps({"line": n, **result}))
+        return ("\n".join(out) + "\n").encode()
+
+
+def _parse_line(raw: bytes):
+    try:
+        record = json.loads(raw)
+    except ValueError as e:
+        return f"invalid JSON: {e}"
+    return record if isinstance(record, dict) else "expected a JSON object"
+
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request):
+    """
+    Newline-delimited JSON in, newline-delimited JSON out.
+
+    Records (FEATURES_ORDER schema, one object per line) are read from the
+    request body as it arrives and scored every LBW_STREAM_CHUNK_SIZE
+    lines, so memory is bounded by one chunk and results start flowing
+    while the upload is still in progress. Each output line carries the
+    1-based input `line` plus the scores, or an `error` for that line.
+    """
+    async def results():
+        buffer = b""
+        pending = []
+        line_no = 0
+
+        async for data in request.stream():
+            buffer += data
+            *complete, buffer = buffer.split(b"\n")
+            if len(buffer) > STREAM_MAX_LINE_BYTES:
+                yield json.dumps({
+                    "line": line_no + 1,
+                    "error": f"line longer than {STREAM_MAX_LINE_BYTES} bytes, stream aborted",
+                }).encode() + b"\n"
+                return
+
+            for raw in complete:
+                line_no += 1
+                if raw.strip():
+                    pending.append((line_no, _parse_line(raw)))
+                if len(pending) >= STREAM_CHUNK_SIZE:
+                    yield await run_in_threadpool(_score_stream_chunk, pending)
+                    pending = []
+
+        if buffer.strip():
+            pending.append((line_no + 1, _parse_line(buffer)))
+        if pending:
+            yield await run_in_threadpool(_score_stream_chunk, pending)
+
+    return UploadStreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@app.post("/predict/one", response_model=Prediction)
+async def predict_one(record: Dict[str, Any]):
+    """
+    Score ONE record. Concurrent calls are micro-batched into a single
+    vectorized model call (LBW_MICROBATCH_MAX_SIZE / _MAX_WAIT_MS).
+    """
+    try:
+        lbw_prob = await app.state.batcher.submit(record)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    lbw_percent = round(lbw_prob * 100, 2)
+    return {
+        "lbw_prob": lbw_prob,
+        "lbw_percent": lbw_percent,
+        "risk_category": risk_category(lbw_percent),
+    }
+
+
+@app.get("/metrics/batcher")
+def batcher_metrics():
+    return app.state.batcher.stats()
+
+
+@app.get("/metrics/cache")
+def cache_metrics():
+    return PREDICTION_CACHE.stats()
+
+
+@app.post("/explain", response_model=List[Explanation])
+def explain(records: List[Dict[str, Any]], top: int = 0):
+    """
+    Scores + per-feature SHAP attributions (log-odds) for a list of
+    records, computed for the whole batch in one vectorized call.
+    `top` > 0 keeps only the k largest attributions per record.
+    """
+    if not records:
+        return []
+
+    trace = Trace("api_explain")
+    try:
+        with trace.stage("preprocess"):
+            X = PREPROCESSOR.transform_records(records)
+        with trace.stage("predict"):
+            scores = scores_from_probs(app.state.engine.predict_matrix(X))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    explainer = get_explainer(app.state.engine)   # built here on first use if not warmed up
+    with trace.stage("explain"):
+        values = explainer.explain(X)
+
+    k = top if top > 0 else len(explainer.feature_names)
+    return [
+        {
+            **score,
+            "base_value": explainer.base_value,
+            "attributions": dict(explainer.top_features(row, k)),
+        }
+        for score, row in zip(scores.to_dict(orient="records"), values)
+    ]
+
+
+@app.get("/metrics/explain")
+def explain_metrics():
+    explainer = loaded_explainer(app.state.engine)
+    if explainer is None:
+        return {"loaded": False}
+    return {
+        "loaded": True,
+        "feature_perturbation": explainer.feature_perturbation,
+        "latency_ms": explainer.latency_ms.snapshot(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Prometheus text format: per-stage timings (api_*, sheets_*), the
+    micro-batcher, explainer and shadow histograms and prediction-cache /
+    shadow counters.
+    """
+    batcher, engine = app.state.batcher, app.state.engine
+    histograms = [batcher.batch_size, batcher.queue_wait_ms]
+    explainer = loaded_explainer(engine)
+    if explainer is not None:
+        histograms.append(explainer.latency_ms)
+    cache = PREDICTION_CACHE.stats()
+    counters = {
+        "lbw_prediction_cache_hits_total": (cache["hits"], "Prediction cache hits"),
+        "lbw_prediction_cache_misses_total": (cache["misses"], "Prediction cache misses"),
+        "lbw_prediction_cache_bypassed_total": (
+            cache["bypassed"], "Rows scored without the cache (batch > max_rows)"
+        ),
+    }
+    if isinstance(engine, ShadowEngine):
+        histograms.append(engine.latency_ms)
+        counters.update({
+            "lbw_shadow_completed_total": (engine.completed, "Shadow runs scored"),
+            "lbw_shadow_dropped_total": (engine.dropped, "Shadow runs dropped (pool behind)"),
+            "lbw_shadow_failed_total": (engine.failed, "Shadow runs that raised"),
+        })
+    return PlainTextResponse(
+        render_prometheus(histograms, counters=counters),
+        media_type="text/plain; version=0.0.4",
+    )
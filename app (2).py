@@ -1,8 +1,8 @@
 # app.py
 import streamlit as st
-import json, joblib, pandas as pd
-import shap
+import json, pandas as pd
 from preprocessing import preprocess_payload
+from model_registry import get_model
 
 # -------------------------
 # Load artifacts
@@ -10,7 +10,7 @@ from preprocessing import preprocess_payload
 
 @st.cache_resource
 def load_artifacts():
-    model = joblib.load("artifacts/xgb_model.pkl")   # ✅ FIXED
+    model = get_model()   # ✅ shared registry, loaded once per process
     features = json.load(open("artifacts/features.json"))
     background = pd.read_csv("artifacts/background.csv")
     return model, features, background
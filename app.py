@@ -1,43 +1,94 @@
+import functools
+import os
+import time
 import streamlit as st
 import pandas as pd
 import math
-import os
 from datetime import datetime, date
-import json
-import joblib
 import numpy as np
 
+# Streamlit re-executes this script on every interaction; the Predict
+# trace counts everything up to the button as the "rerun" stage.
+SCRIPT_STARTED = time.perf_counter()
+
 # ================= GOOGLE SHEET SETUP =================
-import gspread
-from google.oauth2.service_account import Credentials
-
-# 🔴 REPLACE THIS WITH YOUR ACTUAL SPREADSHEET ID
-GSHEET_ID = "12qNktlRnQHFHujGwnCX15YW1UsQHtMzgNyRWzq1Qbsc"
-GSHEET_WORKSHEET = "LBWScores"
-
-def get_gsheet(spreadsheet_id=GSHEET_ID, worksheet_name=GSHEET_WORKSHEET):
-    creds = Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"],
-        scopes=[
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
+from gsheets import (
+    GSHEET_ID, GSHEET_WORKSHEET,
+    SheetBatchSink, get_sheet_pool, service_account_client_factory
+)
+from write_behind import WriteBehindQueue
+from record_store import RecordStore
+from tracing import Trace
+from derived_features import ASSET_WEIGHTS, FeatureState
+from validation import ANC_RULES, REGISTRATION_RULES, validate_record
+
+# per-stage timings (ms) saved next to form_duration_seconds
+TRACE_AUDIT_COLUMNS = os.environ.get("LBW_TRACE_AUDIT_COLUMNS", "1") == "1"
+
+RERUN_TRACE = "streamlit_rerun"
+
+
+def form_section(fn):
+    """
+    st.fragment + timing: a widget inside `fn` reruns ONLY `fn`, not the
+    whole script. Results go through st.session_state (the derived
+    FeatureState); on a full rerun the section runs as usual.
+    """
+    @st.fragment
+    @functools.wraps(fn)
+    def section(*args, **kwargs):
+        trace = Trace(RERUN_TRACE)
+        with trace.stage(fn.__name__):
+            fn(*args, **kwargs)
+        st.session_state.setdefault("rerun_ms", {})[fn.__name__] = trace.stages[fn.__name__]
+    return section
+
+@st.cache_resource
+def get_sheet_sink():
+    # Pool: authorized once, worksheet + header cached across saves.
+    # Sink: one append_rows per batch, counts rows per API call.
+    pool = get_sheet_pool(
+        service_account_client_factory(st.secrets["gcp_service_account"])
     )
-    client = gspread.authorize(creds)
-    spreadsheet = client.open_by_key(spreadsheet_id)
-    worksheet = spreadsheet.worksheet(worksheet_name)
-    return worksheet
+    return SheetBatchSink(pool, GSHEET_ID, GSHEET_WORKSHEET)
+
+@st.cache_resource
+def get_outbox():
+    # Saves go to a local SQLite journal; a background thread flushes
+    # them to the sheet in batched append_rows calls (retry + backoff).
+    return WriteBehindQueue(get_sheet_sink().write).start()
 
 # =========================
 # LOAD MODEL & FEATURES
 # =========================
-from preprocessing import preprocess_for_model
+from preprocessing import PREPROCESSOR
+from inference import load_engine
+from prediction_cache import PREDICTION_CACHE, CachedEngine
+from explain import get_explainer
+from shadow import score as shadow_score, shadow_engine
+from warmup import WarmUp
+
+FEATURES_ORDER = PREPROCESSOR.features
+
+
+def get_engine():
+    # Deserialized once per process (shared model registry, keyed by file hash);
+    # LBW_INFERENCE_ENGINE picks sklearn predict_proba or the native booster.
+    # Re-renders / resubmits of an identical feature row skip inference.
+    # With artifacts/lbw_bundle.bin present everything comes from one verified read.
+    # LBW_SHADOW_MODEL_PATH adds a candidate model scored in the background.
+    return shadow_engine(CachedEngine(load_engine(), PREDICTION_CACHE))
 
-# Load once (top of app.py)
-model = joblib.load("artifacts/xgb_model.pkl")
 
-with open("artifacts/features.json") as f:
-    FEATURES_ORDER = json.load(f)
+@st.cache_resource
+def get_warmup():
+    # Once per process, in a background thread while the first form is
+    # being filled in: model load (xgboost / sklearn imports), explainer
+    # build (SHAP), XGBoost threads, pandas categoricals. The first page
+    # renders without waiting for any of it.
+    return WarmUp(load=get_engine).start()
+
+warmup = get_warmup()
 
 # =====================================================
 # APP CONFIG
@@ -46,16 +97,7 @@ st.set_page_config(page_title="LBW Risk – Data Entry", layout="wide")
 st.title("📋 Beneficiary Data Entry Form")
 
 CSV_PATH = "beneficiary_records.csv"
-
-#JSON safe Values
-def make_json_safe(value):
-    if isinstance(value, (datetime, date)):
-        return value.isoformat()
-    if value is None:
-        return ""
-    return value
-
-
+PAGE_SIZE = 20
 
 # =====================================================
 # SESSION: FORM START TIME
@@ -63,26 +105,51 @@ def make_json_safe(value):
 if "form_start_time" not in st.session_state:
     st.session_state.form_start_time = datetime.now()
 
+# Derived features (derived_features.py): kept across reruns, and only
+# the ones whose raw inputs changed are recomputed.
+if "feature_state" not in st.session_state:
+    st.session_state.feature_state = FeatureState()
+derived = st.session_state.feature_state
+
 # =====================================================
-# LOAD EXISTING DATA (EDIT MODE)
+# EXISTING RECORDS (EDIT MODE)
 # =====================================================
-if os.path.exists(CSV_PATH):
-    existing_df = pd.read_csv(CSV_PATH)
-else:
-    existing_df = pd.DataFrame()
+@st.cache_resource
+def get_record_store():
+    store = RecordStore()
+    store.import_csv(CSV_PATH)   # one-off migration of the old CSV
+    return store
+
+record_store = get_record_store()
 
 edit_mode = st.checkbox("✏️ Edit existing beneficiary")
 
-selected_index = None
+selected_id = None
 selected_record = {}
 
-if edit_mode and not existing_df.empty:
-    selected_index = st.selectbox(
-        "Select beneficiary to edit",
-        existing_df.index,
-        format_func=lambda x: f"{existing_df.loc[x, 'Beneficiary Name']} | {existing_df.loc[x, 'Village']}"
+if edit_mode:
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        search_query = st.text_input("Search by name or village")
+    total_matches = record_store.count(search_query)
+    with c2:
+        page = st.number_input(
+            "Page", 1, max(1, math.ceil(total_matches / PAGE_SIZE)), 1
+        )
+
+    matches = record_store.search(
+        search_query, limit=PAGE_SIZE, offset=(page - 1) * PAGE_SIZE
     )
-    selected_record = existing_df.loc[selected_index].to_dict()
+    if matches:
+        labels = {rid: f"{name} | {village}" for rid, name, village, _ in matches}
+        selected_id = st.selectbox(
+            f"Select beneficiary to edit ({total_matches} matches)",
+            list(labels),
+            format_func=labels.get
+        )
+        selected_record = record_store.get(selected_id)
+    else:
+        st.info("No matching beneficiaries.")
 
 def get_val(key, default=None):
     return selected_record.get(key, default) if edit_mode else default
@@ -136,14 +203,8 @@ with c3:
                                value=float(get_val("hb_value", 11)))
 
 # ---- Hb risk bin (DERIVED + DISPLAYED) ----
-if hb_value < 6:
-    measured_HB_risk_bin = "severe_anaemia"
-elif hb_value < 8:
-    measured_HB_risk_bin = "moderate_anaemia"
-elif hb_value < 11:
-    measured_HB_risk_bin = "mild_anaemia"
-else:
-    measured_HB_risk_bin = "normal"
+derived.update(hb_value=hb_value)
+measured_HB_risk_bin = derived["measured_HB_risk_bin"]
 
 st.info(f"🧪 **Measured Hb Risk Category:** {measured_HB_risk_bin}")
 
@@ -175,27 +236,22 @@ with c2:
 # =====================================================
 # ❗ DATE VALIDATIONS (CRITICAL)
 # =====================================================
-today = date.today()
-
-# 1️⃣ Registration date cannot be in the future
-if registration_date > today:
-    st.error("❌ Registration Date cannot be later than today.")
-    st.stop()
-
-# 2️⃣ LMP must be strictly before Registration Date
-if lmp_date >= registration_date:
-    st.error("❌ LMP date must be strictly earlier than Registration Date.")
+# validation.py: every rule is checked and all failures are shown at once
+# - Registration Date cannot be in the future
+# - LMP must be strictly before Registration Date
+date_errors = validate_record(
+    {"lmp_date": lmp_date, "registration_date": registration_date},
+    REGISTRATION_RULES,
+)
+if date_errors:
+    for message in date_errors:
+        st.error(message)
     st.stop()
 
 
-days_gap = (registration_date - lmp_date).days
-registration_bucket = (
-    "Early" if days_gap < 84 else
-    "Mid" if days_gap <= 168 else
-    "Late"
-)
-
-month_conception = lmp_date.strftime("%B")
+derived.update(lmp_date=lmp_date, registration_date=registration_date)
+registration_bucket = derived["RegistrationBucket"]
+month_conception = derived["MonthConception"]
 
 st.info(f"🗓️ **Month of Conception:** {month_conception}")
 
@@ -204,17 +260,11 @@ st.info(f"🗓️ **Month of Conception:** {month_conception}")
 # =====================================================
 st.header("🏥 ANC & Anthropometry (BMI)")
 
-height_m = height_cm / 100 if height_cm else None
-anc = {}
-anc_dates = []
-
-col_left, col_right = st.columns(2)
-
-def anc_block(i, col):
+def anc_block(i, col, anc):
     with col:
         st.subheader(f"ANC {i}")
         done = st.checkbox(f"ANC {i} Completed", key=f"anc_done_{i}")
-        anc[i] = {"done": done, "date": None, "weight": None, "bmi": None}
+        anc[i] = {"done": done, "date": None, "weight": None}
 
         if done:
             anc_date = st.date_input(f"ANC {i} Date", key=f"anc_date_{i}")
@@ -223,63 +273,55 @@ def anc_block(i, col):
                 key=f"anc_weight_{i}"
             )
 
-            if anc_dates and anc_date < anc_dates[-1]:
-                st.error("❌ ANC dates must be chronological")
-                st.stop()
-
-            anc_dates.append(anc_date)
             anc[i]["date"] = anc_date
             anc[i]["weight"] = anc_weight
-            anc[i]["bmi"] = round(anc_weight / (height_m ** 2), 2)
-
-anc_block(1, col_left)
-anc_block(2, col_left)
-anc_block(3, col_right)
-anc_block(4, col_right)
-
-# =====================================================
-# ❗ FINAL ANC DATE VALIDATION (STRICT, NO SAME-DAY)
-# =====================================================
-today = date.today()
-
-# Collect completed ANC dates in order
-anc_dates_ordered = [
-    (i, anc[i]["date"])
-    for i in [1, 2, 3, 4]
-    if anc.get(i, {}).get("done")
-]
-
-# 1️⃣ Global rules: Registration Date ≤ ANC Date ≤ Today
-for i, d in anc_dates_ordered:
-    if d > today:
-        st.error(f"❌ ANC {i} date cannot be later than today.")
-        st.stop()
 
-    if d < registration_date:
-        st.error(
-            f"❌ ANC {i} date cannot be earlier than the Registration Date."
-        )
+@form_section
+def anc_section(height_cm, registration_date):
+    anc = {}
+
+    col_left, col_right = st.columns(2)
+    anc_block(1, col_left, anc)
+    anc_block(2, col_left, anc)
+    anc_block(3, col_right, anc)
+    anc_block(4, col_right, anc)
+
+    # =====================================================
+    # ❗ FINAL ANC DATE VALIDATION (STRICT, NO SAME-DAY)
+    # =====================================================
+    # - Registration Date ≤ ANC Date ≤ Today
+    # - completed ANC dates STRICTLY increasing (no same-day)
+    anc_errors = validate_record(
+        {
+            "registration_date": registration_date,
+            **{f"anc{i}_date": anc[i]["date"] for i in anc},
+        },
+        ANC_RULES,
+    )
+    if anc_errors:
+        for message in anc_errors:
+            st.error(message)
         st.stop()
 
-# 2️⃣ Sequential rules: STRICTLY increasing dates (no same-day)
-for idx in range(1, len(anc_dates_ordered)):
-    prev_i, prev_date = anc_dates_ordered[idx - 1]
-    curr_i, curr_date = anc_dates_ordered[idx]
-
-    if curr_date <= prev_date:
-        st.error(
-            f"❌ ANC {curr_i} date must be later than ANC {prev_i} date "
-            "(same-day ANC is not allowed)."
-        )
-        st.stop()
+    derived.update(
+        height_cm=height_cm,
+        **{f"anc{i}_date": anc[i]["date"] for i in anc},
+        **{f"anc{i}_weight": anc[i]["weight"] for i in anc},
+    )
+    st.caption(
+        f"ANCs completed: {derived['No of ANCs completed']} · "
+        f"ANC bucket: {derived['ANCBucket']} · "
+        f"BMI: {[derived[f'BMI_PW{i}_Prog'] for i in (1, 2, 3, 4)]}"
+    )
 
+anc_section(height_cm, registration_date)
 
-BMI_PW1_Prog = anc[1]["bmi"] if anc[1]["done"] else None
-BMI_PW2_Prog = anc[2]["bmi"] if anc[2]["done"] else None
-BMI_PW3_Prog = anc[3]["bmi"] if anc[3]["done"] else None
-BMI_PW4_Prog = anc[4]["bmi"] if anc[4]["done"] else None
+BMI_PW1_Prog = derived["BMI_PW1_Prog"]
+BMI_PW2_Prog = derived["BMI_PW2_Prog"]
+BMI_PW3_Prog = derived["BMI_PW3_Prog"]
+BMI_PW4_Prog = derived["BMI_PW4_Prog"]
 
-anc_completed = sum(1 for a in anc.values() if a["done"])
+anc_completed = derived["No of ANCs completed"]
 
 #TT Injection 
 
@@ -296,17 +338,8 @@ tt_label = st.selectbox(
 
 tt_given = TT_MAP[tt_label]
 
-valid_dates = [a["date"] for a in anc.values() if a["done"]]
-ANCBucket, counselling_gap_days = None, None
-
-if valid_dates:
-    first_anc = min(valid_dates)
-    gap = (first_anc - lmp_date).days
-    ANCBucket = "Early" if gap < 84 else "Mid" if gap <= 168 else "Late"
-
-if len(valid_dates) >= 2:
-    valid_dates.sort()
-    counselling_gap_days = (valid_dates[1] - valid_dates[0]).days
+ANCBucket = derived["ANCBucket"]
+counselling_gap_days = derived["counselling_gap_days"]
 
 # =====================================================
 # 🚬 TOBACCO & ALCOHOL
@@ -351,8 +384,9 @@ st.header("🥗 Nutrition")
 ifa_tabs = st.number_input("IFA tablets last month", min_value=0)
 calcium_tabs = st.number_input("Calcium tablets last month", min_value=0)
 
-ifa_tabs_log1p = round(math.log1p(ifa_tabs), 4)
-calcium_tabs_log1p = round(math.log1p(calcium_tabs), 4)
+derived.update(ifa_tabs=ifa_tabs, calcium_tabs=calcium_tabs)
+ifa_tabs_log1p = derived["No. of IFA tablets received/procured in last one month_log1p"]
+calcium_tabs_log1p = derived["No. of calcium tablets consumed in last one month_log1p"]
 
 food_group = st.selectbox("Food groups consumed", [0,1,2,3,4,5,6,7,8,9,10])
 
@@ -384,29 +418,20 @@ education_clean = st.selectbox(
 # =====================================================
 st.header("🏠 Household Assets")
 
-ASSET_WEIGHTS = {
-    "Electricity": 1.0, "Mattress": 0.5, "Pressure Cooker": 0.5,
-    "Chair": 0.5, "Cot/Bed": 0.5, "Table": 0.5,
-    "Electric Fan": 0.75, "Radio/Transistor": 0.5,
-    "B&W Television": 0.5, "Color Television": 1.0,
-    "Sewing Machine": 0.75, "Mobile Telephone": 1.0,
-    "Internet": 1.25, "Computer": 1.25,
-    "Refrigerator": 1.25, "Air Conditioner/Cooler": 1.25,
-    "Washing Machine": 1.25, "Bicycle": 0.5,
-    "Motorcycle/Scooter": 1.0, "Car": 1.5,
-    "Water Pump": 0.75, "Animal": 0.5,
-    "Tractor": 1.25, "Thresher": 0.75
-}
+@form_section
+def assets_section():
+    household_assets = []
+    cols = st.columns(3)
+    for i, asset in enumerate(ASSET_WEIGHTS):
+        with cols[i % 3]:
+            if st.checkbox(asset):
+                household_assets.append(asset)
 
-raw_asset_score = 0
-cols = st.columns(3)
-for i, (asset, wt) in enumerate(ASSET_WEIGHTS.items()):
-    with cols[i % 3]:
-        if st.checkbox(asset):
-            raw_asset_score += wt
+    derived.update(household_assets=household_assets)
+    st.info(f"🏠 Household Assets Score (log1p): **{derived['Household_Assets_Score_log1p']}**")
 
-Household_Assets_Score_log1p = round(math.log1p(raw_asset_score), 4)
-st.info(f"🏠 Household Assets Score (log1p): **{Household_Assets_Score_log1p}**")
+assets_section()
+Household_Assets_Score_log1p = derived["Household_Assets_Score_log1p"]
 
 # =====================================================
 # 📱 DIGITAL ACCESS & SOCIAL MEDIA
@@ -424,24 +449,14 @@ if "Other" in social_media_selected:
     if other_input:
         other_social_media = [x.strip() for x in other_input.split(",") if x.strip()]
 
-# ---- Derive counts ----
-explicit_count = len([x for x in social_media_selected if x != "Other"])
-total_count = explicit_count + len(other_social_media)
+social_media = [x for x in social_media_selected if x != "Other"] + other_social_media
 
 # ---- MODEL VARIABLE ----
-if total_count == 0:
-    Social_Media_Category = "None"
-elif total_count == 1:
-    Social_Media_Category = "Low"
-elif total_count <= 3:
-    Social_Media_Category = "Medium"
-else:
-    Social_Media_Category = "High"
+derived.update(social_media=social_media)
+Social_Media_Category = derived["Social_Media_Category"]
 
 # ---- RAW DETAIL VARIABLE ----
-Type_of_Social_Media_Enrolled_In = ",".join(
-    [x for x in social_media_selected if x != "Other"] + other_social_media
-)
+Type_of_Social_Media_Enrolled_In = ",".join(social_media)
 
 
 # =====================================================
@@ -468,9 +483,10 @@ if pmmvy_inst >= 1 and pmmvy_inst != 98:
 if pmmvy_inst >= 2 and pmmvy_inst != 98:
     pmmvy_inst2_date = st.date_input("PMMVY Installment 2 Date")
 
-LMPtoINST1 = (pmmvy_inst1_date - lmp_date).days if pmmvy_inst1_date else None
-LMPtoINST2 = (pmmvy_inst2_date - lmp_date).days if pmmvy_inst2_date else None
-LMPtoINST3 = None
+derived.update(pmmvy_inst1_date=pmmvy_inst1_date, pmmvy_inst2_date=pmmvy_inst2_date)
+LMPtoINST1 = derived["LMPtoINST1"]
+LMPtoINST2 = derived["LMPtoINST2"]
+LMPtoINST3 = derived["LMPtoINST3"]
 
 # =====================================================
 # ✅ PREDICT BUTTON
@@ -478,6 +494,14 @@ LMPtoINST3 = None
 if st.button("Predict Score"):
 
     form_end_time = datetime.now()
+    trace = Trace("form_submit")
+    trace.record("rerun", (time.perf_counter() - SCRIPT_STARTED) * 1000)
+    with trace.stage("warmup_wait"):
+        warmup.wait()   # no-op unless Predict is clicked right after a deploy
+    engine = warmup.loaded
+    if engine is None:
+        st.error(f"❌ Model could not be loaded: {warmup.error}")
+        st.stop()
 
     # -------------------------
     # 1️⃣ BUILD RECORD (unchanged)
@@ -543,19 +567,28 @@ if st.button("Predict Score"):
     # -------------------------
     # 2️⃣ MODEL INPUT
     # -------------------------
-    X_raw = pd.DataFrame(
-        [{k: model_record.get(k, None) for k in FEATURES_ORDER}]
-    ).replace({None: np.nan})
+    with trace.stage("build_record"):
+        X_raw = pd.DataFrame(
+            [{k: model_record.get(k, None) for k in FEATURES_ORDER}]
+        ).replace({None: np.nan})
 
     # -------------------------
     # 3️⃣ PREPROCESS (CRITICAL)
     # -------------------------
-    X_processed = preprocess_for_model(X_raw)
+    with trace.stage("preprocess"):
+        X_processed = PREPROCESSOR.transform(X_raw)
 
     # -------------------------
     # 4️⃣ PREDICTION
     # -------------------------
-    lbw_prob = float(model.predict_proba(X_processed)[0][1])
+    with trace.stage("predict"):
+        # served model inline; a shadow candidate (if any) runs in the background.
+        # The A/B arm is keyed on the beneficiary, so repeat visits get the same arm.
+        beneficiary_key = "|".join(
+            str(v).strip().lower() for v in (state, district, block, village, beneficiary_name)
+        )
+        shadow_run = shadow_score(engine, X_processed, keys=[beneficiary_key])
+        lbw_prob = float(shadow_run.probs[0])
     lbw_percent = round(lbw_prob * 100, 2)
 
     # Risk categorisation
@@ -596,6 +629,18 @@ if st.button("Predict Score"):
 
     st.metric("Predicted LBW Risk", f"{lbw_percent}%")
 
+    # -------------------------
+    # 🔍 EXPLANATION (cached TreeExplainer, one call)
+    # -------------------------
+    with trace.stage("explain"):
+        explainer = get_explainer(engine)
+        top_features = explainer.top_features(explainer.explain(X_processed)[0], k=5)
+    with st.expander("🔍 What drove this score?"):
+        st.dataframe(
+            pd.DataFrame(top_features, columns=["Feature", "SHAP (log-odds)"]),
+            hide_index=True
+        )
+
     
 
     # -------------------------
@@ -605,30 +650,45 @@ if st.button("Predict Score"):
     **full_record,
     **model_record,
     "lbw_prob": lbw_prob,
-    "lbw_percent": lbw_percent
+    "lbw_percent": lbw_percent,
+    **shadow_run.audit_columns(),   # both probabilities when a candidate is configured
+    **(trace.audit_columns() if TRACE_AUDIT_COLUMNS else {}),
     }
 
 
-    worksheet = get_gsheet("12qNktlRnQHFHujGwnCX15YW1UsQHtMzgNyRWzq1Qbsc")
+    # Local record store (edit mode overwrites the selected record)
+    with trace.stage("save_local"):
+        record_store.save(final_record, selected_id)
+
     # =========================
-    # SAVE TO GOOGLE SHEETS (SAFE WAY)
+    # SAVE TO GOOGLE SHEETS (WRITE-BEHIND)
     # =========================
+    # Local insert only; aligned to the sheet header when flushed.
+    with trace.stage("enqueue"):
+        outbox = get_outbox()
+        outbox.enqueue(final_record)
 
-    # 1️⃣ Read sheet header
-    sheet_headers = worksheet.row_values(1)
-
-    # 2️⃣ Align record with header
-    row_to_append = []
-    for col in sheet_headers:
-        value = final_record.get(col, "")
-        row_to_append.append(make_json_safe(value))
+    st.success("✅ Saved & Predicted Successfully")
 
-    # 3️⃣ Append aligned row
-    worksheet.append_row(
-        row_to_append,
-        value_input_option="USER_ENTERED"
+    sync = get_sheet_sink().stats
+    st.caption(
+        f"Sheets sync: {sync['rows_written']} rows in {sync['api_calls']} API calls "
+        f"({sync['rows_per_call']} rows/call), {outbox.pending()} pending"
     )
-    
-    st.success("✅ Saved & Predicted Successfully")
- 
+    st.caption("⏱ " + " · ".join(f"{k} {v:.1f} ms" for k, v in trace.stages.items()))
 
+# =====================================================
+# ⏱ RERUN TIMING (full script vs last fragment-only reruns)
+# =====================================================
+script_ms = (time.perf_counter() - SCRIPT_STARTED) * 1000
+Trace(RERUN_TRACE).record("script", script_ms)
+# one sidebar element: every element costs a little on each full rerun
+warmup_status = (
+    f"🔥 Model warm-up {warmup.seconds:.2f} s" if warmup.ready
+    else "🔥 Model warming up…" if not warmup.wait(0)
+    else f"⚠️ Model warm-up failed: {warmup.error}"
+)
+st.sidebar.caption(
+    f"{warmup_status}  \n⏱ Full rerun {script_ms:.0f} ms · sections: "
+    + ", ".join(f"{k} {v:.0f} ms" for k, v in st.session_state.get("rerun_ms", {}).items())
+)
@@ -1,49 +1,40 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import json
-import joblib
-import math
 from datetime import datetime, date
 
 # =========================
 # GOOGLE SHEETS
 # =========================
-import gspread
-from google.oauth2.service_account import Credentials
-
-GSHEET_ID = "12qNktlRnQHFHujGwnCX15YW1UsQHtMzgNyRWzq1Qbsc"
-GSHEET_WORKSHEET = "LBWScores"
-
-def get_gsheet():
-    creds = Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"],
-        scopes=[
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
-    )
-    client = gspread.authorize(creds)
-    return client.open_by_key(GSHEET_ID).worksheet(GSHEET_WORKSHEET)
+from gsheets import SheetBatchSink, get_sheet_pool, service_account_client_factory
+from write_behind import WriteBehindQueue
 
 
-def make_json_safe(v):
-    if isinstance(v, (datetime, date)):
-        return v.isoformat()
-    if v is None or (isinstance(v, float) and np.isnan(v)):
-        return ""
-    return v
+@st.cache_resource
+def get_outbox():
+    # same outbox as app.py (see write_behind.py)
+    pool = get_sheet_pool(
+        service_account_client_factory(st.secrets["gcp_service_account"])
+    )
+    return WriteBehindQueue(SheetBatchSink(pool).write).start()
 
 
 # =========================
 # LOAD MODEL & ARTIFACTS
 # =========================
-from preprocessing import preprocess_for_model
+from derived_features import ASSET_WEIGHTS, FeatureState
+from inference import load_engine
+from preprocessing import PREPROCESSOR
+from warmup import WarmUp
+
+FEATURES_ORDER = PREPROCESSOR.features
 
-model = joblib.load("artifacts/xgb_model.pkl")
 
-with open("artifacts/features.json") as f:
-    FEATURES_ORDER = json.load(f)
+@st.cache_resource
+def get_warmup():
+    # model load + warm-up in the background (same as app.py)
+    return WarmUp(load=load_engine).start()
+
+warmup = get_warmup()
 
 
 # =========================
@@ -92,24 +83,27 @@ with c2:
 with c3:
     living_children = st.number_input("Number of living child at now", 0, 10, 0)
 
-month_conception = st.selectbox(
-    "MonthConception",
-    ["January","February","March","April","May","June",
-     "July","August","September","October","November","December"]
-)
+c1, c2 = st.columns(2)
+with c1:
+    lmp_date = st.date_input("Last Menstrual Period (LMP)", date.today())
+with c2:
+    registration_date = st.date_input("Registration Date", date.today())
 
 hb_value = st.number_input("Measured Hb (g/dL)", 3.0, 18.0, 11.0)
 
-if hb_value < 6:
-    measured_HB_risk_bin = "severe_anaemia"
-elif hb_value < 8:
-    measured_HB_risk_bin = "moderate_anaemia"
-elif hb_value < 11:
-    measured_HB_risk_bin = "mild_anaemia"
-else:
-    measured_HB_risk_bin = "normal"
+# Everything below is derived from raw inputs (derived_features.py);
+# only features whose inputs changed are recomputed on a rerun.
+if "feature_state" not in st.session_state:
+    st.session_state.feature_state = FeatureState()
+derived = st.session_state.feature_state
 
-st.info(f"🧪 Hb Category: **{measured_HB_risk_bin}**")
+derived.update(hb_value=hb_value, lmp_date=lmp_date, registration_date=registration_date)
+
+st.info(
+    f"🧪 Hb Category: **{derived['measured_HB_risk_bin']}** · "
+    f"MonthConception: **{derived['MonthConception']}** · "
+    f"RegistrationBucket: **{derived['RegistrationBucket']}**"
+)
 
 
 # =========================
@@ -118,19 +112,26 @@ st.info(f"🧪 Hb Category: **{measured_HB_risk_bin}**")
 st.header("🏥 ANC & BMI")
 
 height_cm = st.number_input("Height (cm)", 120.0, 200.0, 150.0)
-height_m = height_cm / 100
 
-BMI_PW1_Prog = st.number_input("BMI PW1", value=np.nan)
-BMI_PW2_Prog = st.number_input("BMI PW2", value=np.nan)
-BMI_PW3_Prog = st.number_input("BMI PW3", value=np.nan)
-BMI_PW4_Prog = st.number_input("BMI PW4", value=np.nan)
-
-anc_completed = st.number_input("No of ANCs completed", 0, 6, 0)
-
-ANCBucket = st.selectbox("ANCBucket", ["Early", "Mid", "Late"])
-RegistrationBucket = st.selectbox("RegistrationBucket", ["Early", "Mid", "Late"])
-
-counselling_gap_days = st.number_input("Counselling gap days", value=np.nan)
+anc_inputs = {"height_cm": height_cm}
+cols = st.columns(4)
+for i, col in enumerate(cols, start=1):
+    with col:
+        done = st.checkbox(f"ANC {i} done", key=f"anc_done_{i}")
+        anc_inputs[f"anc{i}_date"] = (
+            st.date_input(f"ANC {i} date", key=f"anc_date_{i}") if done else None
+        )
+        anc_inputs[f"anc{i}_weight"] = (
+            st.number_input(f"ANC {i} weight (kg)", 30.0, 120.0, key=f"anc_weight_{i}")
+            if done else None
+        )
+
+derived.update(**anc_inputs)
+st.info(
+    f"ANCs completed: **{derived['No of ANCs completed']}** · "
+    f"ANCBucket: **{derived['ANCBucket']}** · "
+    f"Counselling gap: **{derived['counselling_gap_days']}** days"
+)
 
 tt_given = st.selectbox(
     "TT Injection given",
@@ -147,8 +148,7 @@ st.header("🥗 Nutrition")
 ifa_tabs = st.number_input("IFA tablets last month", 0)
 calcium_tabs = st.number_input("Calcium tablets last month", 0)
 
-ifa_tabs_log1p = round(math.log1p(ifa_tabs), 4)
-calcium_tabs_log1p = round(math.log1p(calcium_tabs), 4)
+derived.update(ifa_tabs=ifa_tabs, calcium_tabs=calcium_tabs)
 
 Food_Groups_Category = st.selectbox("Food Groups Category", [0,1,2,3,4,5])
 
@@ -179,9 +179,9 @@ education_clean = st.selectbox(
      "Secondary (9–12)","Graduate & above"]
 )
 
-Household_Assets_Score_log1p = st.number_input(
-    "Household Assets Score (log1p)", value=0.0
-)
+household_assets = st.multiselect("Household assets", list(ASSET_WEIGHTS))
+derived.update(household_assets=household_assets)
+st.info(f"🏠 Household Assets Score (log1p): **{derived['Household_Assets_Score_log1p']}**")
 
 
 # =========================
@@ -189,14 +189,11 @@ Household_Assets_Score_log1p = st.number_input(
 # =========================
 st.header("📱 Social Media")
 
-Social_Media_Category = st.selectbox(
-    "Social Media Category",
-    ["None","Low","Medium","High"]
-)
-
 Type_of_Social_Media_Enrolled_In = st.text_input(
-    "Type of Social Media Enrolled In"
+    "Type of Social Media Enrolled In (comma-separated)"
 )
+derived.update(social_media=Type_of_Social_Media_Enrolled_In)
+st.info(f"📱 Social Media Category: **{derived['Social_Media_Category']}**")
 
 
 # =========================
@@ -210,9 +207,13 @@ rajhsri_reg = st.selectbox("Registered for RAJHSRI", ["No","Yes"])
 pmmvy_inst = st.number_input("PMMVY installments", 0, 3, 0)
 jsy_inst = st.number_input("JSY installments", 0, 3, 0)
 
-LMPtoINST1 = st.number_input("LMPtoINST1", value=np.nan)
-LMPtoINST2 = st.number_input("LMPtoINST2", value=np.nan)
-LMPtoINST3 = st.number_input("LMPtoINST3", value=np.nan)
+derived.update(**{
+    f"pmmvy_inst{i}_date": (
+        st.date_input(f"PMMVY installment {i} date", key=f"pmmvy_date_{i}")
+        if pmmvy_inst >= i else None
+    )
+    for i in (1, 2, 3)
+})
 
 
 # =========================
@@ -220,6 +221,11 @@ LMPtoINST3 = st.number_input("LMPtoINST3", value=np.nan)
 # =========================
 if st.button("Predict Score"):
     form_end_time = datetime.now()
+    warmup.wait()
+    engine = warmup.loaded
+    if engine is None:
+        st.error(f"❌ Model could not be loaded: {warmup.error}")
+        st.stop()
 
     record = {
         # Identification
@@ -228,41 +234,29 @@ if st.button("Predict Score"):
         "District": district,
         "Block": block,
         "Village": village,
+        "LMP": lmp_date.isoformat(),
+        "Registration Date": registration_date.isoformat(),
 
-        # Model features
+        # Model features (entered)
         "Beneficiary age": beneficiary_age,
-        "measured_HB_risk_bin": measured_HB_risk_bin,
         "Child order/parity": parity,
         "Number of living child at now": living_children,
-        "MonthConception": month_conception,
-        "BMI_PW1_Prog": BMI_PW1_Prog,
-        "BMI_PW2_Prog": BMI_PW2_Prog,
-        "BMI_PW3_Prog": BMI_PW3_Prog,
-        "BMI_PW4_Prog": BMI_PW4_Prog,
         "consume_tobacco": None,
         "Status of current chewing of tobacco": None,
         "consume_alcohol": None,
-        "RegistrationBucket": RegistrationBucket,
-        "counselling_gap_days": counselling_gap_days,
-        "ANCBucket": ANCBucket,
-        "LMPtoINST1": LMPtoINST1,
-        "LMPtoINST2": LMPtoINST2,
-        "LMPtoINST3": LMPtoINST3,
-        "No of ANCs completed": anc_completed,
         "Service received during last ANC: TT Injection given": tt_given,
-        "No. of IFA tablets received/procured in last one month_log1p": ifa_tabs_log1p,
-        "No. of calcium tablets consumed in last one month_log1p": calcium_tabs_log1p,
         "Food_Groups_Category": Food_Groups_Category,
-        "Household_Assets_Score_log1p": Household_Assets_Score_log1p,
         "toilet_type_clean": toilet_type_clean,
         "water_source_clean": water_source_clean,
         "education_clean": education_clean,
-        "Social_Media_Category": Social_Media_Category,
         "Registered for cash transfer scheme: JSY": jsy_reg,
         "Registered for cash transfer scheme: RAJHSRI": rajhsri_reg,
         "PMMVY-Number of installment received": pmmvy_inst,
         "JSY-Number of installment received": jsy_inst,
 
+        # Model features (derived)
+        **derived.derived,
+
         # Audit
         "Type of Social Media Enrolled In": Type_of_Social_Media_Enrolled_In,
         "form_start_time": st.session_state.form_start_time.isoformat(),
@@ -274,9 +268,8 @@ if st.button("Predict Score"):
 
     # Model input
     X_raw = pd.DataFrame([{k: record.get(k, None) for k in FEATURES_ORDER}])
-    X_processed = preprocess_for_model(X_raw)
 
-    lbw_prob = float(model.predict_proba(X_processed)[0][1])
+    lbw_prob = float(engine.predict_frame(X_raw)[0])
     lbw_percent = round(lbw_prob * 100, 2)
 
     record["lbw_prob"] = lbw_prob
@@ -291,10 +284,7 @@ if st.button("Predict Score"):
 
     st.metric("Predicted LBW Risk", f"{lbw_percent}%")
 
-    # Save to Google Sheet
-    worksheet = get_gsheet()
-    headers = [h.strip() for h in worksheet.row_values(1)]
-    row = [make_json_safe(record.get(h, "")) for h in headers]
-    worksheet.append_row(row, value_input_option="USER_ENTERED")
+    # Save to Google Sheet (queued, flushed in the background)
+    get_outbox().enqueue(record)
 
     st.success("✅ Saved & Predicted Successfully")
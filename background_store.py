@@ -0,0 +1,151 @@
+# background_store.py
+"""
+Background sample, preprocessed ONCE into a typed float32 array that
+explainers and drift checks memory-map instead of re-parsing the CSV.
+
+    python background_store.py            # (re)build from background.csv
+
+Writes next to the CSV:
+- background.npy          (n_rows, n_features) float32, category codes
+- background_stats.json   per-feature summary statistics + CSV hash
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from preprocessing import ARTIFACTS_DIR, BUNDLE, PREPROCESSOR
+
+BACKGROUND_CSV = ARTIFACTS_DIR / "background.csv"
+BACKGROUND_NPY = ARTIFACTS_DIR / "background.npy"
+BACKGROUND_STATS = ARTIFACTS_DIR / "background_stats.json"
+
+
+def _sha256(path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _replace_atomically(path, write):
+    """write(f) into a temp file next to `path`, then rename it over `path`
+    (a worker mapping the old file never sees a half-written one)."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def summarize(X: np.ndarray, preprocessor=PREPROCESSOR) -> dict:
+    """Per-feature statistics of a preprocessed matrix."""
+    stats = {}
+    categorical = {i: col for i, col, _, _ in preprocessor.categorical}
+
+    for i, col in enumerate(preprocessor.features):
+        values = X[:, i].astype(np.float64)
+        present = values[~np.isnan(values)]
+        entry = {"missing_rate": float(1 - present.size / max(len(values), 1))}
+
+        if i in categorical:
+            counts = np.bincount(
+                present.astype(np.int64), minlength=len(preprocessor.categories[col])
+            )
+            entry["frequencies"] = {
+                str(cat): float(n / max(present.size, 1))
+                for cat, n in zip(preprocessor.categories[col], counts)
+            }
+        elif present.size:
+            entry.update({
+                "mean": float(present.mean()),
+                "std": float(present.std()),
+                "min": float(present.min()),
+                "p50": float(np.median(present)),
+                "max": float(present.max()),
+            })
+        stats[col] = entry
+
+    return stats
+
+
+def build(csv_path=BACKGROUND_CSV, npy_path=BACKGROUND_NPY, stats_path=BACKGROUND_STATS) -> dict:
+    X = PREPROCESSOR.transform(pd.read_csv(csv_path))
+    _replace_atomically(npy_path, lambda f: np.save(f, np.ascontiguousarray(X, dtype=np.float32)))
+
+    meta = {
+        "source": str(csv_path),
+        "source_sha256": _sha256(csv_path),
+        "n_rows": int(X.shape[0]),
+        "features": PREPROCESSOR.features,
+        "features_stats": summarize(X),
+    }
+    _replace_atomically(stats_path, lambda f: f.write(json.dumps(meta, indent=2).encode()))
+    return meta
+
+
+def load_stats(stats_path=BACKGROUND_STATS) -> dict:
+    with open(stats_path) as f:
+        return json.load(f)
+
+
+def load_background(
+    npy_path=BACKGROUND_NPY,
+    stats_path=BACKGROUND_STATS,
+    csv_path=BACKGROUND_CSV,
+    max_rows=None,
+) -> np.ndarray:
+    """
+    Read-only memory-mapped background matrix (no parsing, no copy; the
+    page cache is shared by every worker process). Rebuilt first if
+    missing or if background.csv / the feature list changed.
+
+    With an artifact bundle loaded, its preprocessed background is
+    memory-mapped from the bundle file the same way.
+    """
+    if BUNDLE is not None and npy_path == BACKGROUND_NPY:
+        X = BUNDLE.background
+        return X[:max_rows] if max_rows else X
+
+    fresh = Path(npy_path).exists() and Path(stats_path).exists()
+    if fresh:
+        meta = load_stats(stats_path)
+        fresh = meta["features"] == PREPROCESSOR.features and (
+            not Path(csv_path).exists() or meta["source_sha256"] == _sha256(csv_path)
+        )
+    if not fresh:
+        build(csv_path, npy_path, stats_path)
+
+    X = np.load(npy_path, mmap_mode="r")
+    return X[:max_rows] if max_rows else X
+
+
+def drift_report(X: np.ndarray, stats: dict = None, preprocessor=PREPROCESSOR) -> dict:
+    """
+    Batch vs background, per feature:
+    - numeric:     standardized mean shift |mean - bg_mean| / bg_std
+    - categorical: total variation distance between category frequencies
+    """
+    stats = stats or load_stats()["features_stats"]
+    batch = summarize(X, preprocessor)
+    report = {}
+
+    for col, bg in stats.items():
+        cur = batch[col]
+        if "frequencies" in bg:
+            report[col] = 0.5 * sum(
+                abs(cur["frequencies"].get(k, 0.0) - v) for k, v in bg["frequencies"].items()
+            )
+        elif "mean" in bg and "mean" in cur:
+            report[col] = abs(cur["mean"] - bg["mean"]) / bg["std"] if bg["std"] else 0.0
+    return report
+
+
+if __name__ == "__main__":
+    meta = build()
+    print(f"✅ {meta['n_rows']} background rows -> {BACKGROUND_NPY}, {BACKGROUND_STATS}")
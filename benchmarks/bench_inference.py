@@ -0,0 +1,83 @@
+# benchmarks/bench_inference.py
+"""
+Single-row latency (p50 / p99) and batch throughput of each inference
+engine, on rows from artifacts/background.csv.
+
+    python benchmarks/bench_inference.py --repeats 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+import numpy as np
+import pandas as pd
+
+from inference import build_engine
+from model_registry import MODEL_PATH, REGISTRY
+
+
+def percentiles_us(samples):
+    samples = np.asarray(samples) * 1e6
+    return {
+        "p50_us": round(float(np.percentile(samples, 50)), 1),
+        "p99_us": round(float(np.percentile(samples, 99)), 1),
+        "mean_us": round(float(samples.mean()), 1),
+    }
+
+
+def bench_engine(engine, records, X_raw, repeats):
+    # warm up (lazy init / thread pools)
+    engine.predict_records(records[:1])
+    engine.predict_frame(X_raw)
+
+    single = []
+    for i in range(repeats):
+        record = records[i % len(records)]
+        t0 = time.perf_counter()
+        engine.predict_records([record])
+        single.append(time.perf_counter() - t0)
+
+    batch = []
+    for _ in range(max(1, repeats // 100)):
+        t0 = time.perf_counter()
+        engine.predict_frame(X_raw)
+        batch.append(time.perf_counter() - t0)
+
+    return {
+        "single_row": percentiles_us(single),
+        "batch_rows": len(X_raw),
+        "batch_rows_per_sec": round(len(X_raw) / float(np.median(batch)), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--engines", default="sklearn,booster")
+    parser.add_argument("--repeats", type=int, default=1000)
+    args = parser.parse_args()
+
+    X_raw = pd.read_csv("artifacts/background.csv")
+    records = X_raw.astype(object).where(X_raw.notna(), None).to_dict(orient="records")
+    entry = REGISTRY.register("production", args.model)
+
+    results = {
+        "model_sha256": entry.sha256,
+        "repeats": args.repeats,
+        "engines": {
+            name: bench_engine(build_engine(entry, name), records, X_raw, args.repeats)
+            for name in args.engines.split(",")
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# benchmarks/bench_reruns.py
+"""
+Streamlit rerun cost of app.py when one asset checkbox / ANC field changes.
+
+    python benchmarks/bench_reruns.py --toggles 30
+    python benchmarks/bench_reruns.py --baseline ""     # current app only
+
+Reports, per widget:
+- baseline_rerun_ms  full rerun of the app.py from the --baseline commit
+                     (default: the parent of the first "[user-001]"
+                     commit in git log, i.e. the original form), run in
+                     its own interpreter from a `git archive` checkout;
+                     i.e. what every widget change cost before
+- full_rerun_ms      full rerun of the current app.py (AppTest always
+                     reruns the whole script, fragments included)
+- fragment_ms        the section's own body, i.e. what a fragment-only
+                     rerun costs in a live session (from the tracing
+                     histograms)
+
+Both apps are measured the way a live session sees them: after the
+model warm-up thread has finished (it competes for the GIL while it
+imports SHAP / XGBoost), and with the script compiled once (AppTest
+recompiles it on every run; the server caches the bytecode).
+"""
+import argparse
+import datetime
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "app.py"
+FIRST_REQUEST = "[user-001]"
+
+WIDGETS = {
+    "asset_checkbox": (lambda a: next(c for c in a.checkbox if c.label == "Electricity"), "assets_section"),
+    "anc_checkbox": (lambda a: a.checkbox(key="anc_done_1"), "anc_section"),
+}
+
+
+def baseline_rev() -> str:
+    """The commit before the first backlog change (its subject starts with FIRST_REQUEST)."""
+    log = subprocess.run(
+        ["git", "log", "--reverse", "--format=%H %s"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    for line in log.splitlines():
+        sha, _, subject = line.partition(" ")
+        if subject.startswith(FIRST_REQUEST):
+            return subprocess.run(
+                ["git", "rev-parse", "--short", f"{sha}^"],
+                cwd=ROOT, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+    raise SystemExit(f"❌ No {FIRST_REQUEST} commit in git log; pass --baseline <rev>")
+
+
+def _compile_once():
+    """Share one ScriptCache across AppTest runs, like a live server."""
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+
+    cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: cache
+
+
+def _wait_for_warmup(at, timeout=120):
+    """Rerun until the sidebar no longer says the model is warming up."""
+    deadline = time.monotonic() + timeout
+    while any("warming up" in c.value for c in at.sidebar.caption):
+        if time.monotonic() > deadline:
+            raise RuntimeError("❌ Model warm-up did not finish")
+        time.sleep(0.5)
+        at.run()
+
+
+def _fragment_totals(stage):
+    import tracing
+
+    for hist in tracing.histograms():
+        if hist.labels == {"trace": "streamlit_rerun", "stage": stage}:
+            snap = hist.snapshot()
+            return snap["sum"], snap["count"]
+    return 0.0, 0
+
+
+def bench_widget(at, find, stage, toggles, fragments=True):
+    full = []
+    if fragments:
+        sum0, count0 = _fragment_totals(stage)
+    for i in range(toggles):
+        widget = find(at)
+        t0 = time.perf_counter()
+        widget.set_value(i % 2 == 0).run()
+        full.append((time.perf_counter() - t0) * 1000)
+
+    result = {
+        "full_rerun_ms": {
+            "p50": round(float(np.percentile(full, 50)), 2),
+            "min": round(float(np.min(full)), 2),
+        },
+    }
+    if fragments:
+        sum1, count1 = _fragment_totals(stage)
+        result["fragment_ms"] = {"mean": round((sum1 - sum0) / max(count1 - count0, 1), 2)}
+    return result
+
+
+def measure(app, toggles, fragments=True) -> dict:
+    """Toggle each widget of `app` (run from its own directory) `toggles` times."""
+    from streamlit.testing.v1 import AppTest
+
+    app = Path(app).resolve()
+    sys.path.insert(0, str(app.parent))
+    os.chdir(app.parent)
+    _compile_once()
+
+    at = AppTest.from_file(str(app), default_timeout=120).run()
+    # past the LMP < Registration Date check, so the whole form renders
+    at.date_input[0].set_value(datetime.date.today() - datetime.timedelta(days=100)).run()
+    _wait_for_warmup(at)
+
+    return {
+        name: bench_widget(at, find, stage, toggles, fragments)
+        for name, (find, stage) in WIDGETS.items()
+    }
+
+
+def measure_baseline(rev, toggles) -> dict:
+    """measure() on `rev`'s app.py in a fresh interpreter (its own modules, not this tree's)."""
+    with tempfile.TemporaryDirectory(prefix="lbw-baseline-") as tmp:
+        archive = subprocess.run(
+            ["git", "archive", "--format=tar", rev],
+            cwd=ROOT, capture_output=True, check=True,
+        ).stdout
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(tmp, filter="data")
+
+        # untracked artifacts (the model pickle) come from this tree
+        artifacts = Path(tmp) / "artifacts"
+        artifacts.mkdir(exist_ok=True)
+        for path in (ROOT / "artifacts").iterdir():
+            if path.is_file() and not (artifacts / path.name).exists():
+                (artifacts / path.name).symlink_to(path)
+
+        proc = subprocess.run(
+            [
+                sys.executable, __file__, "--app", str(Path(tmp) / "app.py"),
+                "--toggles", str(toggles), "--baseline", "", "--no-fragments",
+            ],
+            capture_output=True, text=True,
+        )
+        if proc.returncode:
+            raise RuntimeError(f"❌ Baseline app ({rev}) failed:\n{proc.stderr[-2000:]}")
+        return json.loads(proc.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--toggles", type=int, default=30)
+    parser.add_argument("--app", default=str(APP))
+    parser.add_argument("--baseline", default=None,
+                        help="git revision whose app.py is the 'before' ('' to skip; "
+                             f"default: the parent of the first {FIRST_REQUEST} commit)")
+    parser.add_argument("--no-fragments", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    logging.disable(logging.WARNING)
+
+    if args.baseline is None:
+        args.baseline = baseline_rev()
+    baseline = measure_baseline(args.baseline, args.toggles) if args.baseline else None
+    results = measure(args.app, args.toggles, fragments=not args.no_fragments)
+    if baseline is not None:
+        for name, result in results.items():
+            result["baseline_rerun_ms"] = baseline[name]["full_rerun_ms"]
+            result["baseline_rev"] = args.baseline
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
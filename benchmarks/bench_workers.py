@@ -0,0 +1,126 @@
+# benchmarks/bench_workers.py
+"""
+Load test of serve.py: requests/sec of POST /predict as the number of
+pre-forked workers grows, with synthetic rows in the 32-feature
+FEATURES_ORDER schema.
+
+    python benchmarks/bench_workers.py --workers 1,2,4,8 --duration 10
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+import numpy as np
+import requests
+
+from synthetic import synthetic_records
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url, workers=1, timeout=120.0):
+    """Until /ready answers 200 several times in a row (any worker may answer)."""
+    deadline = time.monotonic() + timeout
+    streak = 0
+    while time.monotonic() < deadline:
+        try:
+            streak = streak + 1 if requests.get(f"{url}/ready", timeout=1).ok else 0
+        except requests.RequestException:
+            streak = 0
+        if streak >= 4 * workers:
+            return
+        time.sleep(0.05 if streak else 0.2)
+    raise RuntimeError(f"server at {url} did not become ready")
+
+
+def _client(url, payloads, duration):
+    """One client process: send requests back-to-back for `duration` seconds."""
+    session = requests.Session()
+    latencies = []
+    i = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        r = session.post(f"{url}/predict", data=payloads[i % len(payloads)],
+                         headers={"Content-Type": "application/json"})
+        r.raise_for_status()
+        latencies.append(time.perf_counter() - t0)
+        i += 1
+    return latencies
+
+
+def run(workers, engine, clients, duration, batch):
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--port", str(port), "--host", "127.0.0.1",
+         "--workers", str(workers), "--engine", engine],
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(url, workers)
+        payloads = [
+            json.dumps(synthetic_records(batch, seed=s))
+            for s in range(64)
+        ]
+        with ProcessPoolExecutor(clients) as pool:
+            results = list(pool.map(
+                _client, [url] * clients, [payloads] * clients, [duration] * clients
+            ))
+    finally:
+        server.terminate()
+        server.wait(10)
+
+    latencies = np.concatenate([np.asarray(r) for r in results]) * 1000
+    return {
+        "workers": workers,
+        "requests": int(latencies.size),
+        "requests_per_sec": round(latencies.size / duration, 1),
+        "rows_per_sec": round(latencies.size * batch / duration, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--engine", default="booster", choices=["sklearn", "booster"])
+    parser.add_argument("--clients", type=int, default=0,
+                        help="client processes (default: 2 x max workers)")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--batch", type=int, default=1, help="records per request")
+    args = parser.parse_args()
+
+    worker_counts = [int(w) for w in args.workers.split(",")]
+    clients = args.clients or 2 * max(worker_counts)
+
+    results = [
+        run(w, args.engine, clients, args.duration, args.batch)
+        for w in worker_counts
+    ]
+    print(json.dumps({
+        "engine": args.engine,
+        "clients": clients,
+        "batch": args.batch,
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
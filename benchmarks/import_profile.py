@@ -0,0 +1,127 @@
+# benchmarks/import_profile.py
+"""
+Cold-start import profile of the entry points, each in a fresh interpreter
+(python -X importtime), i.e. what a new container / worker pays before the
+first page or request can be served.
+
+    python benchmarks/import_profile.py
+    python benchmarks/import_profile.py --targets app.py,api --repeat 5 --out imports.json
+    python benchmarks/import_profile.py --compare imports_main.json
+
+Per target:
+- wall_ms        import of the module / first run of the Streamlit script
+                 (bare mode, no browser), best of --repeat runs
+- heavy          which optional stacks were loaded by then (Sheets, SHAP,
+                 plotting, model / Arrow libraries)
+- top_packages   import time per top-level package (its modules' own time)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+TARGETS = ["app.py", "app_trial.py", "api", "gsheets", "explain"]
+
+HEAVY = {
+    "sheets": ["gspread", "google.oauth2"],
+    "shap": ["shap"],
+    "plotting": ["matplotlib"],
+    "xgboost": ["xgboost"],
+    "sklearn": ["sklearn"],
+    "joblib": ["joblib"],
+    "pyarrow": ["pyarrow"],
+}
+
+CHILD = r"""
+import json, logging, runpy, sys, time, warnings
+warnings.simplefilter("ignore")
+logging.disable(logging.WARNING)
+target = sys.argv[1]
+t0 = time.perf_counter()
+try:
+    if target.endswith(".py"):
+        runpy.run_path(target, run_name="__main__")
+    else:
+        __import__(target)
+    error = None
+except BaseException as e:   # st.stop() / missing secrets in bare mode
+    error = f"{type(e).__name__}: {e}"
+wall_ms = (time.perf_counter() - t0) * 1000
+heavy = json.loads(sys.argv[2])
+print(json.dumps({
+    "wall_ms": round(wall_ms, 1),
+    "heavy": {name: any(m in sys.modules for m in mods) for name, mods in heavy.items()},
+    "error": error,
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Self import time (us) summed per top-level package (first dotted component)."""
+    packages = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        packages[name.strip().split(".")[0]] += int(own)
+    return packages
+
+
+def profile(target: str, repeat: int) -> dict:
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD, target, json.dumps(HEAVY)],
+            capture_output=True, text=True, cwd=ROOT,
+            env={**os.environ, "PYTHONPATH": str(ROOT)},
+        )
+        lines = proc.stdout.strip().splitlines()
+        if proc.returncode or not lines:
+            raise RuntimeError(f"❌ {target} failed:\n{proc.stderr[-2000:]}")
+        run = json.loads(lines[-1])
+        if best is None or run["wall_ms"] < best["wall_ms"]:
+            run["packages"] = parse_importtime(proc.stderr)
+            best = run
+
+    packages = best.pop("packages")
+    top = sorted(packages.items(), key=lambda kv: -kv[1])[:10]
+    best["top_packages_ms"] = {name: round(us / 1000, 1) for name, us in top}
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--targets", default=",".join(TARGETS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="earlier JSON report to compare wall_ms against")
+    args = parser.parse_args()
+
+    report = {}
+    for target in args.targets.split(","):
+        result = report[target] = profile(target, args.repeat)
+        loaded = [name for name, on in result["heavy"].items() if on] or ["-"]
+        print(f"{target:<14} {result['wall_ms']:>9.1f} ms   loaded: {', '.join(loaded)}")
+        for name, ms in list(result["top_packages_ms"].items())[:5]:
+            print(f"{'':<14} {ms:>9.1f} ms   {name}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        print(f"\n{'target':<14} {'base ms':>10} {'now ms':>10} {'ratio':>7}")
+        for target, result in report.items():
+            if target in baseline:
+                base = baseline[target]["wall_ms"]
+                print(f"{target:<14} {base:>10.1f} {result['wall_ms']:>10.1f} "
+                      f"{result['wall_ms'] / base:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
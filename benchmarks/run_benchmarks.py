@@ -0,0 +1,227 @@
+# benchmarks/run_benchmarks.py
+"""
+Reproducible benchmark suite for the hot paths, on synthetic rows built
+from features.json / dtypes.json / category_maps.json (synthetic.py):
+
+- preprocess   preprocess_for_model (frame), PREPROCESSOR.transform,
+               PREPROCESSOR.transform_records, PREPROCESSOR.transform_arrow
+- inference    every engine: predict_matrix on the preprocessed matrix
+               and predict_records end to end
+- sheet sink   SheetBatchSink.write against the in-memory fake gspread
+
+at batch sizes 1, 32, 1k and 100k. Results are JSON (with the git commit
+and library versions) so runs can be diffed between commits:
+
+    python benchmarks/run_benchmarks.py --out bench_main.json
+    python benchmarks/run_benchmarks.py --out bench_pr.json --compare bench_main.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+import numpy as np
+import pyarrow as pa
+
+from fake_gspread import FakeClient
+from gsheets import GSHEET_ID, GSHEET_WORKSHEET, SheetBatchSink, SheetClientPool
+from inference import build_engine
+from model_registry import MODEL_PATH, REGISTRY
+from preprocessing import PREPROCESSOR, preprocess_for_model
+from scoring import scores_from_probs
+from synthetic import synthetic_frame, synthetic_records
+
+BATCH_SIZES = [1, 32, 1_000, 100_000]
+
+
+def time_call(fn, min_repeats=3, min_seconds=0.5, max_repeats=2000):
+    """Run fn until both min_repeats and min_seconds are reached; seconds per call."""
+    fn()  # warm up
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_repeats and (
+        len(samples) < min_repeats or time.perf_counter() - started < min_seconds
+    ):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def summarize(samples, rows):
+    ms = np.asarray(samples) * 1000
+    p50 = float(np.percentile(ms, 50))
+    return {
+        "repeats": len(ms),
+        "p50_ms": round(p50, 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+        "rows_per_sec": round(rows / (p50 / 1000), 1) if p50 else None,
+    }
+
+
+def bench(fn, rows, **kwargs):
+    return summarize(time_call(fn, **kwargs), rows)
+
+
+# =========================
+# SUITES
+# =========================
+def bench_preprocess(df, records, **kwargs):
+    X = PREPROCESSOR.allocate(len(df))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return {
+        "preprocess_for_model": bench(lambda: preprocess_for_model(df), len(df), **kwargs),
+        "transform": bench(lambda: PREPROCESSOR.transform(df, out=X), len(df), **kwargs),
+        "transform_records": bench(
+            lambda: PREPROCESSOR.transform_records(records, out=X), len(df), **kwargs
+        ),
+        "transform_arrow": bench(
+            lambda: PREPROCESSOR.transform_arrow(table, out=X), len(df), **kwargs
+        ),
+    }
+
+
+def bench_inference(engines, X, records, **kwargs):
+    results = {}
+    for name, engine in engines.items():
+        results[f"{name}.predict_matrix"] = bench(lambda: engine.predict_matrix(X), len(X), **kwargs)
+        results[f"{name}.predict_records"] = bench(
+            lambda: engine.predict_records(records), len(X), **kwargs
+        )
+    return results
+
+
+def bench_sheet_sink(records, probs, latency, **kwargs):
+    rows = scores_from_probs(probs).to_dict(orient="records")
+    rows = [{**record, **score} for record, score in zip(records, rows)]
+    headers = list(rows[0])
+
+    client = FakeClient({GSHEET_ID: {GSHEET_WORKSHEET: [headers]}}, latency=latency)
+    worksheet = client.spreadsheets[GSHEET_ID].worksheets[GSHEET_WORKSHEET]
+    sink = SheetBatchSink(SheetClientPool(lambda: client), max_rows=len(rows))
+
+    def write():
+        del worksheet.rows[1:]   # keep the fake sheet from growing across repeats
+        sink.write(rows)
+
+    result = bench(write, len(rows), **kwargs)
+    result["api_calls_per_write"] = round(client.calls.get("append_rows", 0) / (result["repeats"] + 1), 2)
+    return result
+
+
+# =========================
+# REPORT
+# =========================
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    versions = {}
+    for module in ("numpy", "pandas", "xgboost", "sklearn"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold=1.1):
+    """Print p50 ratios (current / baseline) for every shared measurement; flag > threshold."""
+    print(f"{'measurement':<60} {'base ms':>10} {'now ms':>10} {'ratio':>7}")
+    for size, suites in current["results"].items():
+        for suite, measurements in suites.items():
+            for name, now in measurements.items():
+                base = baseline["results"].get(size, {}).get(suite, {}).get(name)
+                if not base or not base["p50_ms"]:
+                    continue
+                ratio = now["p50_ms"] / base["p50_ms"]
+                flag = "  ⚠️" if ratio > threshold else ""
+                print(
+                    f"{f'{suite}/{name} @ {size}':<60} {base['p50_ms']:>10.3f} "
+                    f"{now['p50_ms']:>10.3f} {ratio:>7.2f}{flag}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, BATCH_SIZES)))
+    parser.add_argument("--engines", default="sklearn,booster")
+    parser.add_argument("--suites", default="preprocess,inference,sheet_sink")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--missing-rate", type=float, default=0.1)
+    parser.add_argument("--sheet-latency", type=float, default=0.0,
+                        help="seconds per fake Sheets call (0 = pure client overhead)")
+    parser.add_argument("--min-seconds", type=float, default=0.5)
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.1,
+                        help="flag measurements slower than baseline by this ratio")
+    args = parser.parse_args()
+
+    suites = args.suites.split(",")
+    kwargs = {"min_seconds": args.min_seconds}
+    entry = REGISTRY.register("production", args.model)
+    engines = {name: build_engine(entry, name) for name in args.engines.split(",")}
+
+    report = {
+        "env": environment(),
+        "model_sha256": entry.sha256,
+        "seed": args.seed,
+        "missing_rate": args.missing_rate,
+        "results": {},
+    }
+
+    for size in map(int, args.sizes.split(",")):
+        df = synthetic_frame(size, seed=args.seed, missing_rate=args.missing_rate)
+        records = synthetic_records(size, seed=args.seed, missing_rate=args.missing_rate)
+        X = PREPROCESSOR.transform(df)
+        results = {}
+
+        if "preprocess" in suites:
+            results["preprocess"] = bench_preprocess(df, records, **kwargs)
+        if "inference" in suites:
+            results["inference"] = bench_inference(engines, X, records, **kwargs)
+        if "sheet_sink" in suites:
+            probs = next(iter(engines.values())).predict_matrix(X)
+            results["sheet_sink"] = {
+                "write": bench_sheet_sink(records, probs, args.sheet_latency, **kwargs)
+            }
+
+        report["results"][str(size)] = results
+        print(f"✅ batch size {size}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f), args.threshold)
+
+
+if __name__ == "__main__":
+    main()
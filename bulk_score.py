@@ -0,0 +1,257 @@
+# bulk_score.py
+"""
+Offline bulk scoring of a CSV / Parquet file of beneficiaries
+(columns in the artifacts/features.json schema).
+
+The input is streamed in fixed-size chunks; every chunk goes through
+ONE preprocessing pass and ONE model call, and is appended to the output
+with lbw_prob, lbw_percent and risk_category. Memory stays flat no
+matter how big the file is.
+
+    python bulk_score.py backlog.csv scored.csv
+    python bulk_score.py backlog.parquet scored.parquet --chunksize 100000 --workers 4
+    python bulk_score.py raw_forms.csv scored.csv --derive   # raw inputs (derived_features.py)
+    python bulk_score.py raw_forms.csv scored.csv --validate # + validation_errors column
+"""
+import argparse
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from derived_features import derive_frame
+from inference import INFERENCE_ENGINE, load_engine
+from model_registry import MODEL_PATH
+from preprocessing import CATEGORY_MAPS
+from scoring import score_frame
+from validation import validate_frame
+
+SCORE_COLUMNS = ["lbw_prob", "lbw_percent", "risk_category"]
+
+
+# =========================
+# INPUT / OUTPUT
+# =========================
+def _is_parquet(path) -> bool:
+    return Path(path).suffix.lower() in (".parquet", ".pq")
+
+
+# text of each trained category -> the category itself ("9999" -> "9999",
+# "1" / "1.0" -> 1), whatever type the file reader picked for the column
+CATEGORY_KEYS = {
+    col: {
+        **{str(value): value for value in categories},
+        **{
+            str(float(value)): value for value in categories
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        },
+    }
+    for col, categories in CATEGORY_MAPS.items()
+}
+
+
+def normalize_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Categorical columns -> the trained category values.
+
+    Type inference runs per chunk (a TT column that is all "9999" in one
+    chunk reads as int 9999 and would miss the "9999" category), so every
+    value is matched on its text. Values that match no category are kept
+    as read (scored as unseen).
+    """
+    for col, keys in CATEGORY_KEYS.items():
+        if col not in df.columns:
+            continue
+        codes, uniques = pd.factorize(df[col])
+        values = np.array(
+            [keys.get(str(value), value) for value in uniques] + [np.nan], dtype=object
+        )
+        df[col] = values[codes]
+    return df
+
+
+def iter_chunks(path, chunksize: int):
+    """Yield DataFrames of at most `chunksize` rows (categorical columns normalized)."""
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield normalize_categories(batch.to_pandas())
+    else:
+        # categorical columns as text, so a chunk's dtype never depends on its rows
+        dtype = {col: str for col in CATEGORY_MAPS}
+        for chunk in pd.read_csv(path, chunksize=chunksize, dtype=dtype):
+            yield normalize_categories(chunk)
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file as they arrive."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = _is_parquet(path)
+        self._writer = None
+        self._schema = None
+        self._wrote_header = False
+
+    def write(self, df: pd.DataFrame):
+        if self.parquet:
+            self._write_parquet(df)
+        else:
+            df.to_csv(
+                self.path,
+                mode="a" if self._wrote_header else "w",
+                header=not self._wrote_header,
+                index=False,
+            )
+            self._wrote_header = True
+
+    def _write_parquet(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            # all-missing columns in the first chunk -> string, not null
+            self._schema = pa.schema([
+                f.with_type(pa.string()) if pa.types.is_null(f.type) else f
+                for f in table.schema
+            ])
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        self._writer.write_table(table.cast(self._schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# =========================
+# SCORING (in-process or pool worker)
+# =========================
+_ENGINE = None
+_DERIVE = False
+_VALIDATE = False
+
+
+def _init_worker(engine_name, model_path, derive=False, validate=False):
+    global _ENGINE, _DERIVE, _VALIDATE
+    _ENGINE = load_engine(engine_name, model_path)
+    _DERIVE = derive
+    _VALIDATE = validate
+
+
+def _score_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    if _DERIVE:
+        chunk = derive_frame(chunk)
+    scores = score_frame(_ENGINE, chunk)
+    scored = pd.concat([chunk, scores[SCORE_COLUMNS]], axis=1)
+    if _VALIDATE:
+        # every date rule at once; rows are still scored, errors listed per row
+        scored["validation_errors"] = validate_frame(chunk).error_messages()
+    return scored
+
+
+def _scored_chunks(chunks, workers, engine_name, model_path, derive=False, validate=False):
+    """Scored chunks in input order, at most 2 x workers chunks in flight."""
+    if workers <= 1:
+        _init_worker(engine_name, model_path, derive, validate)
+        for chunk in chunks:
+            yield _score_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(engine_name, model_path, derive, validate),
+    ) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(_score_chunk, chunk))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def bulk_score(
+    input_path,
+    output_path,
+    chunksize=50_000,
+    workers=1,
+    engine_name=INFERENCE_ENGINE,
+    model_path=None,
+    progress=True,
+    derive=False,
+    validate=False,
+) -> int:
+    """Score `input_path` into `output_path`. Returns the number of rows scored."""
+    writer = ChunkWriter(output_path)
+    rows = 0
+    t0 = time.perf_counter()
+    try:
+        for scored in _scored_chunks(
+            iter_chunks(input_path, chunksize), workers, engine_name, model_path,
+            derive, validate,
+        ):
+            writer.write(scored)
+            rows += len(scored)
+            if progress:
+                elapsed = time.perf_counter() - t0
+                print(
+                    f"\r{rows:,} rows | {elapsed:,.1f}s | {rows / elapsed:,.0f} rows/s",
+                    end="",
+                    file=sys.stderr,
+                    flush=True,
+                )
+    finally:
+        writer.close()
+
+    if progress:
+        print(file=sys.stderr)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score a CSV / Parquet file of beneficiaries in chunks."
+    )
+    parser.add_argument("input", help="CSV or .parquet input")
+    parser.add_argument("output", help="CSV or .parquet output")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="scoring processes (1 = in-process)")
+    parser.add_argument("--engine", default=INFERENCE_ENGINE, choices=["sklearn", "booster"])
+    parser.add_argument("--model", help=f"model pickle (default: the bundle, else {MODEL_PATH})")
+    parser.add_argument("--derive", action="store_true",
+                        help="derive model features from raw form columns first")
+    parser.add_argument("--validate", action="store_true",
+                        help="add a validation_errors column (validation.py date rules)")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    rows = bulk_score(
+        args.input,
+        args.output,
+        chunksize=args.chunksize,
+        workers=args.workers,
+        engine_name=args.engine,
+        model_path=args.model,
+        progress=not args.quiet,
+        derive=args.derive,
+        validate=args.validate,
+    )
+    elapsed = time.perf_counter() - t0
+    print(
+        f"✅ Scored {rows:,} rows in {elapsed:,.1f}s "
+        f"({rows / max(elapsed, 1e-9):,.0f} rows/s) -> {args.output}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
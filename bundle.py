@@ -0,0 +1,396 @@
+# bundle.py
+"""
+All scoring artifacts packed into ONE versioned file, loaded with a
+single read at startup instead of six separate opens / parses.
+
+    python bundle.py build      # artifacts/*  -> artifacts/lbw_bundle.bin
+    python bundle.py inspect    # manifest + staleness vs the source files
+    python bundle.py load       # timed cold load (what the app / API pay)
+
+Layout:
+    b"LBWBNDL1" | uint32 manifest length | manifest JSON | member bytes ...
+
+The manifest is space-padded and every member starts at a multiple of
+ALIGN bytes, so the background array can be memory-mapped in place.
+
+The manifest lists every member with its offset, size and sha256, the
+size / mtime / sha256 of each source file, plus the library versions from
+env.json. Members:
+- features.json, dtypes.json, category_maps.json, env.json   (as shipped)
+- lookup_tables.json   compiled preprocessor layout + category -> code tables
+- background.npy       background sample, already preprocessed (float32)
+- xgb_model.pkl        the pickled model
+
+Once the file exists (or LBW_BUNDLE_PATH points at one), preprocessing,
+the model registry and the background store all read from it. Opening it
+maps the file and parses only the small JSON members; the model and the
+background are verified and loaded when first used.
+"""
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import warnings
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+
+BUNDLE_PATH = Path(os.environ.get("LBW_BUNDLE_PATH", "artifacts/lbw_bundle.bin"))
+BUNDLE_STRICT_ENV = os.environ.get("LBW_BUNDLE_STRICT_ENV", "0") == "1"
+SOURCE_DIR = Path("artifacts")
+
+MAGIC = b"LBWBNDL1"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sI")
+ALIGN = 64
+
+JSON_MEMBERS = ["features.json", "dtypes.json", "category_maps.json", "env.json"]
+
+# env.json key -> installed distribution name
+ENV_DISTRIBUTIONS = {
+    "xgboost": "xgboost",
+    "sklearn": "scikit-learn",
+    "joblib": "joblib",
+    "numpy": "numpy",
+}
+
+
+def _sha256(data) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _source_entry(path: Path) -> dict:
+    stat = path.stat()
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": _sha256(path.read_bytes()),
+    }
+
+
+def _aligned(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
+
+
+def installed_versions() -> dict:
+    versions = {"python": sys.version}
+    for key, dist in ENV_DISTRIBUTIONS.items():
+        try:
+            versions[key] = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            versions[key] = None
+    return versions
+
+
+def env_mismatches(env: dict) -> dict:
+    """{library: (bundled, installed)} for every version that differs."""
+    installed = installed_versions()
+    mismatches = {}
+    for key, expected in env.items():
+        current = installed.get(key)
+        if key == "python":
+            # only major.minor matters for pickles
+            expected = ".".join(expected.split()[0].split(".")[:2])
+            current = ".".join(current.split()[0].split(".")[:2])
+        if key in installed and expected != current:
+            mismatches[key] = (expected, current)
+    return mismatches
+
+
+# =========================
+# BUILD
+# =========================
+def build_bundle(out_path=BUNDLE_PATH, source_dir=SOURCE_DIR) -> dict:
+    import pandas as pd
+
+    from preprocessing import CompiledPreprocessor
+
+    source_dir = Path(source_dir)
+    members = {name: (source_dir / name).read_bytes() for name in JSON_MEMBERS}
+    members["xgb_model.pkl"] = (source_dir / "xgb_model.pkl").read_bytes()
+
+    preprocessor = CompiledPreprocessor(
+        json.loads(members["features.json"]),
+        json.loads(members["dtypes.json"]),
+        json.loads(members["category_maps.json"]),
+    )
+    members["lookup_tables.json"] = json.dumps(preprocessor.tables()).encode()
+
+    # preprocessed with the tables above, not whatever bundle is loaded now
+    background = preprocessor.transform(pd.read_csv(source_dir / "background.csv"))
+    buf = io.BytesIO()
+    np.save(buf, np.ascontiguousarray(background, dtype=np.float32))
+    members["background.npy"] = buf.getvalue()
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created_at": time.time(),
+        "env": json.loads(members["env.json"]),
+        "sources": {
+            name: _source_entry(source_dir / name)
+            for name in JSON_MEMBERS + ["xgb_model.pkl", "background.csv"]
+            if (source_dir / name).exists()
+        },
+        "members": [],
+    }
+    offset = 0
+    for name, data in members.items():
+        offset = _aligned(offset)
+        manifest["members"].append(
+            {"name": name, "offset": offset, "size": len(data), "sha256": _sha256(data)}
+        )
+        offset += len(data)
+
+    header = json.dumps(manifest).encode()
+    header = header.ljust(_aligned(_HEADER.size + len(header)) - _HEADER.size)
+    out_path = Path(out_path)
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(header)))
+        f.write(header)
+        body = f.tell()
+        for m, data in zip(manifest["members"], members.values()):
+            f.write(b"\0" * (body + m["offset"] - f.tell()))
+            f.write(data)
+    os.replace(tmp, out_path)
+    return manifest
+
+
+# =========================
+# LOAD
+# =========================
+class ArtifactBundle:
+    """
+    One bundle file, memory-mapped once and verified member by member.
+
+    - opening it parses only the small JSON members (features, dtypes,
+      category maps, lookup tables); the model and the background are
+      read and checked the first time they are used
+    - every member's sha256 is checked against the manifest on first access
+    - env.json library versions are compared with the installed ones when
+      the model is unpickled, once (warning, or ValueError with
+      strict_env / LBW_BUNDLE_STRICT_ENV=1)
+    - `timings` holds the seconds spent in each startup step
+    """
+
+    def __init__(self, path=BUNDLE_PATH, verify=True, strict_env=BUNDLE_STRICT_ENV):
+        t_start = time.perf_counter()
+        self.path = Path(path)
+        self.verify = verify
+        self.strict_env = strict_env
+        self.timings = {"verify": 0.0}
+
+        t0 = time.perf_counter()
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.file_bytes = len(self._mmap)
+        self.timings["read"] = time.perf_counter() - t0
+
+        magic, header_len = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"❌ {self.path} is not an LBW artifact bundle")
+        self._body = _HEADER.size + header_len
+        self.manifest = json.loads(self._mmap[_HEADER.size:self._body])
+        if self.manifest["format_version"] != FORMAT_VERSION:
+            raise ValueError(
+                f"❌ Bundle format {self.manifest['format_version']} "
+                f"(this code reads {FORMAT_VERSION}); rebuild with `python bundle.py build`"
+            )
+        self._entries = {m["name"]: m for m in self.manifest["members"]}
+        self._verified = set()
+
+        t0 = time.perf_counter()
+        self.features = self._json("features.json")
+        self.dtypes = self._json("dtypes.json")
+        self.category_maps = self._json("category_maps.json")
+        self.env = self._json("env.json")
+        self.lookup_tables = self._json("lookup_tables.json")
+        self.timings["parse"] = time.perf_counter() - t0 - self.timings["verify"]
+
+        self.model_sha256 = self._entries["xgb_model.pkl"]["sha256"]
+        self._env_mismatches = None
+        self._env_checked = False
+        self._background = None
+        self._preprocessor = None
+        self.load_seconds = time.perf_counter() - t_start
+
+    def _member(self, name) -> memoryview:
+        """Zero-copy view of one member, checked against its sha256 the first time."""
+        m = self._entries[name]
+        start = self._body + m["offset"]
+        view = memoryview(self._mmap)[start:start + m["size"]]
+        if self.verify and name not in self._verified:
+            t0 = time.perf_counter()
+            if _sha256(view) != m["sha256"]:
+                raise ValueError(f"❌ Checksum mismatch for '{name}' in {self.path}")
+            self._verified.add(name)
+            self.timings["verify"] += time.perf_counter() - t0
+        return view
+
+    def _json(self, name):
+        return json.loads(bytes(self._member(name)))
+
+    @property
+    def env_mismatches(self) -> dict:
+        if self._env_mismatches is None:
+            self._env_mismatches = env_mismatches(self.env)
+        return self._env_mismatches
+
+    def check_env(self):
+        """Warn (or raise with strict_env) if env.json differs from the installed libraries; once."""
+        if self._env_checked:
+            return
+        self._env_checked = True
+        if self.env_mismatches:
+            detail = ", ".join(f"{k} {a} != {b}" for k, (a, b) in self.env_mismatches.items())
+            if self.strict_env:
+                raise ValueError(f"❌ Bundle built with other library versions: {detail}")
+            warnings.warn(f"⚠️ Bundle built with other library versions: {detail}")
+
+    @property
+    def background(self) -> np.ndarray:
+        """
+        The preprocessed background sample, memory-mapped read-only from
+        the bundle file on first use (no copy; the page cache is shared
+        by every worker process, like background_store's .npy).
+        """
+        if self._background is None:
+            t0 = time.perf_counter()
+            self._member("background.npy")   # checksum
+            with open(self.path, "rb") as f:
+                f.seek(self._body + self._entries["background.npy"]["offset"])
+                version = np.lib.format.read_magic(f)
+                read_header = (
+                    np.lib.format.read_array_header_1_0 if version == (1, 0)
+                    else np.lib.format.read_array_header_2_0
+                )
+                shape, fortran_order, dtype = read_header(f)
+                offset = f.tell()
+            self._background = np.memmap(
+                self.path, dtype=dtype, mode="r", shape=shape,
+                order="F" if fortran_order else "C", offset=offset,
+            )
+            self.timings["background"] = time.perf_counter() - t0
+        return self._background
+
+    def preprocessor(self):
+        """CompiledPreprocessor rebuilt from the precomputed lookup tables."""
+        if self._preprocessor is None:
+            from preprocessing import CompiledPreprocessor
+
+            t0 = time.perf_counter()
+            self._preprocessor = CompiledPreprocessor.from_tables(self.lookup_tables)
+            self.timings["preprocessor"] = time.perf_counter() - t0
+        return self._preprocessor
+
+    def model_entry(self, registry=None):
+        """Registry entry for the bundled model (unpickled on first call only)."""
+        from model_registry import REGISTRY
+
+        self.check_env()
+        registry = registry or REGISTRY
+        t0 = time.perf_counter()
+        entry = registry.load_bytes(
+            self._member("xgb_model.pkl"), source=f"{self.path}:xgb_model.pkl"
+        )
+        self.timings.setdefault("model", time.perf_counter() - t0)
+        return entry
+
+    def stale_members(self, source_dir=SOURCE_DIR) -> list:
+        """
+        Source files that changed since the bundle was built.
+
+        Compared by size and mtime; a file is only hashed when its mtime
+        moved but its size did not (e.g. touched, or checked out again).
+        """
+        source_dir = Path(source_dir)
+        stale = []
+        for name, source in self.manifest.get("sources", {}).items():
+            path = source_dir / name
+            if not path.exists():
+                continue
+            if isinstance(source, str):   # bundles built before size / mtime were recorded
+                source = {"sha256": source}
+            stat = path.stat()
+            if "size" in source and stat.st_size != source["size"]:
+                stale.append(name)
+            elif stat.st_mtime_ns != source.get("mtime_ns"):
+                if _sha256(path.read_bytes()) != source["sha256"]:
+                    stale.append(name)
+        return stale
+
+    def info(self) -> dict:
+        return {
+            "path": str(self.path),
+            "format_version": self.manifest["format_version"],
+            "created_at": self.manifest["created_at"],
+            "file_bytes": self.file_bytes,
+            "model_sha256": self.model_sha256,
+            "load_seconds": round(self.load_seconds, 4),
+            "timings": {k: round(v, 4) for k, v in self.timings.items()},
+            "env_mismatches": self.env_mismatches,
+        }
+
+
+_BUNDLE = None
+_BUNDLE_CHECKED = False
+_BUNDLE_LOCK = threading.Lock()
+
+
+def get_bundle(path=BUNDLE_PATH, source_dir=SOURCE_DIR):
+    """
+    The process-wide bundle, or None when no bundle file exists or it is
+    stale: a bundle built before artifacts/ changed (retrained model,
+    edited json) is refused with a warning, and everything is loaded from
+    the source files instead.
+    """
+    global _BUNDLE, _BUNDLE_CHECKED
+    with _BUNDLE_LOCK:
+        if not _BUNDLE_CHECKED and Path(path).exists():
+            bundle = ArtifactBundle(path)
+            stale = bundle.stale_members(source_dir)
+            if stale:
+                warnings.warn(
+                    f"⚠️ Ignoring stale bundle {path}: {', '.join(stale)} changed since "
+                    "it was built; loading artifacts/ instead (python bundle.py build)"
+                )
+            else:
+                _BUNDLE = bundle
+            _BUNDLE_CHECKED = True
+        return _BUNDLE
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build / inspect the LBW artifact bundle")
+    parser.add_argument("command", choices=["build", "inspect", "load"])
+    parser.add_argument("--path", default=str(BUNDLE_PATH))
+    args = parser.parse_args()
+
+    if args.command == "build":
+        manifest = build_bundle(args.path)
+        size = sum(m["size"] for m in manifest["members"])
+        print(f"✅ {len(manifest['members'])} artifacts ({size:,} bytes) -> {args.path}")
+    elif args.command == "inspect":
+        bundle = ArtifactBundle(args.path)
+        for m in bundle.manifest["members"]:
+            print(f"{m['name']:<22} {m['size']:>10,} bytes  {m['sha256'][:16]}")
+        stale = bundle.stale_members()
+        print(f"⚠️ Stale vs artifacts/: {stale}" if stale else "✅ Up to date with artifacts/")
+    else:
+        t0 = time.perf_counter()
+        bundle = ArtifactBundle(args.path)
+        bundle.preprocessor()
+        bundle.background
+        bundle.model_entry()
+        total = time.perf_counter() - t0
+        for step, seconds in bundle.timings.items():
+            print(f"{step:<14} {seconds * 1000:8.2f} ms")
+        print(f"{'total':<14} {total * 1000:8.2f} ms")
@@ -0,0 +1,81 @@
+# columnar.py
+"""
+Arrow IPC / Parquet bodies for the scoring API (POST /predict/columnar).
+
+Request tables go through PREPROCESSOR.transform_arrow, so typed columns
+land in the float32 model matrix without a DataFrame or per-row dicts;
+scores come back as a table in the same (or the Accept-ed) format.
+
+Media types:
+- application/vnd.apache.arrow.stream   Arrow IPC stream (pa.ipc.new_stream)
+- application/vnd.apache.arrow.file     Arrow IPC file   (pa.ipc.new_file)
+- application/vnd.apache.parquet        Parquet (also application/x-parquet)
+"""
+import io
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+
+from scoring import risk_categories
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+PARQUET = "application/vnd.apache.parquet"
+
+MEDIA_TYPES = {
+    ARROW_STREAM: ARROW_STREAM,
+    ARROW_FILE: ARROW_FILE,
+    PARQUET: PARQUET,
+    "application/x-parquet": PARQUET,
+    "application/parquet": PARQUET,
+}
+
+
+def media_type(header) -> str:
+    """Canonical media type of a Content-Type header, or None if not columnar."""
+    if not header:
+        return None
+    return MEDIA_TYPES.get(header.split(";")[0].strip().lower())
+
+
+def response_media_type(accept, request_type: str) -> str:
+    """First columnar type listed in Accept; the request's own type otherwise."""
+    for entry in (accept or "").split(","):
+        found = media_type(entry)
+        if found is not None:
+            return found
+    return request_type
+
+
+def read_table(body: bytes, kind: str) -> pa.Table:
+    if kind == PARQUET:
+        return pq.read_table(pa.BufferReader(body))
+    if kind == ARROW_FILE:
+        return pa.ipc.open_file(pa.BufferReader(body)).read_all()
+    return pa.ipc.open_stream(pa.BufferReader(body)).read_all()
+
+
+def write_table(table: pa.Table, kind: str) -> bytes:
+    if kind == PARQUET:
+        sink = io.BytesIO()
+        pq.write_table(table, sink)
+        return sink.getvalue()
+
+    sink = pa.BufferOutputStream()
+    new_writer = pa.ipc.new_file if kind == ARROW_FILE else pa.ipc.new_stream
+    with new_writer(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def scores_table(lbw_prob) -> pa.Table:
+    """lbw_prob, lbw_percent, risk_category (dictionary-encoded) as an Arrow table."""
+    lbw_prob = np.asarray(lbw_prob, dtype=float)
+    lbw_percent = np.round(lbw_prob * 100, 2)
+    return pa.table({
+        "lbw_prob": lbw_prob,
+        "lbw_percent": lbw_percent,
+        "risk_category": pa.array(risk_categories(lbw_percent)).dictionary_encode(),
+    })
@@ -0,0 +1,382 @@
+# derived_features.py
+"""
+Derived model features from raw form inputs, defined ONCE and shared by
+the Streamlit forms, the API (POST /predict/raw) and bulk_score.py --derive.
+
+Every feature is a numpy column operation over its raw inputs:
+- derive_frame / derive_columns   a whole batch, one pass per feature
+- FeatureState.update             one form: only features whose inputs
+                                  changed are recomputed (1-row arrays)
+
+Raw inputs (RAW_INPUTS):
+    hb_value, height_cm, lmp_date, registration_date,
+    anc{1..4}_date, anc{1..4}_weight, ifa_tabs, calcium_tabs,
+    household_assets (list / "a,b"), social_media (list / "a,b"),
+    pmmvy_inst{1..3}_date
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+ASSET_WEIGHTS = {
+    "Electricity": 1.0, "Mattress": 0.5, "Pressure Cooker": 0.5,
+    "Chair": 0.5, "Cot/Bed": 0.5, "Table": 0.5,
+    "Electric Fan": 0.75, "Radio/Transistor": 0.5,
+    "B&W Television": 0.5, "Color Television": 1.0,
+    "Sewing Machine": 0.75, "Mobile Telephone": 1.0,
+    "Internet": 1.25, "Computer": 1.25,
+    "Refrigerator": 1.25, "Air Conditioner/Cooler": 1.25,
+    "Washing Machine": 1.25, "Bicycle": 0.5,
+    "Motorcycle/Scooter": 1.0, "Car": 1.5,
+    "Water Pump": 0.75, "Animal": 0.5,
+    "Tractor": 1.25, "Thresher": 0.75
+}
+
+MONTHS = np.array([
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+], dtype=object)
+
+ANC_VISITS = [1, 2, 3, 4]
+ANC_DATES = [f"anc{i}_date" for i in ANC_VISITS]
+
+# raw input -> kind (how a column / value is coerced)
+INPUT_KINDS = {
+    "hb_value": "number",
+    "height_cm": "number",
+    "lmp_date": "date",
+    "registration_date": "date",
+    **{f"anc{i}_date": "date" for i in ANC_VISITS},
+    **{f"anc{i}_weight": "number" for i in ANC_VISITS},
+    "ifa_tabs": "number",
+    "calcium_tabs": "number",
+    "household_assets": "list",
+    "social_media": "list",
+    **{f"pmmvy_inst{i}_date": "date" for i in (1, 2, 3)},
+}
+RAW_INPUTS = list(INPUT_KINDS)
+
+
+# =========================
+# COERCION (batch columns / single values -> numpy)
+# =========================
+def _numbers(values) -> np.ndarray:
+    arr = np.asarray(values)
+    if arr.dtype.kind in "fiub":
+        return arr.astype(np.float64)
+    return pd.to_numeric(pd.Series(arr, dtype=object), errors="coerce").to_numpy(np.float64)
+
+
+def _dates(values) -> np.ndarray:
+    arr = np.asarray(values)
+    if arr.dtype.kind == "M":
+        return arr.astype("datetime64[D]")
+    return pd.to_datetime(pd.Series(arr, dtype=object), errors="coerce").to_numpy("datetime64[D]")
+
+
+def _as_list(value) -> list:
+    if isinstance(value, (list, tuple, set, np.ndarray)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    return []
+
+
+def _lists(values) -> np.ndarray:
+    out = np.empty(len(values), dtype=object)
+    out[:] = [_as_list(v) for v in values]
+    return out
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _scalar(value, kind) -> np.ndarray:
+    """One raw value as a 1-row column (no pandas on the single-form path)."""
+    if kind == "number":
+        try:
+            return np.array([np.nan if _is_missing(value) else float(value)])
+        except (TypeError, ValueError):
+            return np.array([np.nan])
+    if kind == "date":
+        if _is_missing(value) or value == "":
+            return np.array(["NaT"], dtype="datetime64[D]")
+        return np.array([np.datetime64(pd.Timestamp(value).date(), "D")])
+    out = np.empty(1, dtype=object)
+    out[0] = _as_list(value)
+    return out
+
+
+COERCE = {"number": _numbers, "date": _dates, "list": _lists}
+
+
+# =========================
+# FEATURE DEFINITIONS (columns in, column out)
+# =========================
+def _days(later, earlier) -> np.ndarray:
+    """Day difference as float (NaN where either date is missing)."""
+    delta = (later - earlier).astype("timedelta64[D]")
+    return np.where(np.isnat(delta), np.nan, delta.astype(np.float64))
+
+
+def _labels(conditions, labels, missing) -> np.ndarray:
+    out = np.select(conditions, np.array(labels, dtype=object), default=None)
+    out[missing] = None
+    return out.astype(object)
+
+
+def _timing_bucket(gap_days) -> np.ndarray:
+    """Early < 12 weeks <= Mid <= 24 weeks < Late."""
+    return _labels(
+        [gap_days < 84, gap_days <= 168, gap_days > 168],
+        ["Early", "Mid", "Late"],
+        np.isnan(gap_days),
+    )
+
+
+def hb_risk_bin(c):
+    hb = c["hb_value"]
+    return _labels(
+        [hb < 6, hb < 8, hb < 11, hb >= 11],
+        ["severe_anaemia", "moderate_anaemia", "mild_anaemia", "normal"],
+        np.isnan(hb),
+    )
+
+
+def registration_bucket(c):
+    return _timing_bucket(_days(c["registration_date"], c["lmp_date"]))
+
+
+def month_conception(c):
+    lmp = c["lmp_date"]
+    month = lmp.astype("datetime64[M]").astype(np.int64) % 12
+    out = MONTHS[month]
+    out[np.isnat(lmp)] = None
+    return out
+
+
+def bmi(i):
+    def fn(c):
+        height_m = c["height_cm"] / 100
+        return np.round(c[f"anc{i}_weight"] / height_m ** 2, 2)
+    return fn
+
+
+def _anc_dates(c) -> np.ndarray:
+    return np.stack([c[name] for name in ANC_DATES], axis=1)
+
+
+def anc_completed(c):
+    return (~np.isnat(_anc_dates(c))).sum(axis=1)
+
+
+def anc_bucket(c):
+    # NaT sorts last, so column 0 is the first ANC (NaT if there is none)
+    first = np.sort(_anc_dates(c), axis=1)[:, 0]
+    return _timing_bucket(_days(first, c["lmp_date"]))
+
+
+def counselling_gap(c):
+    dates = np.sort(_anc_dates(c), axis=1)
+    return _days(dates[:, 1], dates[:, 0])
+
+
+def log1p4(name):
+    def fn(c):
+        return np.round(np.log1p(c[name]), 4)
+    return fn
+
+
+def _asset_score(assets) -> float:
+    unknown = [a for a in assets if a not in ASSET_WEIGHTS]
+    if unknown:
+        raise ValueError(f"❌ Unknown household assets: {unknown}")
+    return sum(ASSET_WEIGHTS[a] for a in assets)
+
+
+def household_assets_score(c):
+    scores = np.fromiter((_asset_score(a) for a in c["household_assets"]), np.float64)
+    return np.round(np.log1p(scores), 4)
+
+
+def social_media_category(c):
+    counts = np.fromiter(
+        (len([x for x in platforms if x != "Other"]) for platforms in c["social_media"]),
+        np.int64,
+    )
+    return _labels(
+        [counts == 0, counts == 1, counts <= 3, counts > 3],
+        ["None", "Low", "Medium", "High"],
+        np.zeros(len(counts), dtype=bool),
+    )
+
+
+def lmp_to_installment(i):
+    def fn(c):
+        return _days(c[f"pmmvy_inst{i}_date"], c["lmp_date"])
+    return fn
+
+
+@dataclass(frozen=True)
+class DerivedFeature:
+    name: str
+    inputs: tuple
+    fn: object
+
+
+DERIVED_FEATURES = [
+    DerivedFeature("measured_HB_risk_bin", ("hb_value",), hb_risk_bin),
+    DerivedFeature("RegistrationBucket", ("lmp_date", "registration_date"), registration_bucket),
+    DerivedFeature("MonthConception", ("lmp_date",), month_conception),
+    *[
+        DerivedFeature(f"BMI_PW{i}_Prog", ("height_cm", f"anc{i}_weight"), bmi(i))
+        for i in ANC_VISITS
+    ],
+    DerivedFeature("No of ANCs completed", tuple(ANC_DATES), anc_completed),
+    DerivedFeature("ANCBucket", ("lmp_date", *ANC_DATES), anc_bucket),
+    DerivedFeature("counselling_gap_days", tuple(ANC_DATES), counselling_gap),
+    DerivedFeature(
+        "No. of IFA tablets received/procured in last one month_log1p",
+        ("ifa_tabs",), log1p4("ifa_tabs"),
+    ),
+    DerivedFeature(
+        "No. of calcium tablets consumed in last one month_log1p",
+        ("calcium_tabs",), log1p4("calcium_tabs"),
+    ),
+    DerivedFeature("Household_Assets_Score_log1p", ("household_assets",), household_assets_score),
+    DerivedFeature("Social_Media_Category", ("social_media",), social_media_category),
+    *[
+        DerivedFeature(f"LMPtoINST{i}", ("lmp_date", f"pmmvy_inst{i}_date"), lmp_to_installment(i))
+        for i in (1, 2, 3)
+    ],
+]
+DERIVED = {f.name: f for f in DERIVED_FEATURES}
+
+# raw input -> derived features that read it
+DEPENDENTS = {
+    name: [f.name for f in DERIVED_FEATURES if name in f.inputs] for name in RAW_INPUTS
+}
+
+
+# =========================
+# BATCH
+# =========================
+def _missing_column(kind, n) -> np.ndarray:
+    if kind == "number":
+        return np.full(n, np.nan)
+    if kind == "date":
+        return np.full(n, np.datetime64("NaT"), dtype="datetime64[D]")
+    out = np.empty(n, dtype=object)
+    out[:] = [[] for _ in range(n)]
+    return out
+
+
+def derive_columns(raw: dict, n: int, features=None) -> dict:
+    """
+    {derived feature: column} for `n` rows of raw input columns. By
+    default only features with at least one raw input present are
+    derived; absent inputs count as missing.
+    """
+    if features is None:
+        features = [f.name for f in DERIVED_FEATURES if any(name in raw for name in f.inputs)]
+    columns = {
+        name: COERCE[kind](raw[name]) if name in raw else _missing_column(kind, n)
+        for name, kind in INPUT_KINDS.items()
+    }
+    return {name: DERIVED[name].fn(columns) for name in features}
+
+
+def derive_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copy of `df` with every derivable model feature (over)written from its
+    raw columns; features with neither raw inputs nor a column are added
+    as missing.
+    """
+    raw = {name: df[name].to_numpy() for name in RAW_INPUTS if name in df.columns}
+    features = [
+        f.name for f in DERIVED_FEATURES
+        if f.name not in df.columns or any(name in raw for name in f.inputs)
+    ]
+    out = df.copy()
+    for name, values in derive_columns(raw, len(df), features).items():
+        out[name] = values
+    return out
+
+
+def derive_records(records: list) -> list:
+    """derive_frame for JSON-style records (missing -> None)."""
+    if not records:
+        return []
+    present = {k for record in records for k in record if k in INPUT_KINDS}
+    raw = {}
+    for name in present:
+        values = np.empty(len(records), dtype=object)
+        values[:] = [record.get(name) for record in records]
+        raw[name] = values
+    derived = derive_columns(raw, len(records))
+    return [
+        {**record, **{name: _python(col[i]) for name, col in derived.items()}}
+        for i, record in enumerate(records)
+    ]
+
+
+def _python(value):
+    """numpy scalar -> plain JSON-ready value (NaN -> None)."""
+    if value is None:
+        return None
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else float(value)
+    return value
+
+
+# =========================
+# INCREMENTAL (one form)
+# =========================
+class FeatureState:
+    """
+    Raw inputs and derived features of ONE form. update() re-derives only
+    the features that depend on an input whose value changed, e.g. a new
+    Hb value recomputes measured_HB_risk_bin and nothing else.
+    """
+
+    def __init__(self, **raw):
+        self.raw = {}
+        self.derived = {}
+        self.last_recomputed = []
+        self.update(**raw)
+
+    def update(self, **changes) -> list:
+        """Set raw inputs; returns the derived features that were recomputed."""
+        changed = []
+        for name, value in changes.items():
+            if name not in INPUT_KINDS:
+                raise ValueError(f"❌ Unknown raw input '{name}'")
+            if name not in self.raw or not _same(self.raw[name], value):
+                self.raw[name] = value
+                changed.append(name)
+
+        stale = [f for f in DERIVED_FEATURES if any(name in f.inputs for name in changed)]
+        for f in stale:
+            columns = {
+                name: _scalar(self.raw.get(name), INPUT_KINDS[name]) for name in f.inputs
+            }
+            self.derived[f.name] = _python(f.fn(columns)[0])
+
+        self.last_recomputed = [f.name for f in stale]
+        return self.last_recomputed
+
+    def __getitem__(self, feature):
+        return self.derived.get(feature)
+
+
+def _same(a, b) -> bool:
+    if _is_missing(a) and _is_missing(b):
+        return True
+    if isinstance(a, (list, tuple)) or isinstance(b, (list, tuple)):
+        return _as_list(a) == _as_list(b)
+    return a == b
@@ -0,0 +1,89 @@
+# explain.py
+import threading
+import time
+
+import numpy as np
+
+from background_store import load_background
+from metrics import Histogram
+from preprocessing import PREPROCESSOR
+
+MAX_BACKGROUND_ROWS = 100
+
+EXPLAIN_MS_BUCKETS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+
+def _booster(engine):
+    """The xgboost Booster behind any inference engine (cached or not)."""
+    engine = getattr(engine, "engine", engine)
+    if hasattr(engine, "booster"):
+        return engine.booster
+    return engine.model.get_booster()
+
+
+class TreeExplanations:
+    """
+    SHAP TreeExplainer built ONCE from the booster and the preprocessed
+    background sample (background_store); explain() attributes a whole batch in one call.
+
+    Interventional SHAP (against the background) is used when the model
+    allows it. SHAP does not support it for models with categorical
+    splits yet, and then the explainer falls back to the tree's own
+    cover statistics (tree_path_dependent). Values are in log-odds.
+    """
+
+    def __init__(self, booster, background: np.ndarray, feature_names=None):
+        import shap
+
+        self.feature_names = list(feature_names or PREPROCESSOR.features)
+        try:
+            self.explainer = shap.TreeExplainer(
+                booster, data=background, feature_perturbation="interventional"
+            )
+            # unsupported models only fail on the first shap_values call
+            self.explainer.shap_values(background[:1])
+            self.feature_perturbation = "interventional"
+        except NotImplementedError:
+            self.explainer = shap.TreeExplainer(
+                booster, feature_perturbation="tree_path_dependent"
+            )
+            self.feature_perturbation = "tree_path_dependent"
+
+        self.base_value = float(np.ravel(self.explainer.expected_value)[0])
+        self.latency_ms = Histogram(
+            "lbw_explain_latency_ms", EXPLAIN_MS_BUCKETS,
+            "Time to explain one batch (ms)"
+        )
+
+    def explain(self, X: np.ndarray) -> np.ndarray:
+        """(n_rows, n_features) attributions for a preprocessed float32 matrix."""
+        t0 = time.perf_counter()
+        values = np.asarray(self.explainer.shap_values(X))
+        self.latency_ms.observe((time.perf_counter() - t0) * 1000)
+        return values
+
+    def top_features(self, values_row: np.ndarray, k: int = 5) -> list:
+        """[(feature, attribution), ...] with the largest |attribution| first."""
+        order = np.argsort(-np.abs(values_row))[:k]
+        return [(self.feature_names[i], float(values_row[i])) for i in order]
+
+
+_EXPLAINERS = {}
+_EXPLAINERS_LOCK = threading.Lock()
+
+
+def loaded_explainer(engine):
+    """The cached explainer for engine's model, or None if not built yet (never imports shap)."""
+    with _EXPLAINERS_LOCK:
+        return _EXPLAINERS.get(getattr(engine, "sha256", None))
+
+
+def get_explainer(engine) -> TreeExplanations:
+    """One cached explainer per model hash (background memory-mapped from background.npy)."""
+    key = getattr(engine, "sha256", None)
+    with _EXPLAINERS_LOCK:
+        if key not in _EXPLAINERS:
+            _EXPLAINERS[key] = TreeExplanations(
+                _booster(engine), load_background(max_rows=MAX_BACKGROUND_ROWS)
+            )
+        return _EXPLAINERS[key]
@@ -0,0 +1,88 @@
+# fake_gspread.py
+"""
+In-memory stand-in for the few gspread calls this app makes
+(open_by_key -> worksheet -> row_values / append_row / append_rows).
+
+Used to exercise gsheets.SheetClientPool without Google credentials:
+
+    client = FakeClient({GSHEET_ID: {GSHEET_WORKSHEET: [headers]}})
+    pool = SheetClientPool(lambda: client)
+"""
+import threading
+import time
+
+from gspread.exceptions import SpreadsheetNotFound, WorksheetNotFound
+
+
+class FakeWorksheet:
+    def __init__(self, client, title, rows=None):
+        self.client = client
+        self.title = title
+        self.rows = [list(r) for r in (rows or [])]
+
+    def row_values(self, row):
+        self.client._call("row_values")
+        return list(self.rows[row - 1]) if len(self.rows) >= row else []
+
+    def append_row(self, values, value_input_option="RAW"):
+        self.client._call("append_row")
+        self.rows.append(list(values))
+
+    def append_rows(self, values, value_input_option="RAW"):
+        self.client._call("append_rows")
+        self.rows.extend(list(v) for v in values)
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, key, worksheets):
+        self.client = client
+        self.id = key
+        self.worksheets = {
+            title: FakeWorksheet(client, title, rows)
+            for title, rows in worksheets.items()
+        }
+
+    def worksheet(self, title):
+        self.client._call("worksheet")
+        if title not in self.worksheets:
+            raise WorksheetNotFound(title)
+        return self.worksheets[title]
+
+
+class FakeClient:
+    """
+    spreadsheets: {spreadsheet_id: {worksheet_name: [row, ...]}}
+    latency:      seconds slept per call, to mimic a network round-trip
+    fail_next:    number of upcoming calls that raise ConnectionError
+    """
+
+    def __init__(self, spreadsheets, latency=0.0):
+        self.latency = latency
+        self.fail_next = 0
+        self.calls = {}
+        self._lock = threading.Lock()
+        self.spreadsheets = {
+            key: FakeSpreadsheet(self, key, worksheets)
+            for key, worksheets in spreadsheets.items()
+        }
+
+    @property
+    def api_calls(self):
+        return sum(self.calls.values())
+
+    def _call(self, name):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            fail = self.fail_next > 0
+            if fail:
+                self.fail_next -= 1
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ConnectionError(f"fake outage during {name}")
+
+    def open_by_key(self, key):
+        self._call("open_by_key")
+        if key not in self.spreadsheets:
+            raise SpreadsheetNotFound(key)
+        return self.spreadsheets[key]
@@ -0,0 +1,313 @@
+# gsheets.py
+import logging
+import threading
+import time
+from datetime import datetime, date
+
+import numpy as np
+
+from tracing import Trace
+
+# 🔴 REPLACE THIS WITH YOUR ACTUAL SPREADSHEET ID
+GSHEET_ID = "12qNktlRnQHFHujGwnCX15YW1UsQHtMzgNyRWzq1Qbsc"
+GSHEET_WORKSHEET = "LBWScores"
+
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive"
+]
+
+HEADER_TTL_SECONDS = 300.0
+
+logger = logging.getLogger(__name__)
+
+
+# JSON safe Values
+def make_json_safe(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return value
+
+
+def align_row(record: dict, headers: list) -> list:
+    """Order a record by the sheet header (unknown columns -> "")."""
+    return [make_json_safe(record.get(h, "")) for h in headers]
+
+
+def service_account_client_factory(service_account_info):
+    """
+    Client factory for SheetClientPool backed by a service account
+    (e.g. st.secrets["gcp_service_account"]).
+    """
+    def factory():
+        # imported on first use: a page load that never saves skips the
+        # gspread / google-auth stack (~0.2 s of imports)
+        import gspread
+        from google.oauth2.service_account import Credentials
+
+        creds = Credentials.from_service_account_info(
+            service_account_info, scopes=SCOPES
+        )
+        return gspread.authorize(creds)
+
+    return factory
+
+
+class SheetClientPool:
+    """
+    Process-wide cache of the Google Sheets client, worksheet handles
+    and header rows.
+
+    - the client is authorized ONCE; its session refreshes the access
+      token itself, so later saves reuse it instead of re-authorizing
+    - worksheet handles are kept per (spreadsheet_id, worksheet_name)
+    - header rows are cached for `header_ttl` seconds and dropped by
+      invalidate() or by any failed write
+
+    `client_factory` is any zero-arg callable returning a gspread-like
+    client (open_by_key -> worksheet -> row_values / append_row), so
+    fake_gspread.FakeClient can stand in for the real API.
+    """
+
+    def __init__(self, client_factory, header_ttl=HEADER_TTL_SECONDS, clock=time.monotonic):
+        self.client_factory = client_factory
+        self.header_ttl = header_ttl
+        self.clock = clock
+
+        self._lock = threading.RLock()
+        self._client = None
+        self._worksheets = {}
+        self._headers = {}   # key -> (headers, fetched_at)
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = self.client_factory()
+            return self._client
+
+    def worksheet(self, spreadsheet_id=GSHEET_ID, worksheet_name=GSHEET_WORKSHEET):
+        key = (spreadsheet_id, worksheet_name)
+        with self._lock:
+            if key not in self._worksheets:
+                spreadsheet = self.client().open_by_key(spreadsheet_id)
+                self._worksheets[key] = spreadsheet.worksheet(worksheet_name)
+            return self._worksheets[key]
+
+    def headers(self, spreadsheet_id=GSHEET_ID, worksheet_name=GSHEET_WORKSHEET):
+        key = (spreadsheet_id, worksheet_name)
+        with self._lock:
+            cached = self._headers.get(key)
+            if cached is not None and self.clock() - cached[1] < self.header_ttl:
+                return cached[0]
+
+            worksheet = self.worksheet(spreadsheet_id, worksheet_name)
+            headers = [h.strip() for h in worksheet.row_values(1)]
+            self._headers[key] = (headers, self.clock())
+            return headers
+
+    def invalidate(self, spreadsheet_id=None, worksheet_name=None):
+        """Drop cached headers (all, or one worksheet's) so the next save re-reads row 1."""
+        with self._lock:
+            if spreadsheet_id is None and worksheet_name is None:
+                self._headers.clear()
+            else:
+                self._headers.pop((spreadsheet_id, worksheet_name), None)
+
+    def reset(self):
+        """Forget the client and every handle (e.g. after credentials rotate)."""
+        with self._lock:
+            self._client = None
+            self._worksheets.clear()
+            self._headers.clear()
+
+    def append_record(self, record: dict, spreadsheet_id=GSHEET_ID, worksheet_name=GSHEET_WORKSHEET):
+        """
+        Align a record with the (cached) header and append it.
+        With a warm cache this is a single API call.
+        """
+        trace = Trace("sheets_append_row")
+        with trace.stage("headers"):
+            headers = self.headers(spreadsheet_id, worksheet_name)
+        with trace.stage("worksheet"):
+            worksheet = self.worksheet(spreadsheet_id, worksheet_name)
+        try:
+            with trace.stage("append_row"):
+                worksheet.append_row(
+                    align_row(record, headers),
+                    value_input_option="USER_ENTERED"
+                )
+        except Exception:
+            # header / handle may be stale -> re-read on the next attempt
+            with self._lock:
+                self._headers.pop((spreadsheet_id, worksheet_name), None)
+                self._worksheets.pop((spreadsheet_id, worksheet_name), None)
+            raise
+
+    def append_records(self, records: list, spreadsheet_id=GSHEET_ID, worksheet_name=GSHEET_WORKSHEET):
+        """
+        Align many records with the (cached) header in one pass and write
+        them with a single append_rows call.
+        """
+        if not records:
+            return
+        trace = Trace("sheets_append_rows")
+        with trace.stage("headers"):
+            headers = self.headers(spreadsheet_id, worksheet_name)
+        with trace.stage("worksheet"):
+            worksheet = self.worksheet(spreadsheet_id, worksheet_name)
+        try:
+            with trace.stage("align"):
+                rows = [align_row(record, headers) for record in records]
+            with trace.stage("append_rows"):
+                worksheet.append_rows(rows, value_input_option="USER_ENTERED")
+        except Exception:
+            with self._lock:
+                self._headers.pop((spreadsheet_id, worksheet_name), None)
+                self._worksheets.pop((spreadsheet_id, worksheet_name), None)
+            raise
+
+
+class SheetBatchSink:
+    """
+    Batches final_record dicts into single append_rows calls.
+
+    - add() buffers a record and flushes once `max_rows` are waiting or
+      the oldest buffered record is `max_delay` seconds old
+    - start() runs a timer thread that checks every `tick` seconds, so a
+      trickle below `max_rows` is sent after `max_delay` even when no
+      further add() comes; stop() ends it and flushes what is left
+    - write() sends an already-collected batch straight away (used as
+      the write-behind flush_fn)
+
+    `stats` counts API calls vs rows, so rows_per_call shows how much
+    Sheets quota batching saves (1.0 == the old append_row per save).
+    """
+
+    def __init__(
+        self,
+        pool,
+        spreadsheet_id=GSHEET_ID,
+        worksheet_name=GSHEET_WORKSHEET,
+        max_rows=100,
+        max_delay=10.0,
+        tick=1.0,
+        clock=time.monotonic,
+    ):
+        self.pool = pool
+        self.spreadsheet_id = spreadsheet_id
+        self.worksheet_name = worksheet_name
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.tick = tick
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._oldest = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.api_calls = 0
+        self.rows_written = 0
+
+    @property
+    def rows_per_call(self) -> float:
+        return self.rows_written / self.api_calls if self.api_calls else 0.0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "api_calls": self.api_calls,
+            "rows_written": self.rows_written,
+            "rows_per_call": round(self.rows_per_call, 2),
+            "buffered": len(self._buffer),
+        }
+
+    def write(self, records: list) -> int:
+        if not records:
+            return 0
+        self.pool.append_records(records, self.spreadsheet_id, self.worksheet_name)
+        with self._lock:
+            self.api_calls += 1
+            self.rows_written += len(records)
+        return len(records)
+
+    def due(self) -> bool:
+        with self._lock:
+            return bool(self._buffer) and (
+                len(self._buffer) >= self.max_rows
+                or self.clock() - self._oldest >= self.max_delay
+            )
+
+    def add(self, record: dict) -> int:
+        """Buffer one record; returns rows flushed (0 if still buffering)."""
+        return self.extend([record])
+
+    def extend(self, records: list) -> int:
+        with self._lock:
+            if not self._buffer:
+                self._oldest = self.clock()
+            self._buffer.extend(records)
+        return self.flush_due()
+
+    def flush(self) -> int:
+        """Write everything buffered in one call. On failure the rows stay buffered."""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        try:
+            return self.write(batch)
+        except Exception:
+            with self._lock:
+                self._buffer[:0] = batch
+            raise
+
+    def flush_due(self) -> int:
+        """flush() if the buffer is due (full or old enough); rows flushed."""
+        return self.flush() if self.due() else 0
+
+    # -------------------------
+    # timer thread
+    # -------------------------
+    def _run(self):
+        while not self._stop.wait(self.tick):
+            try:
+                self.flush_due()
+            except Exception:
+                # rows stay buffered; the next tick retries
+                logger.exception("sheets: timed flush failed, retrying next tick")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="sheet-batch-sink", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, flush=True, timeout=10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if flush:
+            self.flush()
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_sheet_pool(client_factory=None, **kwargs) -> SheetClientPool:
+    """
+    The process-wide SheetClientPool. The first caller's client_factory
+    wins; later callers get the same pool.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            if client_factory is None:
+                raise ValueError("❌ First get_sheet_pool() call needs a client_factory")
+            _POOL = SheetClientPool(client_factory, **kwargs)
+        return _POOL
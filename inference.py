@@ -0,0 +1,142 @@
+# inference.py
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from model_registry import MODEL_PATH, REGISTRY
+from preprocessing import BUNDLE, PREPROCESSOR
+
+# "sklearn" -> pickled XGBClassifier.predict_proba on the training frame
+# "booster" -> native XGBoost booster on the float32 matrix (no DataFrame)
+INFERENCE_ENGINE = os.environ.get("LBW_INFERENCE_ENGINE", "sklearn")
+NATIVE_MODEL_DIR = Path(os.environ.get("LBW_NATIVE_MODEL_DIR", "artifacts/native"))
+
+
+class SklearnEngine:
+    """The original path: preprocess_for_model frame -> model.predict_proba."""
+
+    name = "sklearn"
+
+    def __init__(self, model, preprocessor=PREPROCESSOR):
+        self.model = model
+        self.preprocessor = preprocessor
+
+    def set_threads(self, n: int):
+        self.model.set_params(n_jobs=n)
+
+    def predict_matrix(self, X: np.ndarray) -> np.ndarray:
+        X_processed = self.preprocessor.to_frame(X)
+        return self.model.predict_proba(X_processed)[:, 1]
+
+    def predict_frame(self, X_raw: pd.DataFrame) -> np.ndarray:
+        return self.predict_matrix(self.preprocessor.transform(X_raw))
+
+    def predict_records(self, records: list) -> np.ndarray:
+        return self.predict_matrix(self.preprocessor.transform_records(records))
+
+
+class BoosterEngine:
+    """
+    Native XGBoost booster scoring the compiled float32 matrix directly
+    with inplace_predict: no pandas frame, no DMatrix construction.
+
+    Category codes in the matrix are the training codes, and the
+    booster keeps its categorical feature types, so probabilities are
+    identical to SklearnEngine.
+    """
+
+    name = "booster"
+
+    def __init__(self, booster, preprocessor=PREPROCESSOR, nthread=None):
+        if nthread is not None:
+            booster.set_param({"nthread": nthread})
+        self.booster = booster
+        self.preprocessor = preprocessor
+        self._row = preprocessor.allocate(1)
+        self._row_lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        import xgboost as xgb
+
+        booster = xgb.Booster()
+        booster.load_model(str(path))
+        return cls(booster, **kwargs)
+
+    def set_threads(self, n: int):
+        self.booster.set_param({"nthread": n})
+
+    def predict_matrix(self, X: np.ndarray) -> np.ndarray:
+        return self.booster.inplace_predict(X, validate_features=False)
+
+    def predict_frame(self, X_raw: pd.DataFrame) -> np.ndarray:
+        return self.predict_matrix(self.preprocessor.transform(X_raw))
+
+    def predict_records(self, records: list) -> np.ndarray:
+        if len(records) == 1:
+            # single form: reuse the preallocated 1-row buffer
+            with self._row_lock:
+                X = self.preprocessor.transform_records(records, out=self._row)
+                return self.predict_matrix(X).copy()
+        return self.predict_matrix(self.preprocessor.transform_records(records))
+
+
+def export_booster(model, path) -> Path:
+    """
+    Save the booster inside the pickled XGBClassifier in XGBoost's native
+    format (.ubj or .json, picked from the extension).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    model.get_booster().save_model(str(path))
+    return path
+
+
+def native_model_path(sha256: str, fmt="ubj") -> Path:
+    """Exported booster for a pickle, named after the pickle's hash."""
+    return NATIVE_MODEL_DIR / f"xgb_{sha256[:16]}.{fmt}"
+
+
+_ENGINES = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def build_engine(entry, name=None):
+    """Engine for a registry entry; the native booster is exported once per model hash."""
+    name = name or INFERENCE_ENGINE
+    key = (name, entry.sha256)
+    with _ENGINES_LOCK:
+        if key in _ENGINES:
+            return _ENGINES[key]
+
+        if name == "sklearn":
+            engine = SklearnEngine(entry.model)
+        elif name == "booster":
+            path = native_model_path(entry.sha256)
+            if not path.exists():
+                export_booster(entry.model, path)
+            engine = BoosterEngine.from_file(path)
+        else:
+            raise ValueError(f"❌ Unknown inference engine '{name}' (sklearn | booster)")
+
+        engine.sha256 = entry.sha256
+        _ENGINES[key] = engine
+        return engine
+
+
+def load_engine(name=None, path=None):
+    """
+    The configured engine for the production model (LBW_INFERENCE_ENGINE).
+
+    The model comes from the artifact bundle only when no model path is
+    asked for, neither as `path` nor as LBW_MODEL_PATH; an explicit path
+    always loads that file (a missing one raises).
+    """
+    if path is None and BUNDLE is not None and "LBW_MODEL_PATH" not in os.environ:
+        entry = REGISTRY.register_entry("production", BUNDLE.model_entry())
+    else:
+        entry = REGISTRY.register("production", path or MODEL_PATH)
+    return build_engine(entry, name)
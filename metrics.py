@@ -0,0 +1,86 @@
+# metrics.py
+import bisect
+import threading
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram (Prometheus style: cumulative `le` buckets,
+    plus count and sum). Thread-safe; observe() is O(log buckets).
+    """
+
+    def __init__(self, name: str, buckets, help: str = "", labels=None):
+        self.name = name
+        self.help = help
+        self.labels = dict(labels or {})
+        self.buckets = sorted(float(b) for b in buckets)
+        self._counts = [0] * (len(self.buckets) + 1)   # last = +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        cumulative, running = {}, 0
+        for le, n in zip(self.buckets + [float("inf")], counts):
+            running += n
+            cumulative["+Inf" if le == float("inf") else f"{le:g}"] = running
+
+        return {
+            "buckets": cumulative,
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0,
+        }
+
+    def prometheus_samples(self) -> list:
+        """Sample lines (_bucket / _sum / _count) in Prometheus text format."""
+        snap = self.snapshot()
+        lines = [
+            f"{self.name}_bucket{_labels({**self.labels, 'le': le})} {n}"
+            for le, n in snap["buckets"].items()
+        ]
+        lines.append(f"{self.name}_sum{_labels(self.labels)} {snap['sum']:g}")
+        lines.append(f"{self.name}_count{_labels(self.labels)} {snap['count']}")
+        return lines
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for v in labels.values()
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def render_prometheus(histograms, counters=None) -> str:
+    """
+    Prometheus text exposition (version 0.0.4) of histograms that share
+    names across label sets, plus plain counters {name: (value, help)}.
+    """
+    lines, seen = [], set()
+    for hist in sorted(histograms, key=lambda h: h.name):   # one family per name
+        if hist.name not in seen:
+            seen.add(hist.name)
+            lines.append(f"# HELP {hist.name} {hist.help}")
+            lines.append(f"# TYPE {hist.name} histogram")
+        lines.extend(hist.prometheus_samples())
+
+    for name, (value, help) in (counters or {}).items():
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {value}")
+
+    return "\n".join(lines) + "\n"
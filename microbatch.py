@@ -0,0 +1,164 @@
+# microbatch.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import Histogram
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+QUEUE_WAIT_MS_BUCKETS = [0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250]
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-record scoring requests and runs them as
+    ONE vectorized batch.
+
+    A batch is dispatched when `max_batch_size` records are waiting or
+    the first record has waited `max_wait_ms`, whichever comes first.
+    While a batch is being scored, new requests keep queueing, so under
+    load batches grow by themselves.
+
+    `predict_fn(records) -> probabilities` runs on a single worker
+    thread (engine.predict_records), keeping the event loop free.
+
+    If a batch call fails, its records are re-scored one by one, so a
+    bad record only fails its own request. If the batching task itself
+    dies (or is stopped), every waiting request fails instead of hanging,
+    and so does every later submit().
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=5.0, executor=None):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor or ThreadPoolExecutor(1, thread_name_prefix="microbatch")
+
+        self.batch_size = Histogram(
+            "lbw_microbatch_batch_size", BATCH_SIZE_BUCKETS,
+            "Records per micro-batch"
+        )
+        self.queue_wait_ms = Histogram(
+            "lbw_microbatch_queue_wait_ms", QUEUE_WAIT_MS_BUCKETS,
+            "Time a record waited before its batch was dispatched (ms)"
+        )
+
+        self.fallbacks = 0   # batches re-scored one record at a time
+
+        self._queue = None
+        self._task = None
+        self._error = None
+
+    async def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._error = None
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, record: dict) -> float:
+        """Score one record; resolves when its batch has been scored."""
+        if self._task is None:
+            raise RuntimeError("❌ MicroBatcher.start() was not called")
+        if self._task.done():
+            raise RuntimeError(f"❌ MicroBatcher is not running ({self._error!r})") from self._error
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put_nowait((record, future, loop.time()))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch = await self._collect()
+
+                dispatched = loop.time()
+                self.batch_size.observe(len(batch))
+                for _, _, enqueued in batch:
+                    self.queue_wait_ms.observe((dispatched - enqueued) * 1000)
+
+                records = [record for record, _, _ in batch]
+                results = await loop.run_in_executor(self.executor, self._score, records)
+
+                for (_, future, _), result in zip(batch, results):
+                    if future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+                batch = []
+        except BaseException as e:
+            self._error = (
+                RuntimeError("❌ MicroBatcher was stopped")
+                if isinstance(e, asyncio.CancelledError) else e
+            )
+            self._fail_waiting(batch)
+            raise
+
+    def _score(self, records: list) -> list:
+        """
+        One probability (or the exception) per record. A failed batch is
+        re-scored record by record so only the bad records fail.
+        """
+        try:
+            probs = self.predict_fn(records)
+            if len(probs) != len(records):
+                raise RuntimeError(
+                    f"❌ predict_fn returned {len(probs)} probabilities for {len(records)} records"
+                )
+            return [float(p) for p in probs]
+        except Exception as e:
+            if len(records) == 1:
+                return [e]
+
+        self.fallbacks += 1
+        results = []
+        for record in records:
+            try:
+                results.append(float(self.predict_fn([record])[0]))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _fail_waiting(self, batch: list):
+        """Fail the in-flight batch and everything still queued with self._error."""
+        waiting = list(batch)
+        while not self._queue.empty():
+            waiting.append(self._queue.get_nowait())
+        for _, future, _ in waiting:
+            if not future.done():
+                future.set_exception(self._error)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "fallbacks": self.fallbacks,
+            "batch_size": self.batch_size.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+        }
@@ -0,0 +1,156 @@
+# model_registry.py
+import hashlib
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+
+MODEL_PATH = os.environ.get("LBW_MODEL_PATH", "artifacts/xgb_model.pkl")
+
+
+def _rss_bytes():
+    """Resident set size of this process (Linux /proc), None elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@dataclass
+class ModelEntry:
+    sha256: str
+    path: str
+    model: object = field(repr=False)
+    load_seconds: float
+    file_bytes: int
+    rss_delta_bytes: int = None
+    loaded_at: float = field(default_factory=time.time)
+
+    def info(self) -> dict:
+        return {
+            "sha256": self.sha256,
+            "path": self.path,
+            "load_seconds": round(self.load_seconds, 4),
+            "file_bytes": self.file_bytes,
+            "rss_delta_bytes": self.rss_delta_bytes,
+            "loaded_at": self.loaded_at,
+        }
+
+
+class ModelRegistry:
+    """
+    Loads each model artifact ONCE per process, keyed by file hash.
+
+    - the same bytes under two paths share one deserialized model
+    - a retrained file (new hash) is loaded next to the old one
+    - names ("production", "candidate", ...) point at hashes, so several
+      versions can be served side by side
+    - every entry records load time and the RSS growth it caused
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}   # sha256 -> ModelEntry
+        self._names = {}     # name -> sha256
+        self._hashes = {}    # path -> ((mtime_ns, size), sha256)
+
+    def file_sha256(self, path) -> str:
+        """sha256 of a file; only re-hashed when its mtime / size change."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._hashes.get(path)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+
+        with self._lock:
+            self._hashes[path] = (stamp, digest)
+        return digest
+
+    def _load(self, sha256, source, file_bytes, read) -> ModelEntry:
+        with self._lock:
+            entry = self._entries.get(sha256)
+            if entry is not None:
+                return entry
+
+            rss_before = _rss_bytes()
+            t0 = time.perf_counter()
+            import joblib   # only needed once a pickle is actually read
+
+            model = joblib.load(read())
+            load_seconds = time.perf_counter() - t0
+            rss_after = _rss_bytes()
+
+            entry = ModelEntry(
+                sha256=sha256,
+                path=str(source),
+                model=model,
+                load_seconds=load_seconds,
+                file_bytes=file_bytes,
+                rss_delta_bytes=(
+                    rss_after - rss_before
+                    if rss_before is not None and rss_after is not None else None
+                ),
+            )
+            self._entries[sha256] = entry
+            return entry
+
+    def load(self, path=MODEL_PATH) -> ModelEntry:
+        return self._load(
+            self.file_sha256(path), path, os.path.getsize(path), lambda: path
+        )
+
+    def load_bytes(self, data, source="<bytes>") -> ModelEntry:
+        """Same as load() for a pickle already in memory (e.g. from an artifact bundle)."""
+        data = bytes(data)
+        return self._load(
+            hashlib.sha256(data).hexdigest(), source, len(data), lambda: io.BytesIO(data)
+        )
+
+    def register(self, name: str, path) -> ModelEntry:
+        """Point `name` at the model in `path` (loading it if new)."""
+        return self.register_entry(name, self.load(path))
+
+    def register_entry(self, name: str, entry: ModelEntry) -> ModelEntry:
+        with self._lock:
+            self._entries.setdefault(entry.sha256, entry)
+            self._names[name] = entry.sha256
+        return self._entries[entry.sha256]
+
+    def get(self, name: str = "production") -> ModelEntry:
+        with self._lock:
+            if name not in self._names:
+                raise KeyError(f"❌ No model registered as '{name}'")
+            return self._entries[self._names[name]]
+
+    def evict(self, sha256: str):
+        """Drop a version no name points at any more."""
+        with self._lock:
+            if sha256 in self._names.values():
+                raise ValueError(f"❌ Model {sha256[:12]} is still registered")
+            self._entries.pop(sha256, None)
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "names": dict(self._names),
+                "models": [e.info() for e in self._entries.values()],
+            }
+
+
+REGISTRY = ModelRegistry()
+
+
+def get_model(path=MODEL_PATH):
+    """The production model, deserialized once per process."""
+    return REGISTRY.register("production", path).model
@@ -0,0 +1,152 @@
+# prediction_cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+CACHE_MAX_ENTRIES = int(os.environ.get("LBW_PREDICTION_CACHE_SIZE", "10000"))
+CACHE_TTL_SECONDS = float(os.environ.get("LBW_PREDICTION_CACHE_TTL", "3600"))
+# larger batches (bulk /predict, /predict/stream chunks, columnar uploads) skip
+# the cache: hashing every row costs more than it saves, and one upload would
+# evict every re-scored form. Micro-batches of /predict/one calls stay under it.
+CACHE_MAX_ROWS = int(os.environ.get("LBW_PREDICTION_CACHE_MAX_ROWS", "64"))
+
+
+def row_keys(X: np.ndarray) -> list:
+    """
+    Stable key per preprocessed float32 row.
+
+    NaN payloads and -0.0 are normalized first, so every "missing" (or
+    zero) value hashes the same no matter how it was produced.
+    """
+    X = np.array(X, dtype=np.float32, copy=True)
+    X += np.float32(0.0)          # -0.0 -> 0.0
+    X[np.isnan(X)] = np.nan       # one canonical NaN bit pattern
+    return [hashlib.blake2b(row.tobytes(), digest_size=16).digest() for row in X]
+
+
+class PredictionCache:
+    """
+    LRU + TTL cache of probabilities keyed by the preprocessed 32-feature
+    row, namespaced by the model's artifact hash: the first lookup with a
+    different model hash empties it.
+
+    Only batches of up to `max_rows` rows (single forms, micro-batches)
+    are looked up / stored; bigger ones go straight to the engine.
+    """
+
+    def __init__(
+        self,
+        max_entries=CACHE_MAX_ENTRIES,
+        ttl_seconds=CACHE_TTL_SECONDS,
+        max_rows=CACHE_MAX_ROWS,
+        clock=time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (prob, expires_at)
+        self._model_sha256 = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bypassed = 0   # rows scored without the cache (batch > max_rows)
+
+    def _check_model(self, sha256):
+        if sha256 != self._model_sha256:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._model_sha256 = sha256
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def predict_matrix(self, engine, X: np.ndarray) -> np.ndarray:
+        """engine.predict_matrix, skipping rows already scored by this model."""
+        if len(X) > self.max_rows:
+            with self._lock:
+                self.bypassed += len(X)
+            return engine.predict_matrix(X)
+
+        keys = row_keys(X)
+        probs = np.empty(len(keys), dtype=np.float64)
+        missing = []
+        now = self.clock()
+
+        with self._lock:
+            self._check_model(getattr(engine, "sha256", None))
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    probs[i] = entry[0]
+                else:
+                    missing.append(i)
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            fresh = engine.predict_matrix(X[missing])
+            probs[missing] = fresh
+
+            expires = self.clock() + self.ttl_seconds
+            with self._lock:
+                for i, prob in zip(missing, fresh):
+                    self._entries[keys[i]] = (float(prob), expires)
+                    self._entries.move_to_end(keys[i])
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        return probs
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "bypassed": self.bypassed,
+                "max_rows": self.max_rows,
+                "model_sha256": self._model_sha256,
+            }
+
+
+class CachedEngine:
+    """Any inference engine with a PredictionCache in front of predict_matrix."""
+
+    def __init__(self, engine, cache):
+        self.engine = engine
+        self.cache = cache
+        self.name = engine.name
+        self.sha256 = getattr(engine, "sha256", None)
+        self.preprocessor = engine.preprocessor
+
+    def set_threads(self, n: int):
+        self.engine.set_threads(n)
+
+    def predict_matrix(self, X):
+        return self.cache.predict_matrix(self.engine, X)
+
+    def predict_frame(self, X_raw):
+        return self.predict_matrix(self.preprocessor.transform(X_raw))
+
+    def predict_records(self, records: list):
+        return self.predict_matrix(self.preprocessor.transform_records(records))
+
+
+PREDICTION_CACHE = PredictionCache()
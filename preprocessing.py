@@ -4,16 +4,288 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from bundle import get_bundle
+
 ARTIFACTS_DIR = Path("artifacts")
 
-with open(ARTIFACTS_DIR / "features.json") as f:
-    FEATURES = json.load(f)
+# artifacts/lbw_bundle.bin when it exists (bundle.py); only its JSON members are read here
+BUNDLE = get_bundle()
+
+if BUNDLE is not None:
+    FEATURES, DTYPES, CATEGORY_MAPS = BUNDLE.features, BUNDLE.dtypes, BUNDLE.category_maps
+else:
+    with open(ARTIFACTS_DIR / "features.json") as f:
+        FEATURES = json.load(f)
+
+    with open(ARTIFACTS_DIR / "dtypes.json") as f:
+        DTYPES = json.load(f)
+
+    with open(ARTIFACTS_DIR / "category_maps.json") as f:
+        CATEGORY_MAPS = json.load(f)
+
+
+class CompiledPreprocessor:
+    """
+    preprocess_for_model, compiled ONCE from features / dtypes / category_maps.
+
+    Every feature becomes one float32 column of a preallocated matrix:
+    - numeric columns -> value (NaN if missing / not a number)
+    - categorical     -> code in the TRAINED category list (NaN if unseen)
+
+    Codes are the same ones pd.Categorical(..., categories=...) produces,
+    so the matrix can go straight to the booster or back to a frame.
+    """
+
+    def __init__(self, features, dtypes, category_maps):
+        self.features = list(features)
+        self.n_features = len(self.features)
+
+        self.numeric = []       # (position, column)
+        self.categorical = []   # (position, column, categories, code lookup)
+        self.int_columns = set()
+        self.feature_types = []
+
+        for i, col in enumerate(self.features):
+            dtype = dtypes.get(col, "")
+            if col in category_maps:
+                categories = category_maps[col]
+                self.categorical.append((
+                    i,
+                    col,
+                    list(categories),
+                    {value: code for code, value in enumerate(categories)},
+                ))
+                self.feature_types.append("c")
+            elif dtype.startswith(("int", "float")):
+                self.numeric.append((i, col))
+                if dtype.startswith("int"):
+                    self.int_columns.add(col)
+                self.feature_types.append("int" if dtype.startswith("int") else "float")
+            else:
+                raise ValueError(
+                    f"❌ No dtype / category map for feature '{col}' (model will fail)"
+                )
+
+        self.categories = {col: categories for _, col, categories, _ in self.categorical}
+
+    # -------------------------
+    # precomputed tables (bundle.py)
+    # -------------------------
+    def tables(self) -> dict:
+        """JSON-ready compiled layout; category lookups as [value, code] pairs (keeps int values)."""
+        return {
+            "features": self.features,
+            "numeric": self.numeric,
+            "categorical": [
+                [i, col, categories, list(lut.items())]
+                for i, col, categories, lut in self.categorical
+            ],
+            "int_columns": sorted(self.int_columns),
+            "feature_types": self.feature_types,
+        }
+
+    @classmethod
+    def from_tables(cls, tables: dict) -> "CompiledPreprocessor":
+        """Rebuild from tables() output without re-deriving anything from dtypes."""
+        self = cls.__new__(cls)
+        self.features = list(tables["features"])
+        self.n_features = len(self.features)
+        self.numeric = [(i, col) for i, col in tables["numeric"]]
+        self.categorical = [
+            (i, col, list(categories), dict((value, code) for value, code in lut))
+            for i, col, categories, lut in tables["categorical"]
+        ]
+        self.int_columns = set(tables["int_columns"])
+        self.feature_types = list(tables["feature_types"])
+        self.categories = {col: categories for _, col, categories, _ in self.categorical}
+        return self
+
+    # -------------------------
+    # allocation
+    # -------------------------
+    def allocate(self, n_rows: int, dtype=np.float32) -> np.ndarray:
+        return np.empty((n_rows, self.n_features), dtype=dtype)
+
+    def _output(self, n_rows, out):
+        if out is None:
+            return self.allocate(n_rows)
+        if (
+            out.shape[0] < n_rows
+            or out.shape[1] != self.n_features
+            or out.dtype not in (np.float32, np.float64)
+        ):
+            raise ValueError(
+                f"❌ Output buffer {out.shape}/{out.dtype} cannot hold "
+                f"({n_rows}, {self.n_features}) float32 / float64"
+            )
+        return out[:n_rows]
+
+    # -------------------------
+    # batch path (vectorized, one pass per column)
+    # -------------------------
+    def transform(self, df: pd.DataFrame, out: np.ndarray = None) -> np.ndarray:
+        X = self._output(len(df), out)
+
+        for i, col in self.numeric:
+            X[:, i] = pd.to_numeric(df[col], errors="coerce").to_numpy(
+                dtype=X.dtype, na_value=np.nan
+            )
+
+        for i, col, _, lut in self.categorical:
+            # hash the column once, look up only its distinct values,
+            # then gather (factorize marks missing as -1 -> trailing NaN)
+            try:
+                codes, uniques = pd.factorize(df[col])
+            except TypeError:
+                raise _unhashable(col, next(v for v in df[col] if not _hashable(v)))
+            table = np.array(
+                [lut.get(value, np.nan) for value in uniques] + [np.nan],
+                dtype=np.float32,
+            )
+            X[:, i] = table[codes]
+
+        return X
+
+    # -------------------------
+    # record path (no DataFrame, cheapest for a single form)
+    # -------------------------
+    def transform_records(self, records: list, out: np.ndarray = None) -> np.ndarray:
+        X = self._output(len(records), out)
 
-with open(ARTIFACTS_DIR / "dtypes.json") as f:
-    DTYPES = json.load(f)
+        for r, record in enumerate(records):
+            row = X[r]
+            for i, col in self.numeric:
+                row[i] = _to_float(record.get(col))
+            for i, col, _, lut in self.categorical:
+                value = record.get(col)
+                try:
+                    code = lut.get(value)
+                except TypeError:   # list / dict from JSON
+                    raise _unhashable(col, value)
+                row[i] = np.nan if code is None else code
 
-with open(ARTIFACTS_DIR / "category_maps.json") as f:
-    CATEGORY_MAPS = json.load(f)
+        return X
+
+    # -------------------------
+    # Arrow path (typed columns straight from Arrow IPC / Parquet)
+    # -------------------------
+    def transform_arrow(self, table, out: np.ndarray = None) -> np.ndarray:
+        """
+        pyarrow Table / RecordBatch -> the same float32 matrix as transform().
+
+        - numeric columns are cast by Arrow (nulls -> NaN); string-typed
+          ones fall back to pd.to_numeric(errors="coerce")
+        - categorical columns are dictionary-encoded per chunk (or used as
+          sent if already dictionary), so only distinct values are looked up
+        - a feature column that is absent is all-missing, like a missing key
+          in transform_records
+        No pandas frame and no per-row Python objects are built.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if isinstance(table, pa.RecordBatch):
+            table = pa.Table.from_batches([table])
+        X = self._output(table.num_rows, out)
+        present = set(table.column_names)
+
+        for i, col in self.numeric:
+            if col not in present:
+                X[:, i] = np.nan
+                continue
+            column = table.column(col)
+            if _arrow_castable(column.type):
+                X[:, i] = pc.cast(column, pa.from_numpy_dtype(X.dtype), safe=False).fill_null(np.nan).to_numpy()
+            else:
+                X[:, i] = pd.to_numeric(column.to_pandas(), errors="coerce").to_numpy(
+                    dtype=X.dtype, na_value=np.nan
+                )
+
+        for i, col, _, lut in self.categorical:
+            if col not in present:
+                X[:, i] = np.nan
+                continue
+            if pa.types.is_nested(table.column(col).type):
+                raise ValueError(
+                    f"❌ Feature '{col}' is a nested {table.column(col).type} column "
+                    "(expected scalar values)"
+                )
+            start = 0
+            for chunk in table.column(col).chunks:
+                if not pa.types.is_dictionary(chunk.type):
+                    chunk = pc.dictionary_encode(chunk)
+                # null index -> -1 -> trailing NaN, as in transform()
+                lookup = np.array(
+                    [lut.get(value, np.nan) for value in chunk.dictionary.to_pylist()] + [np.nan],
+                    dtype=np.float32,
+                )
+                codes = chunk.indices.fill_null(-1).to_numpy()
+                X[start:start + len(chunk), i] = lookup[codes]
+                start += len(chunk)
+
+        return X
+
+    # -------------------------
+    # back to the training frame layout
+    # -------------------------
+    def to_frame(self, X: np.ndarray, index=None) -> pd.DataFrame:
+        columns = {}
+        categorical = {i: col for i, col, _, _ in self.categorical}
+
+        for i, col in enumerate(self.features):
+            values = X[:, i].astype(np.float64)
+            if i in categorical:
+                codes = np.where(np.isnan(values), -1, values).astype(np.int64)
+                columns[col] = pd.Categorical.from_codes(
+                    codes, categories=self.categories[col], ordered=True
+                )
+            elif col in self.int_columns:
+                columns[col] = pd.array(values, dtype="Int64")
+            else:
+                columns[col] = values
+
+        return pd.DataFrame(columns, index=index)
+
+
+def _to_float(value):
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _hashable(value) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _unhashable(col, value) -> ValueError:
+    return ValueError(
+        f"❌ Feature '{col}' got {type(value).__name__} {value!r:.60} (expected a scalar value)"
+    )
+
+
+def _arrow_castable(arrow_type) -> bool:
+    import pyarrow as pa
+
+    return (
+        pa.types.is_integer(arrow_type)
+        or pa.types.is_floating(arrow_type)
+        or pa.types.is_decimal(arrow_type)
+        or pa.types.is_boolean(arrow_type)
+        or pa.types.is_null(arrow_type)
+    )
+
+
+PREPROCESSOR = (
+    BUNDLE.preprocessor() if BUNDLE is not None
+    else CompiledPreprocessor(FEATURES, DTYPES, CATEGORY_MAPS)
+)
 
 
 def preprocess_for_model(df: pd.DataFrame) -> pd.DataFrame:
@@ -22,27 +294,17 @@ def preprocess_for_model(df: pd.DataFrame) -> pd.DataFrame:
     - column order
     - dtypes
     - categorical universes
+
+    Runs through the compiled PREPROCESSOR (precomputed category lookups)
+    and rebuilds the frame with Categorical.from_codes. The matrix is
+    float64 here so numeric values are exactly pd.to_numeric's, as before;
+    the engines use the float32 matrix directly.
     """
 
-    # 1️⃣ Enforce feature order
-    df = df[FEATURES].copy()
-
-    # 2️⃣ Coerce numeric columns
-    for col, dtype in DTYPES.items():
-        if dtype.startswith("int"):
-            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
-        elif dtype.startswith("float"):
-            df[col] = pd.to_numeric(df[col], errors="coerce").astype(float)
-
-    # 3️⃣ Apply categorical dtype WITH TRAINED CATEGORIES
-    for col, categories in CATEGORY_MAPS.items():
-        df[col] = pd.Categorical(
-            df[col],
-            categories=categories,
-            ordered=True
-        )
+    X = PREPROCESSOR.transform(df, out=PREPROCESSOR.allocate(len(df), np.float64))
+    df = PREPROCESSOR.to_frame(X, index=df.index)
 
-    # 4️⃣ Final sanity check (THIS SAVES YOU FROM SILENT MODEL FAILURE)
+    # Final sanity check (THIS SAVES YOU FROM SILENT MODEL FAILURE)
     bad_object_cols = [c for c in df.columns if df[c].dtype == "object"]
     if bad_object_cols:
         raise ValueError(
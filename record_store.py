@@ -0,0 +1,169 @@
+# record_store.py
+import json
+import math
+import re
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+
+from write_behind import json_default
+
+RECORDS_DB_PATH = "beneficiary_records.sqlite3"
+
+
+class RecordStore:
+    """
+    Beneficiary records in SQLite, indexed on name / village / district.
+
+    Edit mode asks for one page of (id, name, village) matches and then
+    loads a single record, instead of reading every row on every rerun.
+    The full record is kept as JSON next to the indexed columns.
+    """
+
+    def __init__(self, path=RECORDS_DB_PATH):
+        self.path = str(path)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS beneficiaries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+                    state TEXT,
+                    district TEXT,
+                    block TEXT,
+                    village TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_beneficiaries_name ON beneficiaries (name);
+                CREATE INDEX IF NOT EXISTS idx_beneficiaries_village ON beneficiaries (village);
+                CREATE INDEX IF NOT EXISTS idx_beneficiaries_district ON beneficiaries (district, name);
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @staticmethod
+    def _columns(record: dict) -> tuple:
+        def text(key):
+            value = record.get(key)
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                return ""
+            return str(value).strip()
+
+        return (
+            text("Beneficiary Name"),
+            text("State"),
+            text("District"),
+            text("Block"),
+            text("Village"),
+            json.dumps(record, default=json_default),
+            time.time(),
+        )
+
+    # -------------------------
+    # writes
+    # -------------------------
+    def save(self, record: dict, record_id=None) -> int:
+        """Insert a new record, or overwrite `record_id` (edit mode)."""
+        values = self._columns(record)
+        with closing(self._connect()) as conn:
+            if record_id is not None:
+                cur = conn.execute(
+                    """
+                    UPDATE beneficiaries
+                    SET name = ?, state = ?, district = ?, block = ?, village = ?,
+                        data = ?, updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (*values, record_id),
+                )
+                if cur.rowcount:
+                    return record_id
+
+            cur = conn.execute(
+                """
+                INSERT INTO beneficiaries
+                    (name, state, district, block, village, data, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                values,
+            )
+            return cur.lastrowid
+
+    def import_csv(self, csv_path) -> int:
+        """One-off migration of the old beneficiary_records.csv (only into an empty store)."""
+        if not Path(csv_path).exists() or self.count() > 0:
+            return 0
+
+        df = pd.read_csv(csv_path)
+        rows = [self._columns(r) for r in df.to_dict(orient="records")]
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                """
+                INSERT INTO beneficiaries
+                    (name, state, district, block, village, data, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.execute("COMMIT")
+        return len(rows)
+
+    # -------------------------
+    # reads
+    # -------------------------
+    @staticmethod
+    def _where(query, district):
+        clauses, params = [], []
+        query = (query or "").strip()
+        if query:
+            # prefix match -> served by the NOCASE indexes
+            # (wildcards in the query are matched literally)
+            clauses.append("(name LIKE ? ESCAPE '\\' OR village LIKE ? ESCAPE '\\')")
+            like = re.sub(r"([\\%_])", r"\\\1", query) + "%"
+            params += [like, like]
+        if district:
+            clauses.append("district = ?")
+            params.append(district)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
+
+    def count(self, query="", district=None) -> int:
+        where, params = self._where(query, district)
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM beneficiaries {where}", params
+            ).fetchone()[0]
+
+    def search(self, query="", district=None, limit=20, offset=0) -> list:
+        """One page of (id, name, village, district), ordered by name."""
+        where, params = self._where(query, district)
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                f"""
+                SELECT id, name, village, district FROM beneficiaries {where}
+                ORDER BY name, id LIMIT ? OFFSET ?
+                """,
+                (*params, limit, offset),
+            ).fetchall()
+
+    def get(self, record_id) -> dict:
+        """Full record; missing / NaN fields are dropped so form defaults apply."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT data FROM beneficiaries WHERE id = ?", (record_id,)
+            ).fetchone()
+        if row is None:
+            return {}
+        record = json.loads(row[0])
+        return {
+            k: v for k, v in record.items()
+            if v is not None and not (isinstance(v, float) and math.isnan(v))
+        }
@@ -0,0 +1,69 @@
+# scoring.py
+import numpy as np
+import pandas as pd
+
+from preprocessing import FEATURES
+
+
+def risk_category(lbw_percent: float) -> str:
+    """
+    Same thresholds as the Streamlit form:
+    <35% No Risk, <50% Mild Risk, otherwise High Risk.
+    """
+    if lbw_percent < 35:
+        return "No Risk"
+    elif lbw_percent < 50:
+        return "Mild Risk"
+    return "High Risk"
+
+
+def risk_categories(lbw_percent: np.ndarray) -> np.ndarray:
+    """risk_category for a whole array of percents at once (same thresholds)."""
+    return np.select(
+        [lbw_percent < 35, lbw_percent < 50],
+        ["No Risk", "Mild Risk"],
+        default="High Risk",
+    ).astype(object)
+
+
+def records_to_frame(records: list) -> pd.DataFrame:
+    """
+    Build the raw model input (FEATURES order) from a list of record dicts.
+    Missing keys and None become NaN, exactly like the form does.
+    """
+    return pd.DataFrame(
+        [{k: record.get(k, None) for k in FEATURES} for record in records],
+        columns=FEATURES,
+    ).replace({None: np.nan})
+
+
+def score_frame(engine, X_raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score a whole batch with ONE preprocessing pass and ONE model call
+    (engine from inference.load_engine).
+
+    Returns lbw_prob, lbw_percent and risk_category per row.
+    """
+    return scores_from_probs(engine.predict_frame(X_raw), X_raw.index)
+
+
+def score_records(engine, records: list) -> pd.DataFrame:
+    """
+    Same as score_frame, but straight from record dicts: the compiled
+    PREPROCESSOR fills the float32 matrix without building a raw DataFrame.
+    """
+    return scores_from_probs(engine.predict_records(records))
+
+
+def scores_from_probs(lbw_prob, index=None) -> pd.DataFrame:
+    lbw_prob = np.asarray(lbw_prob, dtype=float)
+    lbw_percent = np.round(lbw_prob * 100, 2)
+
+    return pd.DataFrame(
+        {
+            "lbw_prob": lbw_prob,
+            "lbw_percent": lbw_percent,
+            "risk_category": risk_categories(lbw_percent),
+        },
+        index=index,
+    )
@@ -0,0 +1,201 @@
+# serve.py
+"""
+Pre-fork server for the scoring API.
+
+The model / engine is loaded ONCE in the parent, the listening socket is
+bound, and then N workers are forked. Every worker runs its own uvicorn
+event loop on the shared socket, and the model pages are shared
+copy-on-write instead of being deserialized N times (uvicorn --workers
+spawns fresh interpreters, which would reload the model in each). The
+SHAP explainer is built in the parent as well (unless LBW_WARMUP=0 or
+LBW_WARMUP_EXPLAINER=0), so each worker's warm-up finds it cached.
+
+A worker that exits is respawned. One that exits within
+LBW_WORKER_MIN_UPTIME seconds counts as a crash: it is respawned after an
+exponential backoff, and after LBW_WORKER_MAX_CRASHES crashes in a row
+the server stops instead of respawning in a tight loop.
+
+    python serve.py --port 8000 --workers 4 --engine booster
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+import api
+import inference
+from explain import get_explainer
+from inference import INFERENCE_ENGINE, load_engine
+from warmup import WARMUP_ENABLED, WARMUP_EXPLAINER
+
+WORKER_MIN_UPTIME = float(os.environ.get("LBW_WORKER_MIN_UPTIME", "10"))
+WORKER_MAX_CRASHES = int(os.environ.get("LBW_WORKER_MAX_CRASHES", "5"))
+
+
+class CrashBackoff:
+    """
+    Respawn delay for exited workers.
+
+    - an exit after `min_uptime` seconds resets the count -> respawn now
+    - a faster exit is a crash -> wait base * 2^(crashes - 1), up to `cap`
+    - `max_crashes` crashes in a row -> None (give up)
+    """
+
+    def __init__(self, min_uptime=WORKER_MIN_UPTIME, max_crashes=WORKER_MAX_CRASHES, base=0.5, cap=30.0):
+        self.min_uptime = min_uptime
+        self.max_crashes = max_crashes
+        self.base = base
+        self.cap = cap
+        self.crashes = 0
+
+    def next_delay(self, uptime: float):
+        if uptime >= self.min_uptime:
+            self.crashes = 0
+            return 0.0
+        self.crashes += 1
+        if self.crashes >= self.max_crashes:
+            return None
+        return min(self.cap, self.base * 2 ** (self.crashes - 1))
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock, threads_per_worker: int, log_level: str):
+    # one XGBoost thread per worker: the cores are shared by processes
+    load_engine().set_threads(threads_per_worker)
+    config = uvicorn.Config(api.app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _preload(explain=WARMUP_ENABLED and WARMUP_EXPLAINER):
+    """Engine (and SHAP explainer) loaded in this process, before any fork."""
+    t0 = time.perf_counter()
+    engine = load_engine()
+    print(
+        f"Loaded {engine.name} engine in {time.perf_counter() - t0:.2f}s "
+        f"(pid {os.getpid()})",
+        file=sys.stderr,
+    )
+    if explain:
+        # cached per model hash -> the workers' warm-up reuses this one
+        t0 = time.perf_counter()
+        get_explainer(engine)
+        print(f"Built SHAP explainer in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+    return engine
+
+
+def serve(host="0.0.0.0", port=8000, workers=1, threads_per_worker=1, log_level="warning"):
+    # 1️⃣ load before forking -> shared copy-on-write in every worker
+    _preload()
+
+    sock = _bind(host, port)
+
+    if workers <= 1:
+        _run_worker(sock, threads_per_worker, log_level)
+        return
+
+    # 2️⃣ keep the loaded objects out of the GC's way so collections in
+    #    the workers do not touch (and un-share) their pages
+    gc.freeze()
+
+    children = {}   # pid -> start time
+    stopping = False
+    backoff = CrashBackoff()
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 1
+            try:
+                _run_worker(sock, threads_per_worker, log_level)
+                code = 0
+            finally:
+                os._exit(code)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for _ in range(workers):
+        spawn()
+    print(f"Serving on {host}:{port} with {workers} workers", file=sys.stderr)
+
+    # 3️⃣ supervise: restart exited workers (backing off on crashes) until asked to stop
+    failed = False
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        uptime = time.monotonic() - children.pop(pid)
+        if stopping:
+            continue
+        delay = backoff.next_delay(uptime)
+        print(
+            f"Worker {pid} exited with code {os.waitstatus_to_exitcode(status)} "
+            f"after {uptime:.1f}s",
+            file=sys.stderr,
+        )
+        if delay is None:
+            print(
+                f"❌ {backoff.crashes} workers crashed within {backoff.min_uptime:g}s "
+                "in a row; stopping",
+                file=sys.stderr,
+            )
+            failed = True
+            stop(None, None)
+            continue
+        if delay:
+            time.sleep(delay)
+        if not stopping:
+            spawn()
+
+    sock.close()
+    if failed:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork server for the LBW scoring API.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--engine", default=INFERENCE_ENGINE, choices=["sklearn", "booster"])
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    # parent, workers and the API lifespan all resolve the same engine
+    inference.INFERENCE_ENGINE = args.engine
+
+    serve(args.host, args.port, args.workers, args.threads_per_worker, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
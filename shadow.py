@@ -0,0 +1,400 @@
+# shadow.py
+"""
+Shadow / A-B scoring of a candidate model next to the production one.
+
+    LBW_SHADOW_MODEL_PATH=artifacts/xgb_model_v2.pkl   # candidate (unset -> off)
+    LBW_SHADOW_FRACTION=0.25   # share of beneficiaries also scored by the candidate
+    LBW_SHADOW_MODE=shadow     # shadow: production served, candidate recorded
+                               # ab:     candidate served for that share,
+                               #         production recorded
+
+ShadowEngine wraps the production engine like CachedEngine does, so every
+caller keeps using predict_matrix / predict_records / predict_frame. Both
+models score the SAME preprocessed matrix (one PREPROCESSOR pass), so the
+candidate must have been trained on the same table: feature names, types
+and every category list (in order) are checked against the production
+preprocessor when it is loaded.
+
+The sample is sticky: each row's arm comes from a hash of a stable key
+(the beneficiary, when the caller passes keys; otherwise the preprocessed
+row itself), so the same beneficiary always gets the same arm.
+
+- the served model runs inline, exactly as before
+- the other one runs on a small thread pool; the caller only pays for the
+  submit. When LBW_SHADOW_MAX_PENDING batches are already queued, further
+  shadow runs are dropped (and counted) instead of piling up
+
+Every completed pair is appended to LBW_SHADOW_LOG (JSON lines: served
+arm, both probabilities, both model hashes), and summarized in stats()
+(mean |difference|, risk-category agreement, shadow latency).
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from inference import build_engine
+from metrics import Histogram
+from model_registry import REGISTRY
+from prediction_cache import row_keys
+from scoring import risk_categories
+
+SHADOW_MODEL_PATH = os.environ.get("LBW_SHADOW_MODEL_PATH")
+SHADOW_FRACTION = float(os.environ.get("LBW_SHADOW_FRACTION", "0.25"))
+SHADOW_MODE = os.environ.get("LBW_SHADOW_MODE", "shadow")
+SHADOW_MAX_PENDING = int(os.environ.get("LBW_SHADOW_MAX_PENDING", "32"))
+SHADOW_WORKERS = int(os.environ.get("LBW_SHADOW_WORKERS", "1"))
+SHADOW_LOG = os.environ.get("LBW_SHADOW_LOG", "shadow_scores.jsonl")
+# how long the form waits for the other arm when saving both probabilities
+SHADOW_WAIT_MS = float(os.environ.get("LBW_SHADOW_WAIT_MS", "50"))
+
+MODES = ("shadow", "ab")
+SHADOW_MS_BUCKETS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+
+
+class ShadowRun:
+    """
+    One scored batch: the served probabilities now, the other arm's later.
+
+    `served` is the arm per row ("production" / "candidate"), `sampled`
+    marks the rows the other arm scores in the background.
+    """
+
+    def __init__(self, probs, served=None, future=None, candidate_sha256=None, sampled=None):
+        n = len(probs)
+        self.probs = probs
+        self.served = served if served is not None else np.full(n, "production", dtype=object)
+        self.future = future
+        self.candidate_sha256 = candidate_sha256
+        self.sampled = sampled if sampled is not None else np.zeros(n, dtype=bool)
+
+    def other(self, timeout=None):
+        """
+        The other arm's probabilities per row (NaN for rows not sampled),
+        or None if no row was sampled, or the run was dropped, failed, or
+        is not done within `timeout` s.
+        """
+        if self.future is None:
+            return None
+        try:
+            probs = self.future.result(timeout)
+        except Exception:
+            return None
+        other = np.full(len(self.probs), np.nan)
+        other[self.sampled] = probs
+        return other
+
+    def audit_columns(self, row=0, wait_ms=SHADOW_WAIT_MS) -> dict:
+        """Both probabilities for one row, for the saved record ({} if no candidate)."""
+        if self.candidate_sha256 is None:
+            return {}
+        served = self.served[row]
+        other = self.other(wait_ms / 1000) if self.sampled[row] else None
+        mine = float(self.probs[row])
+        theirs = float(other[row]) if other is not None else None
+        production, candidate = (mine, theirs) if served == "production" else (theirs, mine)
+        return {
+            "model_served": served,
+            "lbw_prob_production": production,
+            "lbw_prob_candidate": candidate,
+            "candidate_sha256": self.candidate_sha256,
+        }
+
+
+def sampled_rows(keys, fraction) -> np.ndarray:
+    """
+    Sticky sample: True where hash(key) falls in the first `fraction` of
+    the hash space, so a key is always in (or out of) the sample.
+    """
+    if fraction >= 1:
+        return np.ones(len(keys), dtype=bool)
+    if fraction <= 0:
+        return np.zeros(len(keys), dtype=bool)
+    cut = int(fraction * 2 ** 64)
+    return np.array([
+        int.from_bytes(
+            hashlib.blake2b(
+                key if isinstance(key, bytes) else str(key).encode(), digest_size=8
+            ).digest(),
+            "big",
+        ) < cut
+        for key in keys
+    ], dtype=bool)
+
+
+def _recorded_categories(values) -> tuple:
+    """
+    One exported category array in a comparable form. Strings are compared
+    as bytes (cast to binary, never decoded): XGBoost 3.1 / 3.2 record
+    non-ASCII categories with character offsets over UTF-8 bytes, which
+    do not decode.
+    """
+    import pyarrow as pa
+
+    if pa.types.is_string(values.type) or pa.types.is_large_string(values.type):
+        return ("str", tuple(values.cast(pa.binary()).to_pylist()))
+    return ("values", tuple(values.to_pylist()))
+
+
+def _expected_categories(categories) -> set:
+    """The forms _recorded_categories() can take for a trained category list."""
+    if not all(isinstance(c, str) for c in categories):
+        return {("values", tuple(categories))}
+    data = "".join(categories).encode()
+    chars = np.cumsum([0] + [len(c) for c in categories]).tolist()   # XGBoost's character offsets
+    return {
+        ("str", tuple(c.encode() for c in categories)),
+        ("str", tuple(data[a:b] for a, b in zip(chars, chars[1:]))),
+    }
+
+
+def _model_tables(engine):
+    """(feature names, feature types, {categorical feature: recorded categories} or None) of the model."""
+    engine = getattr(engine, "engine", engine)
+    booster = engine.booster if hasattr(engine, "booster") else engine.model.get_booster()
+    try:
+        # recorded by XGBoost >= 3.1 when trained on pandas categoricals
+        exported = booster.get_categories(export_to_arrow=True)
+        categories = None if exported.empty() else {
+            name: _recorded_categories(values)
+            for name, values in exported.to_arrow() if values is not None
+        }
+    except Exception:
+        categories = None
+    return booster.feature_names, booster.feature_types, categories
+
+
+def table_mismatches(engine, preprocessor) -> list:
+    """Why `engine`'s model cannot score `preprocessor`'s matrix ([] if it can)."""
+    names, types, categories = _model_tables(engine)
+    if names is not None and list(names) != preprocessor.features:
+        return ["feature names / order differ"]
+
+    problems = []
+    if types is not None:
+        differ = [
+            col for col, mine, theirs in zip(preprocessor.features, preprocessor.feature_types, types)
+            if mine != theirs
+        ]
+        if differ:
+            problems.append(f"feature types differ for {differ}")
+    if categories is not None:
+        differ = [
+            col for col in sorted(set(categories) | set(preprocessor.categories))
+            if col not in categories
+            or col not in preprocessor.categories
+            or categories[col] not in _expected_categories(preprocessor.categories[col])
+        ]
+        if differ:
+            problems.append(f"categories differ for {differ}")
+    else:
+        warnings.warn(
+            "⚠️ Candidate model does not record its training categories; "
+            "only feature names and types were checked"
+        )
+    return problems
+
+
+class ShadowEngine:
+    """Production engine + candidate engine behind one engine interface."""
+
+    def __init__(
+        self,
+        production,
+        candidate,
+        fraction=SHADOW_FRACTION,
+        mode=SHADOW_MODE,
+        max_pending=SHADOW_MAX_PENDING,
+        workers=SHADOW_WORKERS,
+        log_path=SHADOW_LOG,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"❌ Unknown shadow mode '{mode}' ({' | '.join(MODES)})")
+        problems = table_mismatches(candidate, production.preprocessor)
+        if problems:
+            raise ValueError(
+                "❌ Candidate model was trained on a different table "
+                f"({'; '.join(problems)}); it cannot share the production preprocessing pass"
+            )
+
+        self.production = production
+        self.candidate = candidate
+        self.fraction = fraction
+        self.mode = mode
+        self.max_pending = max_pending
+        self.log_path = log_path
+
+        # engine interface (explainers / warm-up see the production model)
+        self.engine = getattr(production, "engine", production)
+        self.name = production.name
+        self.sha256 = getattr(production, "sha256", None)
+        self.candidate_sha256 = getattr(candidate, "sha256", None)
+        self.preprocessor = production.preprocessor
+
+        self.latency_ms = Histogram(
+            "lbw_shadow_latency_ms", SHADOW_MS_BUCKETS, "Shadow arm scoring time"
+        )
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.failed = 0
+        self._pending = 0
+        self._rows = 0
+        self._abs_diff_sum = 0.0
+        self._agree = 0
+
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lbw-shadow")
+
+    # -------------------------
+    # engine interface
+    # -------------------------
+    def set_threads(self, n: int):
+        self.production.set_threads(n)
+        self.candidate.set_threads(n)
+
+    def predict_matrix(self, X):
+        return self.score(X).probs
+
+    def predict_frame(self, X_raw):
+        return self.predict_matrix(self.preprocessor.transform(X_raw))
+
+    def predict_records(self, records: list):
+        return self.predict_matrix(self.preprocessor.transform_records(records))
+
+    # -------------------------
+    # scoring
+    # -------------------------
+    def score(self, X, keys=None) -> ShadowRun:
+        """
+        Served probabilities for X; the other arm scores the sampled rows
+        in the background (on a copy). `keys` are stable per-row keys
+        (e.g. the beneficiary); by default each row is keyed by its values.
+        """
+        n = len(X)
+        if 0 < self.fraction < 1 and keys is None:
+            keys = row_keys(X)
+        sampled = sampled_rows(keys if keys is not None else range(n), self.fraction)
+        if not sampled.any():
+            return ShadowRun(self.production.predict_matrix(X), None, None, self.candidate_sha256)
+
+        if self.mode == "shadow":
+            probs = np.asarray(self.production.predict_matrix(X), dtype=float)
+            served = np.full(n, "production", dtype=object)
+            future = self._submit(self.candidate, X[sampled], probs[sampled], "production")
+        else:
+            probs = np.empty(n)
+            probs[sampled] = self.candidate.predict_matrix(X[sampled])
+            if not sampled.all():
+                probs[~sampled] = self.production.predict_matrix(X[~sampled])
+            served = np.where(sampled, "candidate", "production").astype(object)
+            future = self._submit(self.production, X[sampled], probs[sampled], "candidate")
+        return ShadowRun(probs, served, future, self.candidate_sha256, sampled)
+
+    def _submit(self, engine, X, served_probs, served):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return None
+            self._pending += 1
+            self.submitted += 1
+        return self._executor.submit(self._run_other, engine, X, served_probs, served)
+
+    def _run_other(self, engine, X, served_probs, served):
+        try:
+            t0 = time.perf_counter()
+            probs = np.asarray(engine.predict_matrix(X), dtype=float)
+            self.latency_ms.observe((time.perf_counter() - t0) * 1000)
+
+            served_probs = np.asarray(served_probs, dtype=float)
+            production, candidate = (
+                (served_probs, probs) if served == "production" else (probs, served_probs)
+            )
+            self._record(served, production, candidate)
+            return probs
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _record(self, served, production, candidate):
+        agree = risk_categories(np.round(production * 100, 2)) == risk_categories(
+            np.round(candidate * 100, 2)
+        )
+        with self._lock:
+            self.completed += 1
+            self._rows += len(production)
+            self._abs_diff_sum += float(np.nansum(np.abs(production - candidate)))
+            self._agree += int(agree.sum())
+
+        if not self.log_path:
+            return
+        ts = time.time()
+        lines = [
+            json.dumps({
+                "ts": ts,
+                "served": served,
+                "lbw_prob_production": float(p),
+                "lbw_prob_candidate": float(c),
+                "production_sha256": self.sha256,
+                "candidate_sha256": self.candidate_sha256,
+            })
+            for p, c in zip(production, candidate)
+        ]
+        with self._log_lock, open(self.log_path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+    # -------------------------
+    # reporting / lifecycle
+    # -------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._rows
+            return {
+                "mode": self.mode,
+                "fraction": self.fraction,
+                "production_sha256": self.sha256,
+                "candidate_sha256": self.candidate_sha256,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "pending": self._pending,
+                "rows": rows,
+                "mean_abs_diff": self._abs_diff_sum / rows if rows else None,
+                "risk_category_agreement": self._agree / rows if rows else None,
+                "latency_ms": self.latency_ms.snapshot(),
+            }
+
+    def close(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+def shadow_engine(production, path=SHADOW_MODEL_PATH, engine_name=None, **kwargs):
+    """
+    `production` wrapped in a ShadowEngine when a candidate model is
+    configured (LBW_SHADOW_MODEL_PATH), otherwise `production` itself.
+    The candidate is registered as "candidate" in the model registry and
+    uses the same engine type as production unless `engine_name` is given.
+    """
+    if not path:
+        return production
+    entry = REGISTRY.register("candidate", path)
+    candidate = build_engine(entry, engine_name or production.name)
+    return ShadowEngine(production, candidate, **kwargs)
+
+
+def score(engine, X, keys=None) -> ShadowRun:
+    """engine.score(X, keys) for a ShadowEngine; a plain production run for any other engine."""
+    if isinstance(engine, ShadowEngine):
+        return engine.score(X, keys)
+    return ShadowRun(engine.predict_matrix(X))
@@ -0,0 +1,60 @@
+# synthetic.py
+"""
+Synthetic beneficiary rows in the model schema, generated only from
+features.json / dtypes.json / category_maps.json. Used by benchmarks,
+load tests and warm-up; never for training.
+"""
+import numpy as np
+import pandas as pd
+
+from preprocessing import CATEGORY_MAPS, DTYPES, FEATURES
+
+# plausible ranges for the numeric features (anything else -> 0..10)
+NUMERIC_RANGES = {
+    "Beneficiary age": (15, 45),
+    "Number of living child at now": (0, 5),
+    "BMI_PW1_Prog": (15.0, 35.0),
+    "BMI_PW2_Prog": (15.0, 35.0),
+    "BMI_PW3_Prog": (15.0, 35.0),
+    "BMI_PW4_Prog": (15.0, 35.0),
+    "counselling_gap_days": (0.0, 200.0),
+    "LMPtoINST1": (0.0, 280.0),
+    "LMPtoINST2": (0.0, 280.0),
+    "LMPtoINST3": (0.0, 280.0),
+    "No of ANCs completed": (0, 4),
+    "No. of IFA tablets received/procured in last one month_log1p": (0.0, 4.8),
+    "No. of calcium tablets consumed in last one month_log1p": (0.0, 4.8),
+    "Household_Assets_Score_log1p": (0.0, 3.0),
+    "PMMVY-Number of installment received": (0.0, 3.0),
+    "JSY-Number of installment received": (0.0, 2.0),
+}
+
+
+def synthetic_frame(n: int, seed: int = 0, missing_rate: float = 0.1) -> pd.DataFrame:
+    """`n` raw rows (FEATURES columns), with ~missing_rate of cells left empty."""
+    rng = np.random.default_rng(seed)
+    columns = {}
+
+    for col in FEATURES:
+        if col in CATEGORY_MAPS:
+            categories = np.array(CATEGORY_MAPS[col], dtype=object)
+            values = categories[rng.integers(0, len(categories), n)]
+        else:
+            low, high = NUMERIC_RANGES.get(col, (0, 10))
+            if DTYPES.get(col, "").startswith("int"):
+                values = rng.integers(low, high + 1, n).astype(float)
+            else:
+                values = rng.uniform(low, high, n)
+            values = values.astype(object)
+
+        if missing_rate:
+            values[rng.random(n) < missing_rate] = None
+        columns[col] = values
+
+    return pd.DataFrame(columns, columns=FEATURES)
+
+
+def synthetic_records(n: int, seed: int = 0, missing_rate: float = 0.1) -> list:
+    """Same rows as synthetic_frame, as JSON-ready dicts (missing -> None)."""
+    df = synthetic_frame(n, seed, missing_rate)
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
@@ -0,0 +1,26 @@
+# tests/conftest.py
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# the modules are flat top-level files that read artifacts/ relative to the repo
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+# keep SHAP out of the API warm-up (slow, and not what these tests cover)
+os.environ.setdefault("LBW_WARMUP_EXPLAINER", "0")
+
+
+@pytest.fixture(scope="module")
+def client():
+    """The scoring API with its lifespan (engine, warm-up, micro-batcher) running, warmed up."""
+    from fastapi.testclient import TestClient
+
+    from api import app
+
+    with TestClient(app) as client:
+        client.app.state.warmup.wait(60)
+        yield client
@@ -0,0 +1,43 @@
+# tests/test_api_columnar.py
+import io
+import subprocess
+import sys
+
+import pytest
+
+from preprocessing import PREPROCESSOR
+from synthetic import synthetic_frame
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.ipc  # noqa: E402
+
+
+def test_importing_the_api_does_not_load_the_columnar_stack():
+    code = "import sys, api; print('columnar' in sys.modules, 'pyarrow.parquet' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+    ).stdout.split()
+    assert out == ["False", "False"]
+
+
+def test_arrow_stream_round_trip(client):
+    table = pa.Table.from_pandas(
+        synthetic_frame(5, seed=1)[PREPROCESSOR.features], preserve_index=False
+    )
+    body = io.BytesIO()
+    with pa.ipc.new_stream(body, table.schema) as writer:
+        writer.write_table(table)
+
+    response = client.post(
+        "/predict/columnar", content=body.getvalue(),
+        headers={"Content-Type": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 200
+    scores = pa.ipc.open_stream(response.content).read_all()
+    assert scores.num_rows == 5
+    assert scores.column_names[:2] == ["lbw_prob", "lbw_percent"]
+
+
+def test_other_media_types_are_415(client):
+    response = client.post("/predict/columnar", content=b"a,b", headers={"Content-Type": "text/csv"})
+    assert response.status_code == 415
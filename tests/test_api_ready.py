@@ -0,0 +1,43 @@
+# tests/test_api_ready.py
+import threading
+
+from fastapi.testclient import TestClient
+
+import api
+from warmup import WarmUp
+
+
+def test_ready_is_503_while_warming_up(monkeypatch):
+    release = threading.Event()
+    warm_up = WarmUp._warm_up
+
+    def slow_warm_up(self):
+        release.wait(30)
+        warm_up(self)
+
+    monkeypatch.setattr(WarmUp, "_warm_up", slow_warm_up)
+    with TestClient(api.app) as client:
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming up"
+        assert response.json()["warmup"]["warming_up"] is True
+        assert client.get("/health").status_code == 200
+
+        release.set()
+        assert client.app.state.warmup.wait(30)
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert set(response.json()["warmup"]["stages_ms"]) >= {"predict_batch", "predict_one"}
+
+
+def test_failed_warm_up_is_not_ready(monkeypatch):
+    def broken_warm_up(self):
+        raise RuntimeError("background.npy is corrupt")
+
+    monkeypatch.setattr(WarmUp, "_warm_up", broken_warm_up)
+    with TestClient(api.app) as client:
+        client.app.state.warmup.wait(30)
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "not ready"
+        assert "corrupt" in response.json()["warmup"]["error"]
@@ -0,0 +1,60 @@
+# tests/test_api_stream.py
+import json
+
+import api
+from synthetic import synthetic_records
+
+
+def records(n, seed=11):
+    return [
+        {k: v for k, v in record.items() if v is not None}
+        for record in synthetic_records(n, seed=seed)
+    ]
+
+
+def stream(client, lines):
+    body = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+    response = client.post(
+        "/predict/stream", content=body.encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_every_line_is_scored_in_order(client):
+    out = stream(client, records(5))
+    assert [o["line"] for o in out] == [1, 2, 3, 4, 5]
+    assert all("lbw_prob" in o for o in out)
+
+
+def test_bad_record_errors_only_its_line(client):
+    good = records(2)
+    out = stream(client, [good[0], {**good[1], "Child order/parity": [1]}, good[1], "not json"])
+
+    assert [o["line"] for o in out] == [1, 2, 3, 4]
+    assert "lbw_prob" in out[0] and "lbw_prob" in out[2]
+    assert "Child order/parity" in out[1]["error"]
+    assert out[3]["error"].startswith("invalid JSON")
+
+    # same scores as when the chunk has no bad record
+    clean = stream(client, good)
+    assert out[0]["lbw_prob"] == clean[0]["lbw_prob"]
+    assert out[2]["lbw_prob"] == clean[1]["lbw_prob"]
+
+
+def test_unexpected_error_in_one_record_does_not_truncate_the_stream(client, monkeypatch):
+    transform_records = api.PREPROCESSOR.transform_records
+
+    def fragile(rows, out=None):
+        if any("boom" in row for row in rows):
+            raise TypeError("unsupported operand")
+        return transform_records(rows, out)
+
+    monkeypatch.setattr(api.PREPROCESSOR, "transform_records", fragile)
+    good = records(2)
+    out = stream(client, [good[0], {**good[1], "boom": 1}, good[1]])
+
+    assert [o["line"] for o in out] == [1, 2, 3]
+    assert out[1] == {"line": 2, "error": "TypeError: unsupported operand"}
+    assert "lbw_prob" in out[0] and "lbw_prob" in out[2]
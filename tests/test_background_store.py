@@ -0,0 +1,52 @@
+# tests/test_background_store.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import background_store
+from background_store import build, load_background
+from preprocessing import PREPROCESSOR
+
+
+@pytest.fixture
+def paths(tmp_path):
+    csv = tmp_path / "background.csv"
+    csv.write_bytes(background_store.BACKGROUND_CSV.read_bytes())
+    return csv, tmp_path / "background.npy", tmp_path / "background_stats.json"
+
+
+def test_background_is_a_read_only_memory_map(paths):
+    csv, npy, stats = paths
+    X = load_background(npy, stats, csv)   # built on first use
+
+    assert isinstance(X, np.memmap) and not X.flags.writeable
+    np.testing.assert_array_equal(X, PREPROCESSOR.transform(pd.read_csv(csv)))
+    assert sorted(p.name for p in csv.parent.iterdir()) == [
+        "background.csv", "background.npy", "background_stats.json",
+    ]
+
+
+def test_failed_rebuild_keeps_the_previous_file(paths, monkeypatch):
+    csv, npy, stats = paths
+    build(csv, npy, stats)
+    before = npy.read_bytes()
+
+    def broken_save(f, X):
+        f.write(b"\x93NUMPY half a file")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(background_store.np, "save", broken_save)
+    with pytest.raises(OSError, match="disk full"):
+        build(csv, npy, stats)
+
+    assert npy.read_bytes() == before
+    assert not list(csv.parent.glob("*.tmp"))
+
+
+def test_bundle_background_is_mapped_from_the_bundle_file():
+    bundle = background_store.BUNDLE
+    if bundle is None:
+        pytest.skip("no artifact bundle built")
+    X = load_background()
+    assert isinstance(X, np.memmap) and X.filename == bundle.path.resolve()
+    assert X.offset % 64 == 0
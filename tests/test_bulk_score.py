@@ -0,0 +1,48 @@
+# tests/test_bulk_score.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from bulk_score import bulk_score, iter_chunks
+from inference import load_engine
+from scoring import score_frame
+from synthetic import synthetic_frame
+
+TT = "Service received during last ANC: TT Injection given"
+PARITY = "Child order/parity"
+
+
+@pytest.fixture
+def backlog():
+    df = synthetic_frame(60, seed=7)
+    # first chunk: TT only "9999" (reads as int), parity with gaps (reads as float)
+    df.loc[:19, TT] = "9999"
+    df.loc[20:, TT] = np.where(np.arange(40) % 2, "Yes", "No")
+    df[PARITY] = pd.Series([1, 2, None] * 20, dtype=object)
+    return df
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_scores_do_not_depend_on_chunksize(tmp_path, backlog, suffix):
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+        backlog.to_parquet(tmp_path / f"in{suffix}", index=False)
+    else:
+        backlog.to_csv(tmp_path / f"in{suffix}", index=False)
+
+    outputs = []
+    for chunksize in (20, 1000):
+        out = tmp_path / f"out_{chunksize}.csv"
+        assert bulk_score(tmp_path / f"in{suffix}", out, chunksize=chunksize, progress=False) == 60
+        outputs.append(pd.read_csv(out))
+
+    pd.testing.assert_series_equal(outputs[0]["lbw_prob"], outputs[1]["lbw_prob"])
+    expected = score_frame(load_engine(), backlog)["lbw_prob"].to_numpy()
+    np.testing.assert_allclose(outputs[0]["lbw_prob"].to_numpy(), expected, rtol=1e-6)
+
+
+def test_csv_chunks_keep_trained_category_values(tmp_path, backlog):
+    backlog.to_csv(tmp_path / "in.csv", index=False)
+    first = next(iter_chunks(tmp_path / "in.csv", 20))
+    assert set(first[TT]) == {"9999"}
+    assert set(first[PARITY].dropna()) == {1, 2}
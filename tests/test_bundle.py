@@ -0,0 +1,108 @@
+# tests/test_bundle.py
+import json
+import os
+import shutil
+import warnings
+
+import pytest
+
+import bundle
+import inference
+from bundle import ArtifactBundle, build_bundle, get_bundle
+from inference import load_engine
+
+SOURCES = [
+    "features.json", "dtypes.json", "category_maps.json", "env.json",
+    "xgb_model.pkl", "background.csv",
+]
+
+
+@pytest.fixture
+def built(tmp_path, monkeypatch):
+    """A bundle built from a copy of artifacts/, with get_bundle()'s cache reset."""
+    source_dir = tmp_path / "artifacts"
+    source_dir.mkdir()
+    for name in SOURCES:
+        shutil.copy(bundle.SOURCE_DIR / name, source_dir / name)
+    path = tmp_path / "lbw_bundle.bin"
+    build_bundle(path, source_dir)
+
+    monkeypatch.setattr(bundle, "_BUNDLE", None)
+    monkeypatch.setattr(bundle, "_BUNDLE_CHECKED", False)
+    return path, source_dir
+
+
+def test_fresh_bundle_is_used(built):
+    path, source_dir = built
+    loaded = get_bundle(path, source_dir)
+    assert isinstance(loaded, ArtifactBundle)
+    assert loaded.stale_members(source_dir) == []
+
+
+@pytest.mark.parametrize("member", ["category_maps.json", "xgb_model.pkl"])
+def test_stale_bundle_is_refused(built, member):
+    path, source_dir = built
+    if member.endswith(".json"):
+        maps = json.loads((source_dir / member).read_text())
+        maps["Child order/parity"].append(3)
+        (source_dir / member).write_text(json.dumps(maps))
+    else:
+        (source_dir / member).write_bytes((source_dir / member).read_bytes() + b"retrained")
+
+    with pytest.warns(UserWarning, match=f"stale bundle.*{member}"):
+        assert get_bundle(path, source_dir) is None
+    assert get_bundle(path, source_dir) is None   # checked once per process
+
+
+def test_unchanged_sources_are_not_hashed(built, monkeypatch):
+    path, source_dir = built
+    loaded = ArtifactBundle(path)
+    monkeypatch.setattr(bundle, "_sha256", lambda data: pytest.fail("source file hashed"))
+    assert loaded.stale_members(source_dir) == []
+
+
+def test_same_size_edit_is_caught_by_the_hash(built):
+    path, source_dir = built
+    model = source_dir / "xgb_model.pkl"
+    data = bytearray(model.read_bytes())
+    data[-2] ^= 0xFF
+    mtime_ns = model.stat().st_mtime_ns
+    model.write_bytes(bytes(data))
+    os.utime(model, ns=(mtime_ns + 10**9, mtime_ns + 10**9))   # coarse filesystem clocks
+    assert ArtifactBundle(path).stale_members(source_dir) == ["xgb_model.pkl"]
+
+
+def test_opening_reads_only_the_json_members(built, recwarn):
+    path, _ = built
+    loaded = ArtifactBundle(path)
+    assert "background" not in loaded.timings and "model" not in loaded.timings
+    assert not [w for w in recwarn if "library versions" in str(w.message)]
+
+    assert loaded.background.shape[1] == len(loaded.features)
+    assert not loaded.background.flags.writeable
+
+
+def test_library_version_warning_is_raised_once(built, monkeypatch):
+    path, _ = built
+    loaded = ArtifactBundle(path)
+    monkeypatch.setattr(
+        bundle, "env_mismatches", lambda env: {"xgboost": ("0.0.1", "3.2.0")}
+    )
+    with pytest.warns(UserWarning, match="other library versions: xgboost 0.0.1"):
+        loaded.model_entry()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        loaded.model_entry()
+
+
+def test_explicit_model_path_wins_over_bundle(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_engine(path=str(tmp_path / "missing.pkl"))
+
+
+def test_model_path_env_wins_over_bundle(tmp_path, monkeypatch):
+    # as set before start-up (MODEL_PATH is read at import)
+    monkeypatch.setenv("LBW_MODEL_PATH", str(tmp_path / "missing.pkl"))
+    monkeypatch.setattr(inference, "MODEL_PATH", str(tmp_path / "missing.pkl"))
+    with pytest.raises(FileNotFoundError):
+        load_engine()
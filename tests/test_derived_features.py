@@ -0,0 +1,141 @@
+# tests/test_derived_features.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from derived_features import (
+    DEPENDENTS, DERIVED, FeatureState, derive_columns, derive_frame, derive_records,
+)
+from synthetic import synthetic_records
+
+RAW = {
+    "hb_value": 9.5,
+    "height_cm": 155,
+    "lmp_date": "2024-01-10",
+    "registration_date": "2024-02-20",
+    "anc1_date": "2024-05-01",
+    "anc2_date": "2024-03-01",
+    "anc1_weight": 50,
+    "anc2_weight": 53,
+    "ifa_tabs": 30,
+    "calcium_tabs": 0,
+    "household_assets": ["Electricity", "Mobile Telephone"],
+    "social_media": "WhatsApp, Facebook",
+    "pmmvy_inst1_date": "2024-04-01",
+}
+
+
+def test_features_from_raw_inputs():
+    derived = derive_records([RAW])[0]
+
+    assert derived["measured_HB_risk_bin"] == "mild_anaemia"
+    assert derived["RegistrationBucket"] == "Early"            # 41 days after LMP
+    assert derived["MonthConception"] == "January"
+    assert derived["BMI_PW1_Prog"] == pytest.approx(20.81)
+    assert derived["BMI_PW3_Prog"] is None                     # no anc3 weight
+    assert derived["No of ANCs completed"] == 2
+    assert derived["ANCBucket"] == "Early"                     # first ANC by date, not by number
+    assert derived["counselling_gap_days"] == 61
+    assert derived["Household_Assets_Score_log1p"] == pytest.approx(np.log1p(2.0), abs=1e-4)
+    assert derived["Social_Media_Category"] == "Medium"
+    assert derived["LMPtoINST1"] == 82
+    assert derived["LMPtoINST2"] is None
+
+
+def test_only_features_with_raw_inputs_are_derived():
+    assert set(derive_records([{"hb_value": 12}])[0]) == {"hb_value", "measured_HB_risk_bin"}
+    assert derive_records([]) == []
+
+
+def test_incremental_update_matches_the_batch_derive():
+    state = FeatureState(**RAW)
+    assert state.derived == {k: v for k, v in derive_records([RAW])[0].items() if k in DERIVED}
+
+    assert state.update(hb_value=7.0) == ["measured_HB_risk_bin"]
+    assert state["measured_HB_risk_bin"] == "moderate_anaemia"
+
+    # unchanged values (lists compared as lists) recompute nothing
+    assert state.update(hb_value=7.0, household_assets="Electricity,Mobile Telephone") == []
+
+    changed = state.update(lmp_date="2023-12-01")
+    assert sorted(changed) == sorted(DEPENDENTS["lmp_date"])
+    assert state.derived == {
+        k: v for k, v in derive_records([{**RAW, "hb_value": 7.0, "lmp_date": "2023-12-01"}])[0].items()
+        if k in DERIVED
+    }
+
+
+def test_cleared_input_gives_a_missing_feature():
+    state = FeatureState(**RAW)
+    assert state.update(anc2_date=None) == DEPENDENTS["anc2_date"]
+    assert state["No of ANCs completed"] == 1
+    assert state["counselling_gap_days"] is None
+    assert state["ANCBucket"] == "Mid"
+
+
+def test_unknown_raw_input_raises():
+    with pytest.raises(ValueError, match="Unknown raw input 'hb'"):
+        FeatureState(hb=9.5)
+
+
+def test_unknown_asset_raises_on_both_paths():
+    with pytest.raises(ValueError, match=r"Unknown household assets: \['Boat'\]"):
+        FeatureState(household_assets=["Electricity", "Boat"])
+    with pytest.raises(ValueError, match="Boat"):
+        derive_records([{"household_assets": "Boat"}])
+
+
+def test_frame_and_records_agree():
+    rows = [RAW, {**RAW, "hb_value": 12.5, "anc2_date": None, "household_assets": []}, {}]
+    frame = derive_frame(pd.DataFrame(rows, columns=list(RAW)))
+    records = derive_records(rows)
+
+    for name in DERIVED:
+        got = [None if v is None or v != v else v for v in frame[name]]   # NaN -> None
+        assert got == pytest.approx([r.get(name) for r in records]), name
+
+
+def test_frame_keeps_entered_features_without_raw_inputs():
+    df = pd.DataFrame({"hb_value": [9.5], "Social_Media_Category": ["High"]})
+    out = derive_frame(df)
+
+    assert out.loc[0, "measured_HB_risk_bin"] == "mild_anaemia"
+    assert out.loc[0, "Social_Media_Category"] == "High"    # no raw social_media column
+    assert set(DERIVED) <= set(out.columns)
+    assert "measured_HB_risk_bin" not in df.columns         # input is not modified
+
+
+def test_columns_over_several_rows():
+    cols = derive_columns({"hb_value": [5.0, 7.9, 10.9, 11.0, None]}, 5)
+    assert list(cols["measured_HB_risk_bin"]) == [
+        "severe_anaemia", "moderate_anaemia", "mild_anaemia", "normal", None,
+    ]
+
+
+def api_records(n, seed=51):
+    """Directly entered features plus raw inputs; the derived features are left out."""
+    return [
+        {
+            **{k: v for k, v in record.items() if v is not None and k not in DERIVED},
+            **RAW, "hb_value": 6 + i,
+        }
+        for i, record in enumerate(synthetic_records(n, seed=seed))
+    ]
+
+
+def test_predict_raw_matches_predict_on_derived_records(client):
+    records = api_records(4)
+    raw = client.post("/predict/raw", json=records)
+    assert raw.status_code == 200
+
+    derived = client.post("/predict", json=derive_records(records))
+    assert raw.json() == derived.json()
+
+
+def test_predict_raw_bad_input_is_422(client):
+    records = api_records(1)
+    response = client.post("/predict/raw", json=[{**records[0], "household_assets": ["Boat"]}])
+    assert response.status_code == 422
+    assert "Boat" in response.json()["detail"]
+
+    assert client.post("/predict/raw", json=[]).json() == []
@@ -0,0 +1,61 @@
+# tests/test_explain.py
+import numpy as np
+import pytest
+
+from explain import get_explainer, loaded_explainer
+from inference import load_engine
+from preprocessing import PREPROCESSOR
+from synthetic import synthetic_records
+
+
+def records(n, seed=21):
+    return [
+        {k: v for k, v in record.items() if v is not None}
+        for record in synthetic_records(n, seed=seed)
+    ]
+
+
+def test_attributions_add_up_to_the_score(client):
+    response = client.post("/explain", json=records(3))
+    assert response.status_code == 200
+
+    for out in response.json():
+        assert len(out["attributions"]) == len(PREPROCESSOR.features)
+        log_odds = out["base_value"] + sum(out["attributions"].values())
+        assert 1 / (1 + np.exp(-log_odds)) == pytest.approx(out["lbw_prob"], abs=1e-3)
+
+
+def test_top_keeps_the_largest_attributions(client):
+    full = client.post("/explain", json=records(1)).json()[0]["attributions"]
+    top = client.post("/explain?top=3", json=records(1)).json()[0]["attributions"]
+
+    largest = sorted(full, key=lambda name: -abs(full[name]))[:3]
+    assert list(top) == largest
+
+
+def test_bad_record_is_422_not_500(client):
+    response = client.post("/explain", json=[{**records(1)[0], "Child order/parity": [1]}])
+    assert response.status_code == 422
+    assert "Child order/parity" in response.json()["detail"]
+
+    assert client.post("/explain", json=[]).json() == []
+
+
+def test_explainer_is_built_once_per_model():
+    engine = load_engine()
+    explainer = get_explainer(engine)
+    assert get_explainer(engine) is explainer
+    assert loaded_explainer(engine) is explainer
+
+    # same model behind another engine object -> same explainer
+    assert get_explainer(load_engine("booster")) is explainer
+
+    # the production model has categorical splits: no interventional SHAP
+    assert explainer.feature_perturbation == "tree_path_dependent"
+
+
+def test_unbuilt_explainer_is_none():
+    class Unseen:
+        sha256 = "not-a-model-hash"
+
+    assert loaded_explainer(Unseen()) is None
@@ -0,0 +1,161 @@
+# tests/test_gsheets.py
+import pytest
+
+from test_write_behind import wait_for
+
+from fake_gspread import FakeClient
+from gsheets import SheetBatchSink, SheetClientPool, align_row
+
+SHEET, TAB = "sheet-id", "LBWScores"
+HEADERS = ["Beneficiary age", "lbw_prob", "risk_category"]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake():
+    return FakeClient({SHEET: {TAB: [HEADERS]}})
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def pool(fake, clock):
+    return SheetClientPool(lambda: fake, header_ttl=300, clock=clock)
+
+
+def rows(fake):
+    return fake.spreadsheets[SHEET].worksheets[TAB].rows[1:]
+
+
+def test_align_row_orders_by_header_and_blanks_unknown():
+    assert align_row({"lbw_prob": 0.1, "extra": 1, "risk_category": None}, HEADERS) == ["", 0.1, ""]
+
+
+def test_client_is_authorized_once(fake):
+    created = []
+    pool = SheetClientPool(lambda: created.append(1) or fake)
+    for _ in range(3):
+        pool.append_record({"lbw_prob": 0.2}, SHEET, TAB)
+    assert len(created) == 1
+    assert fake.calls["open_by_key"] == 1
+    assert fake.calls["worksheet"] == 1
+
+
+def test_headers_cached_for_ttl(pool, fake, clock):
+    pool.headers(SHEET, TAB)
+    pool.headers(SHEET, TAB)
+    assert fake.calls["row_values"] == 1
+
+    clock.now = 299
+    pool.headers(SHEET, TAB)
+    assert fake.calls["row_values"] == 1
+
+    clock.now = 300
+    pool.headers(SHEET, TAB)
+    assert fake.calls["row_values"] == 2
+
+
+def test_invalidate_rereads_changed_header(pool, fake):
+    assert pool.headers(SHEET, TAB) == HEADERS
+    fake.spreadsheets[SHEET].worksheets[TAB].rows[0] = HEADERS + ["model_served"]
+
+    assert pool.headers(SHEET, TAB) == HEADERS   # still cached
+    pool.invalidate(SHEET, TAB)
+    assert pool.headers(SHEET, TAB) == HEADERS + ["model_served"]
+
+
+def test_failed_append_drops_cached_header_and_handle(pool, fake):
+    pool.append_record({"lbw_prob": 0.1}, SHEET, TAB)
+    fake.fail_next = 1
+    with pytest.raises(ConnectionError):
+        pool.append_record({"lbw_prob": 0.2}, SHEET, TAB)
+
+    pool.append_record({"lbw_prob": 0.3}, SHEET, TAB)
+    assert fake.calls["row_values"] == 2
+    assert fake.calls["worksheet"] == 2
+    assert [r[1] for r in rows(fake)] == [0.1, 0.3]
+
+
+def test_sink_write_is_one_append_rows_call(pool, fake):
+    sink = SheetBatchSink(pool, SHEET, TAB)
+    assert sink.write([{"lbw_prob": p / 10} for p in range(5)]) == 5
+    assert fake.calls["append_rows"] == 1
+    assert len(rows(fake)) == 5
+    assert sink.stats["rows_per_call"] == 5.0
+
+
+def test_sink_flushes_at_max_rows_and_max_delay(pool, fake, clock):
+    sink = SheetBatchSink(pool, SHEET, TAB, max_rows=3, max_delay=10, clock=clock)
+    assert sink.add({"lbw_prob": 0.1}) == 0
+    assert sink.add({"lbw_prob": 0.2}) == 0
+    assert sink.add({"lbw_prob": 0.3}) == 3
+    assert fake.calls["append_rows"] == 1
+
+    assert sink.add({"lbw_prob": 0.4}) == 0
+    clock.now = 10
+    assert sink.due()
+    assert sink.flush() == 1
+    assert [r[1] for r in rows(fake)] == [0.1, 0.2, 0.3, 0.4]
+
+
+def test_sink_keeps_rows_buffered_on_failure_and_retries(pool, fake):
+    sink = SheetBatchSink(pool, SHEET, TAB, max_rows=100)
+    sink.extend([{"lbw_prob": 0.1}, {"lbw_prob": 0.2}])
+
+    fake.fail_next = 1
+    with pytest.raises(ConnectionError):
+        sink.flush()
+    assert sink.stats["buffered"] == 2
+    assert rows(fake) == []
+
+    sink.add({"lbw_prob": 0.3})
+    assert sink.flush() == 3
+    assert [r[1] for r in rows(fake)] == [0.1, 0.2, 0.3]
+    assert sink.stats["buffered"] == 0
+
+
+def test_timer_flushes_a_trickle_without_further_adds(pool, fake, clock):
+    sink = SheetBatchSink(pool, SHEET, TAB, max_rows=100, max_delay=10, tick=0.01, clock=clock)
+    sink.start()
+    try:
+        sink.add({"lbw_prob": 0.1})
+        assert not wait_for(lambda: rows(fake), timeout=0.1)   # not due yet
+
+        clock.now = 10
+        assert wait_for(lambda: rows(fake))
+        assert [r[1] for r in rows(fake)] == [0.1]
+        assert sink.stats["buffered"] == 0
+    finally:
+        sink.stop()
+
+
+def test_timer_retries_a_failed_flush(pool, fake, clock):
+    sink = SheetBatchSink(pool, SHEET, TAB, max_rows=100, max_delay=10, tick=0.01, clock=clock)
+    sink.add({"lbw_prob": 0.1})
+    fake.fail_next = 1
+    sink.start()
+    try:
+        clock.now = 10   # the first timed flush fails, the next one goes through
+        assert wait_for(lambda: rows(fake))
+        assert fake.fail_next == 0
+        assert [r[1] for r in rows(fake)] == [0.1]
+        assert sink._thread.is_alive()
+    finally:
+        sink.stop()
+
+
+def test_stop_flushes_what_is_buffered(pool, fake):
+    sink = SheetBatchSink(pool, SHEET, TAB, max_rows=100, max_delay=60).start()
+    sink.add({"lbw_prob": 0.1})
+    sink.stop()
+    assert [r[1] for r in rows(fake)] == [0.1]
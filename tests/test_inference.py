@@ -0,0 +1,82 @@
+# tests/test_inference.py
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+import inference
+from inference import BoosterEngine, SklearnEngine, build_engine, load_engine
+from model_registry import REGISTRY
+from preprocessing import PREPROCESSOR
+from synthetic import synthetic_frame, synthetic_records
+
+
+@pytest.fixture(scope="module")
+def engines():
+    return load_engine("sklearn"), load_engine("booster")
+
+
+def records(n, seed=31):
+    return [
+        {k: v for k, v in record.items() if v is not None}
+        for record in synthetic_records(n, seed=seed)
+    ]
+
+
+def test_booster_matches_the_pickled_model(engines):
+    sklearn, booster = engines
+    assert isinstance(sklearn, SklearnEngine) and isinstance(booster, BoosterEngine)
+
+    X = PREPROCESSOR.transform(synthetic_frame(200, seed=31))
+    np.testing.assert_allclose(booster.predict_matrix(X), sklearn.predict_matrix(X), rtol=1e-6)
+
+    batch = records(20)
+    np.testing.assert_allclose(
+        booster.predict_records(batch), sklearn.predict_records(batch), rtol=1e-6
+    )
+
+
+def test_single_record_results_do_not_share_the_row_buffer(engines):
+    sklearn, booster = engines
+    first, second = records(2, seed=32)
+
+    p1 = booster.predict_records([first])
+    p2 = booster.predict_records([second])
+
+    np.testing.assert_allclose(p1, sklearn.predict_records([first]), rtol=1e-6)
+    np.testing.assert_allclose(p2, sklearn.predict_records([second]), rtol=1e-6)
+    assert p1[0] != p2[0]
+
+
+def test_engine_is_built_once_per_model_and_exported_once(engines, tmp_path, monkeypatch):
+    monkeypatch.setattr(inference, "NATIVE_MODEL_DIR", tmp_path)
+    monkeypatch.setattr(inference, "_ENGINES", {})
+    exports = []
+    export = inference.export_booster
+    monkeypatch.setattr(
+        inference, "export_booster", lambda model, path: exports.append(path) or export(model, path)
+    )
+
+    entry = replace(REGISTRY.get("production"), sha256="0" * 64)
+    engine = build_engine(entry, "booster")
+    assert build_engine(entry, "booster") is engine
+    assert engine.sha256 == entry.sha256
+    assert exports == [inference.native_model_path(entry.sha256)]
+    assert exports[0].parent == tmp_path and exports[0].exists()
+
+    # a new process (empty engine cache) reuses the exported file
+    monkeypatch.setattr(inference, "_ENGINES", {})
+    build_engine(entry, "booster")
+    assert len(exports) == 1
+
+    assert build_engine(entry, "sklearn") is not engine
+
+
+def test_configured_engine_is_the_default(monkeypatch):
+    monkeypatch.setattr(inference, "INFERENCE_ENGINE", "booster")
+    assert load_engine().name == "booster"
+
+
+def test_unknown_engine_raises():
+    with pytest.raises(ValueError, match="Unknown inference engine 'onnx'"):
+        load_engine("onnx")
@@ -0,0 +1,105 @@
+# tests/test_microbatch.py
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from microbatch import MicroBatcher
+from synthetic import synthetic_records
+
+
+def predict(records):
+    """0.1 per record; a record with "bad" raises TypeError like an unhashable lookup."""
+    if any("bad" in record for record in records):
+        raise TypeError("unhashable type: 'list'")
+    return [0.1] * len(records)
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 10))
+
+
+def test_concurrent_records_share_one_batch():
+    calls = []
+
+    async def main():
+        batcher = MicroBatcher(lambda r: calls.append(len(r)) or predict(r), max_wait_ms=50)
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit({"i": i}) for i in range(5)))
+        finally:
+            await batcher.stop()
+
+    assert run(main()) == [0.1] * 5
+    assert calls == [5]
+
+
+def test_bad_record_fails_only_its_own_request():
+    async def main():
+        batcher = MicroBatcher(predict, max_wait_ms=50)
+        await batcher.start()
+        try:
+            results = await asyncio.gather(
+                batcher.submit({"i": 1}),
+                batcher.submit({"bad": [1]}),
+                batcher.submit({"i": 3}),
+                return_exceptions=True,
+            )
+            return results, batcher.fallbacks
+        finally:
+            await batcher.stop()
+
+    (first, bad, third), fallbacks = run(main())
+    assert (first, third) == (0.1, 0.1)
+    assert isinstance(bad, TypeError)
+    assert fallbacks == 1
+
+
+def test_dead_batcher_fails_waiting_and_new_requests():
+    async def main():
+        batcher = MicroBatcher(predict, max_wait_ms=1)
+        await batcher.start()
+
+        async def broken_collect():
+            raise KeyError("collector bug")
+
+        batcher._collect = broken_collect
+        await asyncio.gather(batcher._task, return_exceptions=True)
+
+        with pytest.raises(RuntimeError, match="not running"):
+            await batcher.submit({"i": 1})
+
+    run(main())
+
+
+def test_stop_fails_queued_requests_instead_of_hanging():
+    async def main():
+        slow = ThreadPoolExecutor(1)
+        batcher = MicroBatcher(
+            lambda r: time.sleep(0.2) or predict(r),
+            max_batch_size=1, max_wait_ms=0, executor=slow,
+        )
+        await batcher.start()
+        waiting = [asyncio.ensure_future(batcher.submit({"i": i})) for i in range(3)]
+        await asyncio.sleep(0.05)
+        await batcher.stop()
+        results = await asyncio.gather(*waiting, return_exceptions=True)
+        slow.shutdown()
+        return results
+
+    results = run(main())
+    assert all(isinstance(r, RuntimeError) and "stopped" in str(r) for r in results)
+
+
+def test_predict_one_bad_record_is_422_and_others_score(client):
+    good = {k: v for k, v in synthetic_records(1, seed=9)[0].items() if v is not None}
+    bad = {**good, "Child order/parity": [1]}
+
+    with ThreadPoolExecutor(3) as pool:
+        responses = list(pool.map(
+            lambda record: client.post("/predict/one", json=record), [good, bad, good]
+        ))
+
+    assert [r.status_code for r in responses] == [200, 422, 200]
+    assert responses[0].json() == responses[2].json()
@@ -0,0 +1,99 @@
+# tests/test_model_registry.py
+import os
+import shutil
+
+import joblib
+import pytest
+
+from model_registry import MODEL_PATH, ModelRegistry
+
+
+@pytest.fixture
+def model_copy(tmp_path):
+    path = tmp_path / "xgb_model.pkl"
+    shutil.copyfile(MODEL_PATH, path)
+    return path
+
+
+def counting_loads(monkeypatch):
+    calls = []
+    load = joblib.load
+    monkeypatch.setattr(joblib, "load", lambda f: calls.append(f) or load(f))
+    return calls
+
+
+def test_same_bytes_under_two_paths_load_once(model_copy, monkeypatch):
+    calls = counting_loads(monkeypatch)
+    registry = ModelRegistry()
+
+    first = registry.register("production", MODEL_PATH)
+    second = registry.register("copy", model_copy)
+
+    assert second is first
+    assert len(calls) == 1
+    assert len(registry.info()["models"]) == 1
+    assert registry.info()["names"] == {"production": first.sha256, "copy": first.sha256}
+
+
+def test_retrained_file_is_served_next_to_the_old_one(tmp_path):
+    registry = ModelRegistry()
+    production = registry.register("production", MODEL_PATH)
+
+    retrained = tmp_path / "retrained.pkl"
+    joblib.dump({"version": 2}, retrained)
+    candidate = registry.register("candidate", retrained)
+
+    assert candidate.sha256 != production.sha256
+    assert registry.get("production") is production
+    assert registry.get("candidate").model == {"version": 2}
+
+
+def test_loading_the_same_path_again_is_a_cache_hit(model_copy):
+    registry = ModelRegistry()
+    entry = registry.load(model_copy)
+    assert registry.load(model_copy) is entry
+    assert registry.load_bytes(model_copy.read_bytes()) is entry
+
+
+def test_file_hash_follows_mtime_and_size(tmp_path):
+    path = tmp_path / "model.pkl"
+    path.write_bytes(b"a" * 64)
+    registry = ModelRegistry()
+    digest = registry.file_sha256(path)
+
+    # same size and mtime: the cached hash is trusted, the file is not re-read
+    st = os.stat(path)
+    path.write_bytes(b"b" * 64)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert registry.file_sha256(path) == digest
+
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert registry.file_sha256(path) != digest
+
+
+def test_unknown_name_raises():
+    with pytest.raises(KeyError, match="No model registered as 'candidate'"):
+        ModelRegistry().get("candidate")
+
+
+def test_registered_model_cannot_be_evicted(tmp_path):
+    registry = ModelRegistry()
+    old = tmp_path / "old.pkl"
+    joblib.dump({"version": 1}, old)
+    entry = registry.register("production", old)
+
+    with pytest.raises(ValueError, match="still registered"):
+        registry.evict(entry.sha256)
+
+    new = tmp_path / "new.pkl"
+    joblib.dump({"version": 2}, new)
+    registry.register("production", new)
+    registry.evict(entry.sha256)
+    assert [m["path"] for m in registry.info()["models"]] == [str(new)]
+
+
+def test_entry_info_reports_load_cost(model_copy):
+    info = ModelRegistry().load(model_copy).info()
+    assert info["file_bytes"] == os.path.getsize(model_copy)
+    assert info["load_seconds"] >= 0
+    assert info["path"] == str(model_copy)
@@ -0,0 +1,62 @@
+# tests/test_prediction_cache.py
+import numpy as np
+import pytest
+
+import prediction_cache
+from prediction_cache import CachedEngine, PredictionCache
+from preprocessing import PREPROCESSOR
+from synthetic import synthetic_frame
+
+
+class CountingEngine:
+    name = "counting"
+    sha256 = "model-a"
+    preprocessor = PREPROCESSOR
+
+    def __init__(self):
+        self.rows = 0
+
+    def predict_matrix(self, X):
+        self.rows += len(X)
+        return np.nan_to_num(X[:, 0], nan=0.0) / 100
+
+
+def test_resubmitted_form_skips_inference():
+    engine = CountingEngine()
+    cached = CachedEngine(engine, PredictionCache(max_rows=4))
+    X = PREPROCESSOR.transform(synthetic_frame(1, seed=1))
+
+    first = cached.predict_matrix(X)
+    np.testing.assert_array_equal(cached.predict_matrix(X.copy()), first)
+    assert engine.rows == 1
+    assert cached.cache.stats()["hits"] == 1
+
+
+def test_big_batch_skips_the_cache(monkeypatch):
+    engine = CountingEngine()
+    cache = PredictionCache(max_rows=4, max_entries=8)
+    cached = CachedEngine(engine, cache)
+    form = PREPROCESSOR.transform(synthetic_frame(1, seed=1))
+    cached.predict_matrix(form)
+
+    monkeypatch.setattr(prediction_cache, "row_keys", lambda X: pytest.fail("big batch hashed"))
+    upload = PREPROCESSOR.transform(synthetic_frame(50, seed=2))
+    np.testing.assert_array_equal(cached.predict_matrix(upload), engine.predict_matrix(upload))
+
+    stats = cache.stats()
+    assert stats["bypassed"] == 50 and stats["size"] == 1   # the form is still cached
+    monkeypatch.undo()
+    cached.predict_matrix(form)
+    assert cache.stats()["hits"] == 1
+
+
+def test_new_model_hash_empties_the_cache():
+    engine = CountingEngine()
+    cache = PredictionCache()
+    X = PREPROCESSOR.transform(synthetic_frame(2, seed=3))
+    cache.predict_matrix(engine, X)
+
+    engine.sha256 = "model-b"
+    cache.predict_matrix(engine, X)
+    assert engine.rows == 4
+    assert cache.stats()["invalidations"] == 1
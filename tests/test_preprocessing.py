@@ -0,0 +1,60 @@
+# tests/test_preprocessing.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessing import CATEGORY_MAPS, DTYPES, FEATURES, PREPROCESSOR, preprocess_for_model
+from synthetic import synthetic_frame
+
+
+def reference_preprocess(df: pd.DataFrame) -> pd.DataFrame:
+    """preprocess_for_model as it was before the compiled preprocessor."""
+    df = df[FEATURES].copy()
+    for col, dtype in DTYPES.items():
+        if dtype.startswith("int"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+        elif dtype.startswith("float"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(float)
+    for col, categories in CATEGORY_MAPS.items():
+        df[col] = pd.Categorical(df[col], categories=categories, ordered=True)
+    return df
+
+
+def assert_same_matrix(a, b):
+    np.testing.assert_array_equal(np.isnan(a), np.isnan(b))
+    np.testing.assert_array_equal(np.nan_to_num(a), np.nan_to_num(b))
+
+
+def test_preprocess_for_model_matches_reference_exactly():
+    df = synthetic_frame(200, seed=3)
+    pd.testing.assert_frame_equal(preprocess_for_model(df), reference_preprocess(df))
+
+
+def test_records_and_arrow_paths_match_transform():
+    pa = pytest.importorskip("pyarrow")
+    df = synthetic_frame(100, seed=4)
+    X = PREPROCESSOR.transform(df)
+
+    records = [
+        {k: v for k, v in row.items() if not pd.isna(v)}
+        for row in df.to_dict(orient="records")
+    ]
+    assert_same_matrix(PREPROCESSOR.transform_records(records), X)
+    assert_same_matrix(PREPROCESSOR.transform_arrow(pa.Table.from_pandas(df)), X)
+
+
+@pytest.mark.parametrize("value", [[1], {"a": 1}])
+def test_unhashable_categorical_value_names_the_column(value):
+    with pytest.raises(ValueError, match="Child order/parity"):
+        PREPROCESSOR.transform_records([{"Child order/parity": value}])
+
+    df = synthetic_frame(3, seed=5)
+    df["Child order/parity"] = pd.Series([1, value, 2], dtype=object)
+    with pytest.raises(ValueError, match="Child order/parity"):
+        PREPROCESSOR.transform(df)
+
+
+def test_predict_rejects_list_value_with_422(client):
+    response = client.post("/predict", json=[{"Child order/parity": [1]}])
+    assert response.status_code == 422
+    assert "Child order/parity" in response.json()["detail"]
@@ -0,0 +1,46 @@
+# tests/test_record_store.py
+import pytest
+
+from record_store import RecordStore
+
+NAMES = ["100% Devi", "10 Devi", "a_b", "axb", "c\\d", "cd", "Sita"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RecordStore(tmp_path / "records.sqlite3")
+    for name in NAMES:
+        store.save({"Beneficiary Name": name, "Village": "Rampur", "District": "Gaya"})
+    return store
+
+
+def names(rows):
+    return [row[1] for row in rows]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("100%", ["100% Devi"]),
+        ("a_", ["a_b"]),
+        ("A_B", ["a_b"]),
+        ("c\\", ["c\\d"]),
+        ("si", ["Sita"]),
+    ],
+)
+def test_search_matches_wildcards_literally(store, query, expected):
+    assert names(store.search(query)) == expected
+    assert store.count(query) == len(expected)
+
+
+def test_search_matches_village_and_filters_district(store):
+    assert store.count("ram") == len(NAMES)
+    assert store.count("ram", district="Patna") == 0
+    assert len(store.search("ram", limit=3, offset=6)) == 1
+
+
+def test_edit_overwrites_and_get_drops_missing_fields(store):
+    record_id = store.search("Sita")[0][0]
+    store.save({"Beneficiary Name": "Sita", "Village": "Rampur", "Beneficiary age": float("nan")}, record_id)
+    assert store.get(record_id) == {"Beneficiary Name": "Sita", "Village": "Rampur"}
+    assert store.count() == len(NAMES)
@@ -0,0 +1,50 @@
+# tests/test_serve.py
+import os
+import subprocess
+import sys
+
+import pytest
+
+from serve import CrashBackoff
+
+CRASHING_SERVER = """
+import serve
+
+def crash(*args):
+    raise RuntimeError("worker failed at startup")
+
+serve._run_worker = crash
+serve.serve("127.0.0.1", 0, workers=2)
+"""
+
+
+def test_backoff_grows_and_gives_up_on_repeated_crashes():
+    backoff = CrashBackoff(min_uptime=10, max_crashes=4, base=0.5, cap=1.5)
+    assert [backoff.next_delay(0.1) for _ in range(3)] == [0.5, 1.0, 1.5]
+    assert backoff.next_delay(0.1) is None
+
+
+def test_backoff_resets_after_a_healthy_run():
+    backoff = CrashBackoff(min_uptime=10, max_crashes=3)
+    backoff.next_delay(0.1)
+    backoff.next_delay(0.1)
+    assert backoff.next_delay(60) == 0.0
+    assert backoff.crashes == 0
+    assert backoff.next_delay(0.1) == 0.5
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork server needs os.fork")
+def test_crashing_workers_stop_the_server():
+    env = {
+        **os.environ,
+        "LBW_WARMUP_EXPLAINER": "0",
+        "LBW_WORKER_MIN_UPTIME": "30",
+        "LBW_WORKER_MAX_CRASHES": "3",
+    }
+    proc = subprocess.run(
+        [sys.executable, "-c", CRASHING_SERVER],
+        capture_output=True, text=True, env=env, timeout=60,
+    )
+    assert proc.returncode == 1
+    assert "crashed within 30s in a row; stopping" in proc.stderr
+    assert proc.stderr.count("exited with code 1") == 3
@@ -0,0 +1,104 @@
+# tests/test_shadow.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from inference import SklearnEngine, load_engine
+from preprocessing import CATEGORY_MAPS, PREPROCESSOR, preprocess_for_model
+from shadow import ShadowEngine, sampled_rows, table_mismatches
+from synthetic import synthetic_frame
+from warmup import WarmUp
+
+
+@pytest.fixture(scope="module")
+def production():
+    return load_engine("sklearn")
+
+
+def train_candidate(category_maps):
+    """A tiny candidate trained on the production features with the given categories."""
+    xgb = pytest.importorskip("xgboost")
+    df = preprocess_for_model(synthetic_frame(200, seed=12))
+    for col, categories in category_maps.items():
+        df[col] = pd.Categorical(df[col].astype(object), categories=categories, ordered=True)
+    y = np.arange(len(df)) % 2
+    model = xgb.XGBClassifier(n_estimators=2, max_depth=2, enable_categorical=True, tree_method="hist")
+    return SklearnEngine(model.fit(df, y))
+
+
+def shadow(production, candidate=None, **kwargs):
+    kwargs = {"log_path": None, **kwargs}
+    return ShadowEngine(production, candidate or production, **kwargs)
+
+
+def test_candidate_with_the_same_tables_is_accepted(production):
+    candidate = train_candidate(CATEGORY_MAPS)
+    assert table_mismatches(candidate, PREPROCESSOR) == []
+    shadow(production, candidate).close()
+
+
+@pytest.mark.parametrize("col", ["MonthConception", "education_clean"])   # ASCII / non-ASCII
+def test_candidate_with_reordered_categories_is_refused(production, col):
+    candidate = train_candidate({**CATEGORY_MAPS, col: CATEGORY_MAPS[col][::-1]})
+    with pytest.raises(ValueError, match=rf"categories differ for \['{col}'\]"):
+        shadow(production, candidate)
+
+
+def test_sample_is_sticky_per_key_and_close_to_fraction():
+    keys = [f"beneficiary-{i}" for i in range(4000)]
+    sampled = sampled_rows(keys, 0.25)
+    assert 0.22 < sampled.mean() < 0.28
+    np.testing.assert_array_equal(sampled_rows(keys[100:200], 0.25), sampled[100:200])
+    assert sampled_rows(keys, 1.0).all() and not sampled_rows(keys, 0.0).any()
+
+
+def test_ab_arm_follows_the_key_not_the_call(production):
+    engine = shadow(production, fraction=0.5, mode="ab")
+    X = PREPROCESSOR.transform(synthetic_frame(40, seed=13))
+    keys = [f"b{i}" for i in range(40)]
+    try:
+        first = engine.score(X, keys)
+        again = engine.score(X[10:30], keys[10:30])
+        np.testing.assert_array_equal(again.served, first.served[10:30])
+        assert set(first.served) == {"production", "candidate"}
+
+        # without keys, a row is keyed by its values
+        np.testing.assert_array_equal(engine.score(X).served, engine.score(X).served)
+    finally:
+        engine.close()
+
+
+def test_other_arm_is_recorded_for_sampled_rows_only(production):
+    engine = shadow(production, fraction=0.5, mode="shadow")
+    X = PREPROCESSOR.transform(synthetic_frame(40, seed=14))
+    keys = [f"b{i}" for i in range(40)]
+    try:
+        run = engine.score(X, keys)
+        other = run.other(timeout=10)
+        assert (run.served == "production").all()
+        np.testing.assert_allclose(other[run.sampled], run.probs[run.sampled], rtol=1e-6)
+        assert np.isnan(other[~run.sampled]).all()
+
+        row = int(np.flatnonzero(run.sampled)[0])
+        columns = run.audit_columns(row, wait_ms=10_000)
+        assert columns["lbw_prob_candidate"] == pytest.approx(columns["lbw_prob_production"])
+        unsampled = run.audit_columns(int(np.flatnonzero(~run.sampled)[0]))
+        assert unsampled["lbw_prob_candidate"] is None
+    finally:
+        engine.close()
+
+
+def test_warm_up_scores_with_the_candidate_too(production):
+    candidate = train_candidate(CATEGORY_MAPS)
+    calls = []
+    predict_matrix = candidate.predict_matrix
+    candidate.predict_matrix = lambda X: calls.append(len(X)) or predict_matrix(X)
+
+    engine = shadow(production, candidate, fraction=0.5, mode="ab")
+    try:
+        warmup = WarmUp(engine, explain=False, rows=8, enabled=True).run()
+        assert warmup.ready, warmup.error
+        assert {"candidate_predict_batch", "candidate_predict_one"} <= set(warmup.stages_ms)
+        assert 8 in calls
+    finally:
+        engine.close()
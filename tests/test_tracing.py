@@ -0,0 +1,96 @@
+# tests/test_tracing.py
+import time
+
+import pytest
+
+from metrics import Histogram
+from synthetic import synthetic_records
+from tracing import Trace, render_prometheus, stage_histogram
+
+
+def records(n, seed=41):
+    return [
+        {k: v for k, v in record.items() if v is not None}
+        for record in synthetic_records(n, seed=seed)
+    ]
+
+
+def test_stages_are_timed_in_order_and_summed():
+    trace = Trace("test_order")
+    with trace.stage("preprocess"):
+        time.sleep(0.01)
+    with trace.stage("predict"):
+        pass
+    trace.record("preprocess", 2.0)   # a repeated stage adds up
+
+    assert list(trace.stages) == ["preprocess", "predict"]
+    assert trace.stages["preprocess"] >= 12.0
+    assert trace.total_ms == pytest.approx(sum(trace.stages.values()))
+
+
+def test_stage_is_recorded_when_the_body_raises():
+    trace = Trace("test_raises")
+    with pytest.raises(ValueError):
+        with trace.stage("preprocess"):
+            raise ValueError("bad record")
+
+    assert "preprocess" in trace.stages
+    assert stage_histogram("test_raises", "preprocess").snapshot()["count"] == 1
+
+
+def test_audit_columns():
+    trace = Trace("test_audit")
+    trace.record("preprocess", 1.44)
+    trace.record("predict", 3.06)
+
+    assert trace.audit_columns() == {
+        "trace_total_ms": 4.5,
+        "trace_stages_ms": "preprocess=1.4;predict=3.1",
+    }
+    assert Trace("test_audit_empty").audit_columns() == {
+        "trace_total_ms": 0, "trace_stages_ms": "",
+    }
+
+
+def test_every_trace_feeds_one_histogram_per_stage():
+    Trace("test_hist").record("predict", 3.0)
+    Trace("test_hist").record("predict", 30.0)
+
+    hist = stage_histogram("test_hist", "predict")
+    assert hist is stage_histogram("test_hist", "predict")
+    snap = hist.snapshot()
+    assert snap["count"] == 2 and snap["sum"] == 33.0
+    assert snap["buckets"]["5"] == 1 and snap["buckets"]["50"] == 2
+
+
+def test_prometheus_text_has_one_family_and_labelled_samples():
+    Trace("test_prom").record("predict", 7.0)
+    extra = Histogram("lbw_test_rows", [1, 10], "Rows per test call")
+    extra.observe(3)
+
+    text = render_prometheus([extra], counters={"lbw_test_total": (5, "Test counter")})
+
+    assert text.count("# TYPE lbw_stage_duration_ms histogram") == 1
+    assert 'lbw_stage_duration_ms_count{trace="test_prom",stage="predict"} 1' in text
+    assert 'lbw_stage_duration_ms_bucket{trace="test_prom",stage="predict",le="10"} 1' in text
+    assert 'lbw_test_rows_bucket{le="10"} 1' in text
+    assert "# TYPE lbw_test_total counter\nlbw_test_total 5" in text
+
+
+def stage_count(client, trace, stage):
+    prefix = f'lbw_stage_duration_ms_count{{trace="{trace}",stage="{stage}"}} '
+    for line in client.get("/metrics").text.splitlines():
+        if line.startswith(prefix):
+            return int(line[len(prefix):])
+    return 0
+
+
+def test_api_requests_show_up_in_metrics(client):
+    before = stage_count(client, "api_predict", "predict")
+    assert client.post("/predict", json=records(3)).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert stage_count(client, "api_predict", "predict") == before + 1
+    for stage in ("preprocess", "serialize"):
+        assert stage_count(client, "api_predict", stage) >= 1
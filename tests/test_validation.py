@@ -0,0 +1,90 @@
+# tests/test_validation.py
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from validation import ANC_RULES, RULES, validate_frame, validate_record, validate_records
+
+TODAY = datetime.date(2026, 6, 1)
+REG = datetime.date(2026, 3, 1)
+
+
+def day(n):
+    """REG + n days."""
+    return REG + datetime.timedelta(days=n)
+
+
+def failed(record, rules=RULES):
+    """Names of the rules `record` violates."""
+    errors = validate_records([record], rules, today=TODAY).errors
+    return errors.columns[errors.iloc[0].to_numpy()].tolist()
+
+
+def test_lmp_must_be_strictly_before_registration():
+    assert validate_record({"lmp_date": day(-1), "registration_date": REG}, today=TODAY) == []
+    assert failed({"lmp_date": REG, "registration_date": REG}) == ["lmp_before_registration"]
+    assert failed({"lmp_date": day(1), "registration_date": REG}) == ["lmp_before_registration"]
+
+
+def test_same_day_anc_visits_are_refused():
+    record = {"registration_date": REG, "anc1_date": day(10), "anc2_date": day(10)}
+    assert failed(record) == ["anc2_after_previous"]
+    assert failed({**record, "anc2_date": day(11)}) == []
+
+
+def test_every_violation_is_reported():
+    record = {
+        "lmp_date": day(250), "registration_date": day(200),   # after TODAY too
+        "anc1_date": day(-3),
+    }
+    assert failed(record) == [
+        "registration_not_future", "lmp_before_registration", "anc1_after_registration",
+    ]
+
+
+@pytest.mark.parametrize("missing", [None, np.nan, pd.NaT, "", "not a date"])
+def test_missing_dates_never_violate_a_rule_by_themselves(missing):
+    record = {"lmp_date": missing, "registration_date": missing, "anc1_date": missing}
+    assert validate_record(record, today=TODAY) == []
+    assert failed(record) == []
+
+
+def test_previous_anc_is_the_last_completed_one():
+    # ANC 2 skipped: ANC 3 is compared with ANC 1, not with the empty ANC 2
+    record = {"registration_date": REG, "anc1_date": day(30), "anc2_date": None, "anc3_date": day(20)}
+    assert failed(record, ANC_RULES) == ["anc3_after_previous"]
+    assert failed({**record, "anc3_date": day(40)}, ANC_RULES) == []
+
+
+RECORDS = [
+    {"lmp_date": day(-90), "registration_date": REG, "anc1_date": day(10), "anc2_date": day(40)},
+    {"lmp_date": REG, "registration_date": REG},
+    {"lmp_date": "2026-01-05", "registration_date": "2026-03-01", "anc1_date": "2026-02-01"},
+    {"registration_date": day(120), "anc1_date": day(130), "anc3_date": day(125)},
+    {"lmp_date": datetime.datetime(2025, 12, 1, 23, 30), "registration_date": np.datetime64(REG)},
+    {"registration_date": pd.Timestamp(REG), "anc2_date": pd.Timestamp(day(1)), "anc4_date": day(1)},
+    {"lmp_date": None, "registration_date": "garbage", "anc1_date": ""},
+    {},
+]
+
+
+@pytest.mark.parametrize("record", RECORDS)
+def test_single_record_path_agrees_with_the_vectorized_one(record):
+    assert validate_record(record, today=TODAY) == (
+        validate_records([record], today=TODAY).messages(0)
+    )
+
+
+def test_frame_and_records_agree():
+    frame = pd.DataFrame([RECORDS[0], RECORDS[1], RECORDS[3]])
+    by_frame = validate_frame(frame, today=TODAY)
+    by_records = validate_records([RECORDS[0], RECORDS[1], RECORDS[3]], today=TODAY)
+
+    pd.testing.assert_frame_equal(by_frame.errors, by_records.errors)
+    assert by_frame.valid.tolist() == [True, False, False]
+    assert by_frame.summary() == {
+        "lmp_before_registration": 1, "registration_not_future": 1,
+        "anc1_not_future": 1, "anc3_not_future": 1, "anc3_after_previous": 1,
+    }
@@ -0,0 +1,134 @@
+# tests/test_write_behind.py
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from write_behind import FlushResult, WriteBehindQueue
+
+
+class Sink:
+    def __init__(self):
+        self.batches = []
+        self.fail_with = None
+        self.called = threading.Event()
+
+    def __call__(self, records):
+        self.called.set()
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.batches.append(records)
+
+
+@pytest.fixture
+def sink():
+    return Sink()
+
+
+@pytest.fixture
+def outbox(tmp_path, sink):
+    queue = WriteBehindQueue(sink, path=tmp_path / "outbox.sqlite3", flush_interval=60)
+    yield queue
+    queue.stop(flush=False)
+
+
+def rows(queue):
+    with sqlite3.connect(queue.path) as conn:
+        return conn.execute(
+            "SELECT attempts, next_attempt_at, last_error FROM outbox ORDER BY id"
+        ).fetchall()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_drain_delivers_in_order_and_empties_journal(outbox, sink):
+    for i in range(3):
+        outbox.enqueue({"i": i})
+    assert outbox.drain() == FlushResult(flushed=3)
+    assert sink.batches == [[{"i": 0}, {"i": 1}, {"i": 2}]]
+    assert outbox.pending() == 0
+
+
+def test_enqueue_wakes_worker_before_flush_interval(outbox, sink):
+    outbox.start()
+    time.sleep(0.05)   # worker is waiting on its 60 s tick
+    outbox.enqueue({"i": 1})
+    assert wait_for(lambda: sink.batches)
+    assert sink.batches == [[{"i": 1}]]
+
+
+def test_failed_flush_is_kept_and_backed_off(outbox, sink):
+    outbox.enqueue({"i": 1})
+    sink.fail_with = RuntimeError("quota exceeded")
+    assert outbox.drain() == FlushResult(failed=1)
+
+    [(attempts, next_attempt_at, last_error)] = rows(outbox)
+    assert attempts == 1
+    assert next_attempt_at > time.time()
+    assert "quota exceeded" in last_error
+
+
+def test_undecodable_row_is_parked_not_blocking(outbox, sink):
+    outbox.enqueue({"i": 1})
+    with sqlite3.connect(outbox.path) as conn:
+        conn.execute("INSERT INTO outbox (payload, enqueued_at) VALUES ('{not json', 0)")
+    outbox.enqueue({"i": 2})
+
+    assert outbox.drain() == FlushResult(flushed=2, parked=1)
+    assert sink.batches == [[{"i": 1}, {"i": 2}]]
+    [(attempts, next_attempt_at, last_error)] = rows(outbox)
+    assert next_attempt_at == float("inf")
+    assert "undecodable" in last_error
+    assert outbox.drain() == FlushResult()   # never retried
+
+
+def test_drain_keeps_going_after_an_all_parked_batch(tmp_path, sink):
+    outbox = WriteBehindQueue(sink, path=tmp_path / "outbox.sqlite3", batch_size=2)
+    with sqlite3.connect(outbox.path) as conn:   # the whole first batch is undecodable
+        conn.executemany(
+            "INSERT INTO outbox (payload, enqueued_at) VALUES (?, 0)", [("{bad",), ("{worse",)]
+        )
+    outbox.enqueue({"i": 1})
+
+    assert outbox.drain() == FlushResult(flushed=1, parked=2)
+    assert sink.batches == [[{"i": 1}]]
+
+
+def test_drain_stops_at_the_first_failed_batch(tmp_path, sink):
+    outbox = WriteBehindQueue(sink, path=tmp_path / "outbox.sqlite3", batch_size=2)
+    for i in range(5):
+        outbox.enqueue({"i": i})
+    sink.fail_with = RuntimeError("503")
+
+    assert outbox.drain() == FlushResult(failed=2)
+    assert len(sink.batches) == 0 and outbox.pending() == 5
+    assert [attempts for attempts, _, _ in rows(outbox)] == [1, 1, 0, 0, 0]
+
+
+def test_worker_survives_unexpected_errors(outbox, sink, monkeypatch):
+    calls = []
+    drain = outbox.drain
+
+    def flaky_drain():
+        calls.append(1)
+        if len(calls) == 1:
+            raise KeyError("boom")
+        return drain()
+
+    monkeypatch.setattr(outbox, "drain", flaky_drain)
+    outbox.start()
+    outbox.enqueue({"i": 1})
+    assert wait_for(lambda: calls)
+
+    outbox.enqueue({"i": 2})
+    assert wait_for(lambda: sink.batches)
+    assert outbox._thread.is_alive()
+    assert sink.batches == [[{"i": 1}, {"i": 2}]]
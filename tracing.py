@@ -0,0 +1,81 @@
+# tracing.py
+"""
+Per-stage timings for each submission / request, without a tracing backend.
+
+    trace = Trace("form_submit")
+    with trace.stage("preprocess"):
+        X = PREPROCESSOR.transform(X_raw)
+    trace.summary()      # "preprocess=1.4" (ms, audit column)
+
+Every stage also lands in a process-wide histogram
+lbw_stage_duration_ms{trace=..., stage=...}, exported by
+render_prometheus() (the API's GET /metrics).
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import Histogram, render_prometheus as _render
+
+STAGE_MS_BUCKETS = [0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+_HISTOGRAMS = {}   # (trace, stage) -> Histogram
+_HISTOGRAMS_LOCK = threading.Lock()
+
+
+def stage_histogram(trace: str, stage: str) -> Histogram:
+    key = (trace, stage)
+    with _HISTOGRAMS_LOCK:
+        if key not in _HISTOGRAMS:
+            _HISTOGRAMS[key] = Histogram(
+                "lbw_stage_duration_ms", STAGE_MS_BUCKETS,
+                "Duration of one hot-path stage (ms)",
+                labels={"trace": trace, "stage": stage},
+            )
+        return _HISTOGRAMS[key]
+
+
+class Trace:
+    """Ordered stage -> milliseconds for ONE submission / request."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stages = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, stage: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - t0) * 1000)
+
+    def record(self, stage: str, ms: float):
+        """Add a duration measured elsewhere (e.g. the Streamlit rerun)."""
+        self.stages[stage] = self.stages.get(stage, 0.0) + ms
+        stage_histogram(self.name, stage).observe(ms)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.stages.values())
+
+    def summary(self) -> str:
+        """Compact "stage=ms;..." string for a sheet / record-store column."""
+        return ";".join(f"{stage}={ms:.1f}" for stage, ms in self.stages.items())
+
+    def audit_columns(self) -> dict:
+        return {
+            "trace_total_ms": round(self.total_ms, 1),
+            "trace_stages_ms": self.summary(),
+        }
+
+
+def histograms() -> list:
+    with _HISTOGRAMS_LOCK:
+        return list(_HISTOGRAMS.values())
+
+
+def render_prometheus(extra_histograms=(), counters=None) -> str:
+    """Every stage histogram (plus any others) in Prometheus text format."""
+    return _render(histograms() + list(extra_histograms), counters)
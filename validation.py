@@ -0,0 +1,174 @@
+# validation.py
+"""
+Date / consistency rules evaluated as vectorized column checks over a
+whole batch, returning EVERY violation instead of stopping at the first.
+
+    result = validate_frame(df)          # raw input columns (derived_features)
+    result.errors                        # rows x rules boolean DataFrame
+    result.valid                         # rows passing every rule
+    result.messages(0)                   # ["❌ LMP date must be ...", ...]
+
+Rules (dates as in derived_features.RAW_INPUTS):
+- registration_date is not in the future
+- lmp_date is strictly before registration_date
+- every completed ANC date lies between registration_date and today
+- completed ANC dates are strictly increasing (no same-day visits)
+
+A missing date never violates a rule by itself.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from derived_features import ANC_VISITS, COERCE, _is_missing
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    message: str
+    check: object   # columns, today -> boolean array (True = violation)
+
+
+def _anc_rules(i):
+    return [
+        Rule(
+            f"anc{i}_not_future",
+            f"❌ ANC {i} date cannot be later than today.",
+            lambda c, today: c[f"anc{i}_date"] > today,
+        ),
+        Rule(
+            f"anc{i}_after_registration",
+            f"❌ ANC {i} date cannot be earlier than the Registration Date.",
+            lambda c, today: c[f"anc{i}_date"] < c["registration_date"],
+        ),
+        Rule(
+            f"anc{i}_after_previous",
+            f"❌ ANC {i} date must be later than the previous ANC date "
+            "(same-day ANC is not allowed).",
+            lambda c, today: c[f"anc{i}_date"] <= c[f"anc{i}_previous"],
+        ),
+    ]
+
+
+REGISTRATION_RULES = [
+    Rule(
+        "registration_not_future",
+        "❌ Registration Date cannot be later than today.",
+        lambda c, today: c["registration_date"] > today,
+    ),
+    Rule(
+        "lmp_before_registration",
+        "❌ LMP date must be strictly earlier than Registration Date.",
+        lambda c, today: c["lmp_date"] >= c["registration_date"],
+    ),
+]
+ANC_RULES = [rule for i in ANC_VISITS for rule in _anc_rules(i)]
+RULES = REGISTRATION_RULES + ANC_RULES
+
+DATE_COLUMNS = ["lmp_date", "registration_date"] + [f"anc{i}_date" for i in ANC_VISITS]
+
+
+NAT = np.datetime64("NaT", "D")
+
+
+def _columns(raw: dict, n: int) -> dict:
+    """datetime64[D] columns (NaT if absent), plus each ANC's previous completed date."""
+    columns = {
+        name: COERCE["date"](raw[name]) if name in raw
+        else np.full(n, NAT, dtype="datetime64[D]")
+        for name in DATE_COLUMNS
+    }
+    return _with_previous(columns, n)
+
+
+def _with_previous(columns: dict, n: int) -> dict:
+    # forward-fill across visits: the last completed ANC before visit i
+    previous = np.full(n, NAT, dtype="datetime64[D]")
+    for i in ANC_VISITS:
+        columns[f"anc{i}_previous"] = previous
+        current = columns[f"anc{i}_date"]
+        previous = np.where(np.isnat(current), previous, current)
+    return columns
+
+
+class ValidationResult:
+    def __init__(self, errors: pd.DataFrame, rules):
+        self.errors = errors
+        self.rules = {rule.name: rule for rule in rules}
+
+    @property
+    def valid(self) -> pd.Series:
+        return ~self.errors.any(axis=1)
+
+    def messages(self, row) -> list:
+        """Every violated rule's message for one row (by position)."""
+        flags = self.errors.iloc[row]
+        return [self.rules[name].message for name in flags.index[flags.to_numpy()]]
+
+    def error_messages(self, sep=" | ") -> pd.Series:
+        """One joined string per row ("" when valid), e.g. for a CSV column."""
+        names = np.array(self.errors.columns, dtype=object)
+        messages = {name: rule.message for name, rule in self.rules.items()}
+        return pd.Series(
+            [sep.join(messages[n] for n in names[row]) for row in self.errors.to_numpy()],
+            index=self.errors.index,
+        )
+
+    def summary(self) -> dict:
+        """{rule: violating rows} for rules with at least one violation."""
+        counts = self.errors.sum()
+        return {name: int(n) for name, n in counts.items() if n}
+
+
+def validate_columns(raw: dict, n: int, rules=RULES, today=None, index=None) -> ValidationResult:
+    today = np.datetime64(today or date.today(), "D")
+    columns = _columns(raw, n)
+    errors = pd.DataFrame(
+        {rule.name: np.asarray(rule.check(columns, today), dtype=bool) for rule in rules},
+        index=index,
+    )
+    return ValidationResult(errors, rules)
+
+
+def validate_frame(df: pd.DataFrame, rules=RULES, today=None) -> ValidationResult:
+    raw = {name: df[name].to_numpy() for name in DATE_COLUMNS if name in df.columns}
+    return validate_columns(raw, len(df), rules, today, index=df.index)
+
+
+def validate_records(records: list, rules=RULES, today=None) -> ValidationResult:
+    raw = {}
+    for name in DATE_COLUMNS:
+        values = np.empty(len(records), dtype=object)
+        values[:] = [record.get(name) for record in records]
+        raw[name] = values
+    return validate_columns(raw, len(records), rules, today)
+
+
+def _date(value) -> np.datetime64:
+    """One raw date -> datetime64[D] (NaT if missing / unparseable), like COERCE["date"]."""
+    if _is_missing(value) or value is pd.NaT or value == "":
+        return NAT
+    if isinstance(value, date):
+        return np.datetime64(value.date() if isinstance(value, datetime) else value, "D")
+    try:
+        value = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        return NAT
+    return NAT if value is pd.NaT else np.datetime64(value.date(), "D")
+
+
+def validate_record(record: dict, rules=RULES, today=None) -> list:
+    """
+    All error messages for one form ([] if it passes).
+
+    Same rules as validate_records([record]), on 1-row arrays built
+    without pandas Series / DataFrames: this runs on every Streamlit rerun.
+    """
+    today = np.datetime64(today or date.today(), "D")
+    columns = _with_previous(
+        {name: np.array([_date(record.get(name))]) for name in DATE_COLUMNS}, 1
+    )
+    return [rule.message for rule in rules if rule.check(columns, today)[0]]
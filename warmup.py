@@ -0,0 +1,144 @@
+# warmup.py
+"""
+Warm-up at process start, so the first real prediction does not pay for
+lazy initialization:
+
+- the SHAP explainer: built (explain.get_explainer, cached per model)
+  and called once
+- XGBoost's thread pool (first predict on a multi-row batch)
+- pandas' first-call Categorical machinery (preprocess_for_model)
+- a shadow / A-B candidate model (shadow.py), if configured: in ab mode
+  it serves part of the traffic inline
+
+The model itself is deserialized by load_engine() before warm-up starts.
+
+Rows are synthetic, built from category_maps.json (synthetic.py), plus
+the preprocessed background.csv sample. They go through the bare engine,
+not the prediction cache, so no fake rows are cached or counted.
+
+    warmup = WarmUp(engine).start()            # API lifespan: /ready is 503 until done
+    warmup = WarmUp(load=get_engine).start()   # Streamlit: load + warm up in the background
+    warmup = WarmUp(engine).run()              # blocking, in this thread
+    warmup.wait(); warmup.loaded            # the engine, once loaded
+    warmup.info()                           # {"ready": True, "seconds": ...}
+
+LBW_WARMUP=0 turns it off (ready immediately), LBW_WARMUP_ROWS sets the
+batch size (default 64), LBW_WARMUP_EXPLAINER=0 leaves SHAP for the first
+explanation (faster start, slower first explanation).
+"""
+import os
+import threading
+import time
+
+from background_store import load_background
+from explain import get_explainer
+from preprocessing import PREPROCESSOR, preprocess_for_model
+from synthetic import synthetic_frame, synthetic_records
+from tracing import Trace
+
+WARMUP_ENABLED = os.environ.get("LBW_WARMUP", "1") == "1"
+WARMUP_ROWS = int(os.environ.get("LBW_WARMUP_ROWS", "64"))
+# 0 -> the SHAP stack is imported on the first explanation instead
+WARMUP_EXPLAINER = os.environ.get("LBW_WARMUP_EXPLAINER", "1") == "1"
+
+
+def _bare(engine):
+    """CachedEngine -> the engine behind it (keeps synthetic rows out of the cache)."""
+    return getattr(engine, "engine", engine)
+
+
+class WarmUp:
+    def __init__(
+        self,
+        engine=None,
+        explain=WARMUP_EXPLAINER,
+        rows=WARMUP_ROWS,
+        enabled=WARMUP_ENABLED,
+        load=None,
+    ):
+        # `load` (zero-arg) deserializes the engine inside run() instead,
+        # so model imports happen off the caller's thread as well
+        self.load = load
+        self.loaded = engine
+        self.engine = _bare(engine)
+        self.explain = explain
+        self.rows = rows
+        self.enabled = enabled
+
+        self.seconds = None
+        self.stages_ms = {}
+        self.error = None
+        self._done = threading.Event()
+        self._thread = None
+
+    def run(self) -> "WarmUp":
+        """Warm up in this thread; a failure is recorded (not ready), not raised."""
+        t0 = time.perf_counter()
+        try:
+            if self.load is not None:
+                self.loaded = self.load()
+                self.engine = _bare(self.loaded)
+                self.stages_ms["load"] = round((time.perf_counter() - t0) * 1000, 2)
+            if self.enabled:
+                self._warm_up()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.seconds = time.perf_counter() - t0
+            self._done.set()
+        return self
+
+    def start(self) -> "WarmUp":
+        self._thread = threading.Thread(target=self.run, name="lbw-warmup", daemon=True)
+        self._thread.start()
+        return self
+
+    def _warm_up(self):
+        trace = Trace("warmup")
+        df = synthetic_frame(self.rows, seed=0)
+        records = synthetic_records(1, seed=1)
+
+        with trace.stage("preprocess_for_model"):
+            preprocess_for_model(df)
+        with trace.stage("predict_batch"):
+            X = PREPROCESSOR.transform(df)
+            self.engine.predict_matrix(X)
+        with trace.stage("predict_one"):
+            self.engine.predict_records(records)
+        with trace.stage("predict_background"):
+            background = load_background(max_rows=self.rows)
+            if len(background):
+                self.engine.predict_matrix(background)
+        candidate = getattr(self.loaded, "candidate", None)
+        if candidate is not None:
+            with trace.stage("candidate_predict_batch"):
+                _bare(candidate).predict_matrix(X)
+            with trace.stage("candidate_predict_one"):
+                _bare(candidate).predict_records(records)
+        if self.explain:
+            with trace.stage("explain"):
+                get_explainer(self.engine).explain(X[:1])
+
+        self.stages_ms.update({name: round(ms, 2) for name, ms in trace.stages.items()})
+
+    # -------------------------
+    # readiness
+    # -------------------------
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set() and self.error is None
+
+    def wait(self, timeout=None) -> bool:
+        """Block until warm-up finished (True) or timeout (False)."""
+        return self._done.wait(timeout)
+
+    def info(self) -> dict:
+        return {
+            "ready": self.ready,
+            "warming_up": not self._done.is_set(),
+            "enabled": self.enabled,
+            "rows": self.rows,
+            "seconds": round(self.seconds, 4) if self.seconds is not None else None,
+            "stages_ms": self.stages_ms,
+            "error": self.error,
+        }
@@ -0,0 +1,258 @@
+# write_behind.py
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, date
+
+import numpy as np
+
+OUTBOX_PATH = "outbox.sqlite3"
+
+logger = logging.getLogger(__name__)
+
+
+def json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+@dataclass
+class FlushResult:
+    """Rows of one flush_once() / drain(), by outcome."""
+    flushed: int = 0   # written to the sink and deleted
+    parked: int = 0    # undecodable, never retried
+    failed: int = 0    # sink raised; kept and backed off
+
+    @property
+    def claimed(self) -> int:
+        return self.flushed + self.parked + self.failed
+
+    def __iadd__(self, other: "FlushResult") -> "FlushResult":
+        self.flushed += other.flushed
+        self.parked += other.parked
+        self.failed += other.failed
+        return self
+
+
+class WriteBehindQueue:
+    """
+    Durable local outbox in front of a slow / flaky sink (Google Sheets).
+
+    - enqueue() is one local SQLite insert -> the form never waits on
+      the network, and a Sheets outage does not lose the record
+    - a background thread wakes on every enqueue (and at least every
+      `flush_interval` seconds), claims due rows in batches of up to `batch_size` and hands them to
+      `flush_fn(records)` (e.g. SheetClientPool.append_records -> one
+      append_rows call)
+    - a failed batch stays in the journal and is retried with
+      exponential backoff + jitter
+    - a row whose payload cannot be decoded is parked (never retried,
+      last_error set) instead of blocking the rows behind it
+
+    Rows are claimed with a short lease, so several processes can share
+    one journal file. Delivery is at-least-once: a crash between the
+    sink write and the delete can repeat a batch.
+    """
+
+    def __init__(
+        self,
+        flush_fn,
+        path=OUTBOX_PATH,
+        batch_size=50,
+        flush_interval=2.0,
+        base_backoff=2.0,
+        max_backoff=300.0,
+        lease_seconds=60.0,
+    ):
+        self.flush_fn = flush_fn
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.lease_seconds = lease_seconds
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT NOT NULL,
+                    enqueued_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL DEFAULT 0,
+                    last_error TEXT
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (next_attempt_at)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    # -------------------------
+    # producer side
+    # -------------------------
+    def enqueue(self, record: dict) -> int:
+        payload = json.dumps(record, default=json_default)
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "INSERT INTO outbox (payload, enqueued_at) VALUES (?, ?)",
+                (payload, time.time()),
+            )
+        self._wake.set()
+        return cur.lastrowid
+
+    def pending(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    # -------------------------
+    # consumer side
+    # -------------------------
+    def _claim(self, conn):
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                """
+                SELECT id, payload, attempts FROM outbox
+                WHERE next_attempt_at <= ?
+                ORDER BY id LIMIT ?
+                """,
+                (now, self.batch_size),
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE outbox SET next_attempt_at = ? WHERE id = ?",
+                    [(now + self.lease_seconds, r[0]) for r in rows],
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return rows
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempts))
+        return delay * random.uniform(0.5, 1.0)
+
+    def flush_once(self) -> FlushResult:
+        """
+        Claim one due batch and push it to the sink. The result tells
+        "nothing due" (nothing claimed), "all parked" and "sink failed"
+        apart.
+        """
+        conn = self._connect()
+        try:
+            claimed = self._claim(conn)
+            if not claimed:
+                return FlushResult()
+
+            rows, records = self._decode(conn, claimed)
+            parked = len(claimed) - len(rows)
+            if not rows:
+                return FlushResult(parked=parked)
+            ids = [r[0] for r in rows]
+            try:
+                self.flush_fn(records)
+            except Exception as e:
+                now = time.time()
+                conn.executemany(
+                    """
+                    UPDATE outbox
+                    SET attempts = attempts + 1, next_attempt_at = ?, last_error = ?
+                    WHERE id = ?
+                    """,
+                    [(now + self._backoff(r[2]), repr(e)[:500], r[0]) for r in rows],
+                )
+                return FlushResult(parked=parked, failed=len(rows))
+
+            conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+            return FlushResult(flushed=len(ids), parked=parked)
+        finally:
+            conn.close()
+
+    def _decode(self, conn, rows):
+        """Claimed rows -> (decodable rows, records); the rest are parked as failed."""
+        good, records, bad = [], [], []
+        for row in rows:
+            try:
+                records.append(json.loads(row[1]))
+                good.append(row)
+            except ValueError as e:
+                bad.append((float("inf"), f"undecodable payload: {e!r}"[:500], row[0]))
+        if bad:
+            logger.error("write-behind: parked %d undecodable outbox row(s)", len(bad))
+            conn.executemany(
+                """
+                UPDATE outbox
+                SET attempts = attempts + 1, next_attempt_at = ?, last_error = ?
+                WHERE id = ?
+                """,
+                bad,
+            )
+        return good, records
+
+    def drain(self) -> FlushResult:
+        """
+        Flush every due batch now (used on shutdown / by scripts). A batch
+        that was only parked does not stop it; it stops when nothing is
+        due, or when the sink fails (the rows are backed off, and the
+        sink is not hammered with the rest).
+        """
+        total = FlushResult()
+        while True:
+            result = self.flush_once()
+            total += result
+            if not result.claimed or result.failed:
+                return total
+
+    # -------------------------
+    # background worker
+    # -------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.drain()
+            except sqlite3.OperationalError:
+                # journal busy / locked by another process -> next tick
+                pass
+            except Exception:
+                # never lose the worker: the rows stay in the journal
+                logger.exception("write-behind: flush failed, retrying next tick")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="write-behind", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, flush=True, timeout=10.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if flush:
+            self.drain()